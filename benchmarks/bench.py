@@ -0,0 +1,258 @@
+"""
+Benchmarks des chemins chauds, sans fenêtre (module `pyxel` factice).
+
+Chaque banc mesure des opérations par seconde (meilleure de plusieurs
+répétitions). `--enregistrer` sauve les résultats comme références; sinon
+chaque banc est comparé à sa référence et le script échoue (code 1) si l'un
+d'eux a ralenti de plus de `--seuil`, ou s'il n'a pas de référence (sauf
+avec `--sans-reference`, pour une simple mesure). Les références dépendent
+de la machine: les enregistrer sur la borne (ou la CI) où elles seront
+comparées, machine au repos, et augmenter `--repetitions` sur une machine
+partagée.
+
+    python benchmarks/bench.py --enregistrer
+    python benchmarks/bench.py --seuil 0.15
+    python benchmarks/bench.py --sans-reference
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+DOSSIER = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(DOSSIER, "stub"), os.path.dirname(DOSSIER)]
+
+import pyxel  # noqa: E402  (module factice de benchmarks/stub)
+
+from pong_game.audio import BusAudio, SortieMuette  # noqa: E402
+from pong_game.config import LARGEUR_ECRAN, HAUTEUR_ECRAN, SCORE_MAX, TOUCHES  # noqa: E402
+from pong_game.etats import Etat  # noqa: E402
+from pong_game.rng import Alea  # noqa: E402
+from pong_game.simulation import Balle, Raquette, SmartComputer, Match  # noqa: E402
+from pong_game.state import JeuPong  # noqa: E402
+
+REFERENCES_DEFAUT = os.path.join(DOSSIER, "references.json")
+SEUIL_DEFAUT = 0.2
+
+BANCS = {}
+
+
+def banc(nom: str, iterations: int):
+    """Enregistre une préparation qui renvoie le corps à chronométrer: corps(n)."""
+
+    def enregistrer(preparation):
+        BANCS[nom] = (preparation, iterations)
+        return preparation
+
+    return enregistrer
+
+
+def balles_en_jeu(nombre: int, graine: int = 1) -> list:
+    """Balles dans des états variés, relevées au fil d'un match IA contre IA."""
+    match = Match(mode_ordinateur=True, niveau_ia="amateur", niveau_ia_g="amateur", graine=graine)
+    balles = []
+    while len(balles) < nombre:
+        match.tick()
+        if match.frame % 7 == 0:
+            balle = Balle(rng=Alea(graine))
+            balle.restaurer(match.balle.capturer())
+            balles.append(balle)
+    return balles
+
+
+@banc("balle.maj", 200_000)
+def banc_balle_maj():
+    balle = Balle(rng=Alea(1))
+    depart = balle.capturer()
+
+    def corps(n):
+        balle.restaurer(depart)
+        for _ in range(n):
+            balle.maj()
+            # Reste dans le terrain: seuls les rebonds sur les murs changent la trajectoire
+            if not 0 < balle.x < LARGEUR_ECRAN:
+                balle.x = LARGEUR_ECRAN / 2
+
+    return corps
+
+
+def preparer_frappe(mouvement: float, vy: float):
+    """Balle sur le point de toucher la raquette gauche, qui bouge de `mouvement` px/frame."""
+    raq = Raquette(18, HAUTEUR_ECRAN / 2 - 30)
+    raq.vitesse_mouvement = mouvement
+    balle = Balle(rng=Alea(1))
+    balle.x, balle.y, balle.vx, balle.vy = raq.x + raq.w - 4, raq.y + 40, -6.0, vy
+    balle.x_precedent, balle.y_precedent = balle.x + 6, balle.y - vy
+    depart = balle.capturer()
+    evenements = []
+
+    def corps(n):
+        for _ in range(n):
+            balle.restaurer(depart)
+            balle.collision_raquette(raq, evenements)
+        evenements.clear()
+
+    return corps
+
+
+banc("collision.frappe_normale", 100_000)(lambda: preparer_frappe(0.0, 1.0))
+banc("collision.frappe_spin", 100_000)(lambda: preparer_frappe(4.0, 1.0))
+banc("collision.frappe_slice", 100_000)(lambda: preparer_frappe(-4.0, 1.0))
+
+
+@banc("collision.manque_approche", 200_000)
+def banc_collision_manque():
+    # Balle qui approche mais passe loin: test de recouvrement puis test balayé
+    raq = Raquette(18, 10)
+    balle = Balle(rng=Alea(1))
+    balle.x, balle.y, balle.vx, balle.vy = 100.0, 300.0, -6.0, 0.0
+    balle.x_precedent, balle.y_precedent = 106.0, 300.0
+
+    def corps(n):
+        for _ in range(n):
+            balle.collision_raquette(raq)
+
+    return corps
+
+
+@banc("collision.manque_eloignement", 200_000)
+def banc_collision_eloignement():
+    raq = Raquette(18, 10)
+    balle = Balle(rng=Alea(1))
+    balle.x, balle.vx = 100.0, 6.0
+
+    def corps(n):
+        for _ in range(n):
+            balle.collision_raquette(raq)
+
+    return corps
+
+
+def preparer_ia(niveau: str):
+    balles = balles_en_jeu(64)
+    ia = SmartComputer(LARGEUR_ECRAN - 26, HAUTEUR_ECRAN / 2 - 30, niveau=niveau, rng=Alea(2))
+
+    def corps(n):
+        for i in range(n):
+            ia.maj(0, balles[i & 63])
+
+    return corps
+
+
+for _niveau in ("debutant", "amateur", "pro"):
+    banc(f"ia.maj.{_niveau}", 100_000)(lambda niveau=_niveau: preparer_ia(niveau))
+
+
+def preparer_jeu() -> JeuPong:
+    jeu = JeuPong(audio=BusAudio(SortieMuette()))
+    jeu.niveau_ia = "amateur"
+    jeu.etat = Etat.JEU
+    jeu.creer_entites()
+    pyxel.touches.add(TOUCHES["gauche_haut"])
+    return jeu
+
+
+@banc("jeu.maj_jeu", 20_000)
+def banc_maj_jeu():
+    jeu = preparer_jeu()
+
+    def corps(n):
+        for _ in range(n):
+            jeu.maj_jeu()
+            jeu.audio.vider()
+            # Pas de victoire (musique, pause): on reste en plein échange
+            if max(jeu.score_g, jeu.score_d) >= SCORE_MAX - 1:
+                jeu.score_g = jeu.score_d = 0
+
+    return corps
+
+
+@banc("jeu.dessiner_jeu", 20_000)
+def banc_dessiner_jeu():
+    jeu = preparer_jeu()
+    balles = balles_en_jeu(64)
+    captures = [balle.capturer() for balle in balles]
+
+    def corps(n):
+        for i in range(n):
+            jeu.balle.restaurer(captures[i & 63])
+            jeu.dessiner_jeu()
+
+    return corps
+
+
+def mesurer(nom: str, repetitions: int) -> float:
+    preparation, iterations = BANCS[nom]
+    corps = preparation()
+    corps(iterations // 10)  # échauffement (caches, atlas, calques)
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        corps(iterations)
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return iterations / meilleur
+
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks des chemins chauds du jeu")
+    parser.add_argument("--references", default=REFERENCES_DEFAUT, help="Fichier JSON des références")
+    parser.add_argument("--enregistrer", action="store_true", help="Enregistrer les résultats comme références")
+    parser.add_argument(
+        "--seuil", type=float, default=SEUIL_DEFAUT, help="Ralentissement toléré (0.2 = 20%% plus lent)"
+    )
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--filtre", default="", help="Ne lancer que les bancs dont le nom contient ce texte")
+    parser.add_argument(
+        "--sans-reference", action="store_true", help="Mesurer sans échouer pour les bancs sans référence"
+    )
+    args = parser.parse_args(arguments)
+
+    references = {}
+    if os.path.exists(args.references):
+        with open(args.references) as fichier:
+            references = json.load(fichier)
+
+    resultats = {}
+    regressions = []
+    sans_reference = []
+    for nom in BANCS:
+        if args.filtre not in nom:
+            continue
+        resultats[nom] = debit = mesurer(nom, args.repetitions)
+        ligne = f"{nom:<28}{debit:>14,.0f} op/s"
+        reference = references.get(nom)
+        if reference:
+            ecart = debit / reference - 1
+            ligne += f"  {ecart:+7.1%} vs référence"
+            if ecart < -args.seuil:
+                ligne += "  REGRESSION"
+                regressions.append(nom)
+        else:
+            ligne += "  sans référence"
+            sans_reference.append(nom)
+        print(ligne, flush=True)
+
+    if args.enregistrer:
+        references.update(resultats)
+        with open(args.references, "w") as fichier:
+            json.dump(references, fichier, indent=2, sort_keys=True)
+        print(f"Références enregistrées dans {args.references}")
+        return 0
+    code = 0
+    if regressions:
+        print(f"{len(regressions)} banc(s) ralenti(s) de plus de {args.seuil:.0%}: " + ", ".join(regressions))
+        code = 1
+    if sans_reference and not args.sans_reference:
+        # Sans référence, aucune régression ne peut être détectée: ne pas passer en silence
+        print(
+            f"{len(sans_reference)} banc(s) sans référence dans {args.references}: " + ", ".join(sans_reference)
+            + " (--enregistrer pour les créer, --sans-reference pour mesurer seulement)"
+        )
+        code = 1
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Module `pyxel` factice pour les benchmarks: mêmes noms que l'API utilisée par
+le jeu, sans fenêtre ni son. Les fonctions de dessin ne font rien, ce qui
+mesure le coût côté Python des appels et non le rendu.
+"""
+
+VERSION = "stub"
+frame_count = 0
+
+KEY_Z = 1
+KEY_S = 2
+KEY_O = 3
+KEY_L = 4
+KEY_R = 5
+KEY_P = 6
+KEY_Q = 7
+KEY_RETURN = 8
+KEY_UP = 9
+KEY_DOWN = 10
+KEY_SPACE = 11
+KEY_LEFT = 12
+KEY_RIGHT = 13
+KEY_F1 = 14
+KEY_F2 = 15
+
+# Touches maintenues, modifiables par les benchmarks
+touches = set()
+
+
+def init(width, height, title="", **kwargs):
+    pass
+
+
+def run(update, draw):
+    pass
+
+
+def quit():
+    pass
+
+
+def stop(*args):
+    pass
+
+
+def play(channel, sound, **kwargs):
+    pass
+
+
+def playm(music, loop=False):
+    pass
+
+
+def load(filename, **kwargs):
+    pass
+
+
+def save(filename, **kwargs):
+    pass
+
+
+def btn(key):
+    return key in touches
+
+
+def btnp(key, *args, **kwargs):
+    return False
+
+
+def cls(col=0):
+    pass
+
+
+def rect(x, y, w, h, col):
+    pass
+
+
+def text(x, y, s, col):
+    pass
+
+
+def pset(x, y, col):
+    pass
+
+
+def blt(x, y, img, u, v, w, h, colkey=None, **kwargs):
+    pass
+
+
+class Image:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+    def cls(self, col):
+        pass
+
+    def rect(self, x, y, w, h, col):
+        pass
+
+    def text(self, x, y, s, col):
+        pass
+
+    def pset(self, x, y, col):
+        pass
+
+
+class _Son:
+    def set(self, *args, **kwargs):
+        pass
+
+
+sounds = [_Son() for _ in range(64)]
+musics = [_Son() for _ in range(8)]
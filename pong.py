@@ -4,8 +4,82 @@ Ce fichier importe l'application depuis le package `pong_game` afin de
 garder un point d'exécution simple tout en séparant le code en modules.
 """
 
-from pong_game.app import Application
+import argparse
+
+from pong_game.startup import ChronoDemarrage
+
+# Créé avant les imports de pyxel et du jeu, pour les inclure dans la mesure
+chrono = ChronoDemarrage()
+
+from pong_game.app import Application, Visionneuse, PartieEnLigne, Tribune, PartieChaos  # noqa: E402
+
+
+def lire_adresse(texte: str, hote_defaut: str = "127.0.0.1"):
+    # netplay (et asyncio) importés seulement par les options réseau
+    from pong_game.netplay import lire_adresse
+
+    return lire_adresse(texte, hote_defaut)
+
+
+def lire_delai(texte: str) -> int:
+    from pong_game.netplay import lire_delai
+
+    return lire_delai(texte)
 
 
 if __name__ == "__main__":
-    Application()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Pong avec menu et IA")
+    parser.add_argument("--replays", metavar="DOSSIER", help="Enregistrer chaque partie dans DOSSIER")
+    parser.add_argument("--voir", metavar="FICHIER", help="Relire un replay enregistré")
+    parser.add_argument(
+        "--temps-demarrage", action="store_true", help="Afficher le temps de démarrage jusqu'à la première frame"
+    )
+    parser.add_argument(
+        "--table-ia", metavar="FICHIER", help="IA guidée par une table précalculée (voir pong_game/lookup.py)"
+    )
+    parser.add_argument(
+        "--qualite",
+        type=int,
+        choices=range(4),
+        help="Palier d'effets fixe (0 complet ... 3 une image sur deux); adapté à la charge par défaut",
+    )
+    parser.add_argument("--chaos", type=int, metavar="BALLES", help="Mode chaos avec BALLES balles en jeu")
+    en_ligne = parser.add_argument_group("Jeu en ligne (rollback sur UDP)")
+    en_ligne.add_argument("--en-ligne", choices=("gauche", "droite"), help="Côté joué; le côté gauche héberge")
+    en_ligne.add_argument("--local", default=":7000", metavar="[HOTE]:PORT", help="Adresse d'écoute (défaut :7000)")
+    en_ligne.add_argument("--distant", metavar="HOTE:PORT", help="Adresse de l'autre joueur")
+    en_ligne.add_argument("--latence", type=float, default=0, help="Latence ajoutée à l'envoi, en ms (essais)")
+    en_ligne.add_argument("--gigue", type=float, default=0, help="Gigue ajoutée, en ms (essais)")
+    en_ligne.add_argument("--perte", type=float, default=0, help="Proportion de paquets perdus exprès (essais)")
+    en_ligne.add_argument("--delai", type=lire_delai, default=0, help="Retard de l'entrée locale, en frames")
+    diffusion = parser.add_argument_group("Spectateurs (voir pong_game/broadcast.py)")
+    diffusion.add_argument("--diffuser", metavar="[HOTE]:PORT", help="Diffuser la partie aux spectateurs")
+    diffusion.add_argument("--regarder", metavar="HOTE:PORT", help="Regarder une partie diffusée")
+    args = parser.parse_args()
+
+    if args.en_ligne:
+        if not args.distant:
+            parser.error("--en-ligne demande --distant")
+        PartieEnLigne(
+            args.en_ligne,
+            lire_adresse(args.local, hote_defaut="0.0.0.0"),
+            lire_adresse(args.distant),
+            latence=args.latence / 1000,
+            gigue=args.gigue / 1000,
+            perte=args.perte,
+            delai=args.delai,
+        )
+    elif args.chaos:
+        PartieChaos(args.chaos)
+    elif args.regarder:
+        Tribune(lire_adresse(args.regarder))
+    elif args.voir:
+        Visionneuse(args.voir)
+    else:
+        Application(
+            dossier_replays=args.replays,
+            chrono=chrono if args.temps_demarrage else None,
+            diffusion=lire_adresse(args.diffuser, hote_defaut="0.0.0.0") if args.diffuser else None,
+            table_ia=args.table_ia,
+            qualite=args.qualite,
+        )
@@ -1,13 +1,339 @@
+import time
+from collections import deque
+
 import pyxel
 
-from .config import LARGEUR_ECRAN, HAUTEUR_ECRAN
+from .config import LARGEUR_ECRAN, HAUTEUR_ECRAN, TOUCHES
 from .state import JeuPong
-from .sound import creer_sons
+from .etats import Etat
+from .sound import charger_sons
+from .replay import Lecteur
+from .profiler import Profileur, ETAT, DESSIN_TEXTES
+from .startup import ChronoDemarrage
+from .audio import BusAudio, SortieMuette
+from .entities import Raquette, SmartComputer, Balle
+from .layers import Calque
+from .governor import Gouverneur, COMPLET
+from .simulation import REBOND, FRAPPE, POINT
+
+# Saut de la visionneuse (flèches gauche/droite), en frames
+SAUT_REPLAY = 60 * 10
+
+
+# Les modes réseau et chaos importent asyncio, netplay, broadcast et chaos à la
+# demande: le démarrage hors ligne (temps jusqu'à la première frame) ne les paie pas
+
+
+def pomper(boucle) -> None:
+    """Traite les paquets reçus et les envois différés (boucle asyncio), sans bloquer."""
+    boucle.call_soon(boucle.stop)
+    boucle.run_forever()
 
 
 class Application:
-    def __init__(self):
+    def __init__(
+        self,
+        dossier_replays: str | None = None,
+        chrono: ChronoDemarrage | None = None,
+        diffusion=None,
+        table_ia: str | None = None,
+        qualite: int | None = None,
+    ):
+        # Rapport de démarrage affiché après la première frame, si demandé
+        self.chrono = chrono
+        if chrono:
+            chrono.etape("imports")
         pyxel.init(LARGEUR_ECRAN, HAUTEUR_ECRAN, title="PONG - Avec menu de sélection")
-        creer_sons()
+        if chrono:
+            chrono.etape("pyxel.init")
+        depuis_cache = charger_sons()
+        if chrono:
+            chrono.etape("sons (cache)" if depuis_cache else "sons (compilation)")
+        self.profileur = Profileur()
+        self.afficher_profil = False
+        self.jeu = JeuPong(dossier_replays=dossier_replays, profileur=self.profileur, table_ia=table_ia)
+        if chrono:
+            chrono.etape("jeu")
+        # Effets visuels retirés sous la charge (palier fixe si `qualite` est donné)
+        self.gouverneur = Gouverneur(qualite or COMPLET, automatique=qualite is None)
+        self.jeu.regler_qualite(self.gouverneur.niveau)
+        # Diffusion de la partie aux spectateurs (voir broadcast.py)
+        self.boucle = self.diffuseur = None
+        if diffusion:
+            import asyncio
+
+            from .broadcast import Diffuseur, quantifier
+
+            self.quantifier = quantifier
+            self.boucle = asyncio.new_event_loop()
+            _, self.diffuseur = self.boucle.run_until_complete(
+                self.boucle.create_datagram_endpoint(Diffuseur, local_addr=diffusion)
+            )
+        pyxel.run(self.maj, self.dessiner)
+
+    def maj(self) -> None:
+        self.gouverneur.debut_frame()
+        self.profileur.nouvelle_frame()
+        if pyxel.btnp(TOUCHES["profil"]):
+            self.afficher_profil = not self.afficher_profil
+        if pyxel.btnp(TOUCHES["export_profil"]):
+            chemin = time.strftime("profil-%Y%m%d-%H%M%S.csv")
+            self.profileur.exporter_csv(chemin)
+            print(f"Profil exporté dans {chemin}")
+        self.jeu.maj()
+        if self.diffuseur:
+            self.diffuseur.publier(self.quantifier(self.jeu))
+            pomper(self.boucle)
+        # Reste de la mise à jour: menus, musique, victoire
+        self.profileur.mesurer(ETAT)
+
+    def dessiner(self) -> None:
+        # Au dernier palier, une frame sur deux garde l'image précédente (la simulation, elle, avance)
+        if self.gouverneur.dessinee:
+            self.profileur.reprendre()
+            self.jeu.dessiner()
+            self.profileur.mesurer(DESSIN_TEXTES)
+            if self.afficher_profil:
+                self.dessiner_profil()
+            if self.chrono:
+                self.chrono.etape("premiere frame")
+                print(self.chrono.rapport())
+                self.chrono = None
+        niveau = self.gouverneur.fin_frame()
+        if niveau is not None:
+            self.jeu.regler_qualite(niveau)
+
+    def dessiner_profil(self) -> None:
+        lignes = self.profileur.texte()
+        pyxel.rect(LARGEUR_ECRAN - 126, 14, 124, 8 * len(lignes) + 12, 0)
+        for i, ligne in enumerate(lignes):
+            pyxel.text(LARGEUR_ECRAN - 124, 16 + 8 * i, ligne, 7 if i == len(lignes) - 1 else 6)
+        pyxel.text(LARGEUR_ECRAN - 124, 16 + 8 * len(lignes), self.gouverneur.texte(), 11)
+
+
+class Visionneuse:
+    """Relit un replay enregistré; flèches gauche/droite pour sauter, P pour la pause."""
+
+    def __init__(self, chemin: str):
+        pyxel.init(LARGEUR_ECRAN, HAUTEUR_ECRAN, title=f"PONG - Replay {chemin}")
+        self.jeu = JeuPong()
+        self.jeu.etat = Etat.JEU
+        self.lecteur = Lecteur(chemin, match=self.jeu)
+        self.frame = 0
+        self.pause = False
+        self.lecteur.aller_a(0)
+        pyxel.run(self.maj, self.dessiner)
+
+    def maj(self) -> None:
+        if pyxel.btnp(TOUCHES["pause"]):
+            self.pause = not self.pause
+        if pyxel.btnp(TOUCHES["quitter"]):
+            pyxel.quit()
+
+        saut = 0
+        if pyxel.btnp(pyxel.KEY_RIGHT):
+            saut = SAUT_REPLAY
+        if pyxel.btnp(pyxel.KEY_LEFT):
+            saut = -SAUT_REPLAY
+        if saut:
+            self.frame = max(0, min(self.lecteur.frames, self.frame + saut))
+            self.lecteur.aller_a(self.frame)
+        elif not self.pause and self.frame < self.lecteur.frames:
+            self.lecteur.appliquer(self.frame)
+            self.frame += 1
+
+    def dessiner(self) -> None:
+        dessiner_replay(self.jeu, self.frame)
+
+
+def dessiner_replay(jeu: JeuPong, frame: int) -> None:
+    """Image d'un replay à la frame `frame` (visionneuse et export, voir export.py)."""
+    if jeu.termine:
+        jeu.dessiner_victoire()
+    else:
+        jeu.dessiner_jeu()
+    secondes = frame // 60
+    pyxel.text(LARGEUR_ECRAN - 110, 6, f"REPLAY {secondes // 60:02d}:{secondes % 60:02d}", 8)
+
+
+class PartieEnLigne:
+    """
+    Joueur contre joueur en ligne (rollback, voir netplay.py). Chaque joueur
+    joue avec Z/S (ou O/L), quel que soit son côté.
+    """
+
+    def __init__(self, cote: str, adresse_locale, adresse_distante, latence=0.0, gigue=0.0, perte=0.0, delai=0):
+        import asyncio
+
+        from .netplay import ouvrir_pair
+
+        pyxel.init(LARGEUR_ECRAN, HAUTEUR_ECRAN, title=f"PONG - En ligne ({cote})")
+        charger_sons()
         self.jeu = JeuPong()
-        pyxel.run(self.jeu.maj, self.jeu.dessiner)
+        self.jeu.mode_ordinateur = False
+        self.jeu.etat = Etat.JEU
+        self.jeu.creer_entites()
+        # La boucle asyncio avance d'un pas à chaque frame pyxel (voir `pomper`)
+        self.boucle = asyncio.new_event_loop()
+        self.pair = self.boucle.run_until_complete(
+            ouvrir_pair(
+                self.jeu, cote, adresse_locale, adresse_distante, latence=latence, gigue=gigue, perte=perte, delai=delai
+            )
+        )
+        pyxel.run(self.maj, self.dessiner)
+
+    def lire_entree(self) -> int:
+        entree = 0
+        if pyxel.btn(TOUCHES["gauche_haut"]) or pyxel.btn(TOUCHES["droite_haut"]):
+            entree -= 1
+        if pyxel.btn(TOUCHES["gauche_bas"]) or pyxel.btn(TOUCHES["droite_bas"]):
+            entree += 1
+        return entree
+
+    def maj(self) -> None:
+        pomper(self.boucle)
+        if pyxel.btnp(TOUCHES["quitter"]):
+            pyxel.quit()
+        if self.pair.connecte and not self.jeu.termine:
+            # Les frames re-simulées après un rollback ne rejouent pas leurs sons
+            evenements = self.pair.session.avancer(self.lire_entree())
+            if evenements:
+                self.jeu.jouer_evenements(evenements)
+        self.pair.envoyer()
+        self.jeu.audio.vider()
+
+    def dessiner(self) -> None:
+        if self.jeu.termine:
+            self.jeu.dessiner_victoire()
+        else:
+            self.jeu.dessiner_jeu()
+        if not self.pair.connecte:
+            pyxel.text(150, HAUTEUR_ECRAN // 2 - 30, "En attente de l'autre joueur...", 8)
+
+
+class Tribune:
+    """
+    Spectateur d'une partie diffusée (voir broadcast.py): l'état reçu est
+    appliqué sur un `JeuPong` muet, dessiné par ses propres méthodes.
+    """
+
+    def __init__(self, adresse_serveur):
+        import asyncio
+
+        from .broadcast import Spectateur, appliquer, LOT_DEFAUT
+
+        self.appliquer = appliquer
+        self.lot = LOT_DEFAUT
+        pyxel.init(LARGEUR_ECRAN, HAUTEUR_ECRAN, title="PONG - Spectateur")
+        self.jeu = JeuPong(audio=BusAudio(SortieMuette()))
+        self.boucle = asyncio.new_event_loop()
+        _, self.spectateur = self.boucle.run_until_complete(
+            self.boucle.create_datagram_endpoint(Spectateur, remote_addr=adresse_serveur)
+        )
+        self.recu = False
+        self.derniere_reception = 0
+        pyxel.run(self.maj, self.dessiner)
+
+    def maj(self) -> None:
+        pomper(self.boucle)
+        if pyxel.btnp(TOUCHES["quitter"]):
+            pyxel.quit()
+        frames = self.spectateur.frames
+        if frames:
+            self.derniere_reception = pyxel.frame_count
+        elif pyxel.frame_count - self.derniere_reception >= 60:
+            # Serveur redémarré ou premier paquet perdu: on se re-déclare
+            self.derniere_reception = pyxel.frame_count
+            self.spectateur.acquitter()
+        # Une frame affichée par frame; au-delà de deux lots d'avance, on rattrape
+        if len(frames) > 2 * self.lot:
+            del frames[: len(frames) - self.lot]
+        if frames:
+            self.appliquer(self.jeu, frames.pop(0)[1])
+            self.recu = True
+
+    def dessiner(self) -> None:
+        if not self.recu:
+            pyxel.cls(0)
+            pyxel.text(150, HAUTEUR_ECRAN // 2 - 10, "En attente de la diffusion...", 8)
+            return
+        self.jeu.dessiner()
+
+
+def match_chaos(nombre_balles: int, **options):
+    """`MatchChaos` avec les entités dessinables."""
+    from .chaos import MatchChaos
+
+    class MatchChaosPyxel(MatchChaos):
+        classe_raquette = Raquette
+        classe_ordinateur = SmartComputer
+        classe_balle = Balle
+
+    return MatchChaosPyxel(nombre_balles, **options)
+
+
+class PartieChaos:
+    """Mode chaos (voir chaos.py): joueur (Z/S) contre l'IA, avec les images par seconde affichées."""
+
+    def __init__(self, nombre_balles: int, niveau_ia: str = "amateur"):
+        pyxel.init(LARGEUR_ECRAN, HAUTEUR_ECRAN, title=f"PONG - Chaos ({nombre_balles} balles)")
+        from .chaos import CHOC
+
+        charger_sons()
+        self.match = match_chaos(nombre_balles, mode_ordinateur=True, niveau_ia=niveau_ia)
+        self.sons_rebond = (REBOND, CHOC)
+        self.match.raq_g.touche_haut = TOUCHES["gauche_haut"]
+        self.match.raq_g.touche_bas = TOUCHES["gauche_bas"]
+        self.audio = BusAudio()
+        self.pause = False
+        self.calque_terrain = Calque(0, 0, LARGEUR_ECRAN, HAUTEUR_ECRAN, self.rendre_terrain, opaque=True)
+        self.calque_score = Calque(LARGEUR_ECRAN // 2 - 60, 20, 120, 8, self.rendre_score)
+        # Instants des dernières frames dessinées, pour le compteur d'images par seconde
+        self.instants = deque(maxlen=60)
+        pyxel.run(self.maj, self.dessiner)
+
+    def maj(self) -> None:
+        if pyxel.btnp(TOUCHES["pause"]):
+            self.pause = not self.pause
+        if pyxel.btnp(TOUCHES["reset"]):
+            self.match.reinitialiser()
+        if pyxel.btnp(TOUCHES["quitter"]):
+            pyxel.quit()
+        if not self.pause and not self.match.termine:
+            for evenement in self.match.tick(self.match.raq_g.lire_entree(), 0):
+                # Le bus ne garde qu'un son par canal: des centaines de chocs restent un seul son
+                if evenement.type in self.sons_rebond:
+                    self.audio.jouer("rebond")
+                elif evenement.type == FRAPPE:
+                    self.audio.jouer("frappe_" + evenement.nature)
+                elif evenement.type == POINT:
+                    self.audio.jouer("point")
+        self.audio.vider()
+
+    def rendre_terrain(self, image, nombre_balles: int) -> None:
+        for y in range(0, HAUTEUR_ECRAN, 18):
+            image.rect(LARGEUR_ECRAN // 2 - 2, y, 4, 9, 5)
+        image.text(10, HAUTEUR_ECRAN - 20, f"CHAOS {nombre_balles} balles - Z/S  (P)ause  (R)eset  (Q)uitter", 6)
+
+    def rendre_score(self, image, score: tuple) -> None:
+        image.text(0, 0, f"{score[0]}", 7)
+        image.text(110, 0, f"{score[1]}", 7)
+
+    def dessiner(self) -> None:
+        match = self.match
+        self.calque_terrain.dessiner(len(match.balles))
+        match.raq_g.dessiner()
+        match.raq_d.dessiner()
+        for balle in match.balles:
+            balle.dessiner()
+        self.calque_score.dessiner((match.score_g, match.score_d))
+        if self.pause:
+            pyxel.text(200, HAUTEUR_ECRAN // 2 - 10, "PAUSE", 8)
+        if match.termine:
+            gagnant = "GAUCHE" if match.score_g > match.score_d else "DROITE"
+            pyxel.text(160, HAUTEUR_ECRAN // 2 - 10, f"VICTOIRE {gagnant} !", 8)
+
+        self.instants.append(time.perf_counter())
+        if len(self.instants) > 1:
+            fps = (len(self.instants) - 1) / (self.instants[-1] - self.instants[0])
+            pyxel.text(LARGEUR_ECRAN - 70, 6, f"{fps:5.1f} FPS", 7 if fps >= 58 else 8)
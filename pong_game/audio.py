@@ -0,0 +1,95 @@
+"""
+Bus d'événements audio.
+
+Le jeu poste des événements nommés (`jouer("rebond")`, `musique(0)`,
+`arreter()`); rien n'est envoyé au moteur audio avant `vider()`, appelé une
+fois par frame. D'ici là, les doublons sont fusionnés, un seul son est gardé
+par canal (le plus prioritaire) et les commandes de musique se résument à la
+dernière. Une sortie muette (`SortieMuette`) permet de tout ignorer sans
+fenêtre ni son.
+"""
+
+# Nom de l'événement -> (canal, son, priorité sur le canal)
+SONS = {
+    "navigation": (0, 4, 0),
+    "validation": (0, 5, 1),
+    "rebond": (1, 2, 0),
+    "point": (1, 3, 1),
+    "frappe_normal": (2, 0, 0),
+    "frappe_effet": (2, 1, 0),
+    "frappe_spin": (2, 6, 0),
+    "frappe_slice": (2, 7, 0),
+    "frappe_rapide": (3, 9, 0),
+}
+NB_CANAUX = 4
+
+
+class SortiePyxel:
+    def __init__(self):
+        import pyxel
+
+        self.pyxel = pyxel
+
+    def play(self, canal: int, son: int) -> None:
+        self.pyxel.play(canal, son)
+
+    def playm(self, piste: int, boucle: bool) -> None:
+        self.pyxel.playm(piste, loop=boucle)
+
+    def stop(self) -> None:
+        self.pyxel.stop()
+
+
+class SortieMuette:
+    def play(self, canal: int, son: int) -> None:
+        pass
+
+    def playm(self, piste: int, boucle: bool) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class BusAudio:
+    def __init__(self, sortie=None):
+        self.sortie = sortie if sortie is not None else SortiePyxel()
+        # Sons en attente par canal: (priorité, son) ou None
+        self.en_attente = [None] * NB_CANAUX
+        self.arret_en_attente = False
+        self.musique_en_attente = None
+        # Musique en boucle lancée en dernier: la relancer ne ferait que la redémarrer
+        self.boucle_en_cours = None
+
+    def jouer(self, nom: str) -> None:
+        canal, son, priorite = SONS[nom]
+        actuel = self.en_attente[canal]
+        if actuel is None or priorite > actuel[0]:
+            self.en_attente[canal] = (priorite, son)
+
+    def musique(self, piste: int, boucle: bool = False) -> None:
+        self.musique_en_attente = (piste, boucle)
+
+    def arreter(self) -> None:
+        """Coupe tout, y compris ce qui a été posté plus tôt dans la frame."""
+        self.arret_en_attente = True
+        self.musique_en_attente = None
+        self.en_attente = [None] * NB_CANAUX
+
+    def vider(self) -> None:
+        if self.arret_en_attente:
+            self.arret_en_attente = False
+            musique = self.musique_en_attente
+            # Arrêt suivi de la même boucle dans la frame: on la laisse jouer
+            if not (musique and musique[1] and musique == self.boucle_en_cours):
+                self.sortie.stop()
+                self.boucle_en_cours = None
+        if self.musique_en_attente:
+            if self.musique_en_attente != self.boucle_en_cours:
+                self.sortie.playm(*self.musique_en_attente)
+                self.boucle_en_cours = self.musique_en_attente if self.musique_en_attente[1] else None
+            self.musique_en_attente = None
+        for canal, attente in enumerate(self.en_attente):
+            if attente:
+                self.sortie.play(canal, attente[1])
+                self.en_attente[canal] = None
@@ -0,0 +1,474 @@
+"""
+Diffusion d'un match en direct à des spectateurs, sur UDP (asyncio).
+
+L'état visible (balle, raquettes, scores, écran courant) est quantifié en un
+vecteur d'entiers (`quantifier`). Toutes les `lot` frames, le serveur envoie
+à chaque spectateur un seul paquet contenant ces frames: la première codée en
+delta par rapport à la dernière frame que le spectateur a acquittée, les
+suivantes par rapport à la précédente. Un delta ne contient que les champs
+modifiés (masque puis écarts en varint zigzag). Les spectateurs qui ont
+acquitté la même frame reçoivent les mêmes octets: le paquet n'est codé
+qu'une fois par frame de référence distincte, pas une fois par spectateur.
+
+    python -m pong_game.broadcast serveur --port 7200
+    python -m pong_game.broadcast charge --spectateurs 1000 --duree 10
+"""
+
+import argparse
+import asyncio
+import os
+import struct
+import sys
+import time
+from multiprocessing import Pool
+
+from .etats import Etat
+from .rng import Alea
+from .simulation import Match
+
+ETATS = (Etat.MENU, Etat.DIFFICULTE, Etat.JEU, Etat.VICTOIRE)
+NIVEAUX = ("debutant", "amateur", "pro")
+CHAMPS = (
+    "etat",
+    "selection_menu",
+    "selection_difficulte",
+    "mode_ordinateur",
+    "niveau_ia",
+    "h_g",
+    "h_d",
+    "score_g",
+    "score_d",
+    "drapeaux",
+    "x",
+    "y",
+    "vx",
+    "vy",
+    "effet_y",
+    "y_g",
+    "y_d",
+)
+NB_CHAMPS = len(CHAMPS)
+ZERO = (0,) * NB_CHAMPS
+# Positions au 1/8 de pixel, vitesses et effet au 1/256 de pixel par frame
+ECHELLE_POSITION = 8
+ECHELLE_VITESSE = 256
+PAUSE = 1
+ECLAT = 2
+
+PAQUET = 1
+FORMAT_PAQUET = "<Biii"  # type, frame de référence (-1: aucune), première frame, nombre de frames
+TAILLE_ENTETE = struct.calcsize(FORMAT_PAQUET)
+FORMAT_ACQUITTEMENT = "<i"
+LOT_DEFAUT = 3
+HISTORIQUE = 128
+# Un spectateur muet plus longtemps est oublié
+EXPIRATION = 5.0
+# Intervalle (s) entre deux déclarations d'un spectateur qui n'a encore rien reçu
+RELANCE = 0.25
+# Attente maximale (s) de tous les spectateurs de l'essai de charge
+ATTENTE_CHARGE = 15.0
+FPS = 60
+
+
+def quantifier(jeu) -> tuple:
+    """Vecteur d'entiers de l'état visible d'un `Match` (ou `JeuPong`)."""
+    balle, raq_g, raq_d = jeu.balle, jeu.raq_g, jeu.raq_d
+    etat = getattr(jeu, "etat", Etat.JEU)
+    if etat is Etat.FONDU:
+        # Les spectateurs voient l'écran resté affiché pendant le fondu
+        etat = jeu.ecran_fondu
+    drapeaux = (PAUSE if getattr(jeu, "pause", False) else 0) | (
+        ECLAT if balle.derniere_collision < 3 and balle.impact_force > 0.7 else 0
+    )
+    return (
+        ETATS.index(etat),
+        getattr(jeu, "selection_menu", 0),
+        getattr(jeu, "selection_difficulte", 0),
+        int(jeu.mode_ordinateur),
+        NIVEAUX.index(jeu.niveau_ia),
+        raq_g.h,
+        raq_d.h,
+        jeu.score_g,
+        jeu.score_d,
+        drapeaux,
+        round(balle.x * ECHELLE_POSITION),
+        round(balle.y * ECHELLE_POSITION),
+        round(balle.vx * ECHELLE_VITESSE),
+        round(balle.vy * ECHELLE_VITESSE),
+        round(balle.effet_y * ECHELLE_VITESSE),
+        round(raq_g.y * ECHELLE_POSITION),
+        round(raq_d.y * ECHELLE_POSITION),
+    )
+
+
+def appliquer(jeu, valeurs) -> None:
+    """Reconstruit sur `jeu` (un `JeuPong`) l'état visible décrit par `valeurs`."""
+    etat, selection_menu, selection_difficulte, mode, niveau, h_g, h_d = valeurs[:7]
+    score_g, score_d, drapeaux, x, y, vx, vy, effet_y, y_g, y_d = valeurs[7:]
+    jeu.etat = ETATS[etat]
+    jeu.selection_menu = selection_menu
+    jeu.selection_difficulte = selection_difficulte
+    if jeu.mode_ordinateur != bool(mode) or jeu.niveau_ia != NIVEAUX[niveau]:
+        jeu.mode_ordinateur = bool(mode)
+        jeu.niveau_ia = NIVEAUX[niveau]
+        jeu.creer_entites()
+    jeu.score_g, jeu.score_d = score_g, score_d
+    jeu.pause = bool(drapeaux & PAUSE)
+    balle = jeu.balle
+    vx, vy = vx / ECHELLE_VITESSE, vy / ECHELLE_VITESSE
+    if (vx, vy) != (balle.vx, balle.vy):
+        balle.trajectoire += 1
+    balle.x, balle.y = x / ECHELLE_POSITION, y / ECHELLE_POSITION
+    balle.vx, balle.vy = vx, vy
+    balle.effet_y = effet_y / ECHELLE_VITESSE
+    balle.derniere_collision, balle.impact_force = (0, 1.0) if drapeaux & ECLAT else (3, 0.0)
+    jeu.raq_g.h, jeu.raq_d.h = h_g, h_d
+    jeu.raq_g.y, jeu.raq_d.y = y_g / ECHELLE_POSITION, y_d / ECHELLE_POSITION
+
+
+def ecrire_varint(sortie: bytearray, valeur: int) -> None:
+    while valeur >= 0x80:
+        sortie.append((valeur & 0x7F) | 0x80)
+        valeur >>= 7
+    sortie.append(valeur)
+
+
+def lire_varint(donnees: bytes, position: int) -> tuple[int, int]:
+    valeur = decalage = 0
+    while True:
+        octet = donnees[position]
+        position += 1
+        valeur |= (octet & 0x7F) << decalage
+        if octet < 0x80:
+            return valeur, position
+        decalage += 7
+
+
+def coder_delta(sortie: bytearray, base: tuple, valeurs: tuple) -> None:
+    masque = 0
+    ecarts = []
+    for i in range(NB_CHAMPS):
+        ecart = valeurs[i] - base[i]
+        if ecart:
+            masque |= 1 << i
+            ecarts.append(ecart)
+    ecrire_varint(sortie, masque)
+    for ecart in ecarts:
+        ecrire_varint(sortie, ecart * 2 if ecart >= 0 else -ecart * 2 - 1)
+
+
+def decoder_delta(donnees: bytes, position: int, base: tuple) -> tuple[tuple, int]:
+    masque, position = lire_varint(donnees, position)
+    valeurs = list(base)
+    i = 0
+    while masque:
+        if masque & 1:
+            zigzag, position = lire_varint(donnees, position)
+            valeurs[i] += zigzag >> 1 if not zigzag & 1 else -((zigzag + 1) >> 1)
+        masque >>= 1
+        i += 1
+    return tuple(valeurs), position
+
+
+class Diffuseur(asyncio.DatagramProtocol):
+    """
+    Serveur: `publier(valeurs)` à chaque frame; toutes les `lot` frames, un
+    paquet part vers chaque spectateur connu. Un spectateur se déclare (et
+    acquitte) en envoyant la dernière frame qu'il a décodée (-1 au départ).
+    """
+
+    def __init__(self, lot: int = LOT_DEFAUT):
+        self.lot = lot
+        self.etats = [None] * HISTORIQUE
+        self.frame = -1
+        # adresse -> [dernière frame acquittée, instant du dernier paquet reçu]
+        self.spectateurs = {}
+        self.transport = None
+        self.octets = 0
+        self.paquets = 0
+        self.references_distinctes = 0
+        self.diffusions = 0
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, donnees: bytes, adresse) -> None:
+        if len(donnees) >= 4:
+            (acquittee,) = struct.unpack_from(FORMAT_ACQUITTEMENT, donnees)
+            # Un spectateur qui redémarre repart de -1: on suit toujours son dernier acquittement
+            self.spectateurs[adresse] = [acquittee, time.monotonic()]
+
+    def publier(self, valeurs: tuple) -> None:
+        self.frame += 1
+        self.etats[self.frame % HISTORIQUE] = valeurs
+        if (self.frame + 1) % self.lot == 0:
+            self.diffuser()
+
+    def paquet(self, acquittee: int) -> bytes:
+        premiere = self.frame - self.lot + 1
+        # Référence utilisable: acquittée, antérieure au lot et encore dans l'historique
+        if not premiere - HISTORIQUE < acquittee < premiere:
+            acquittee = -1
+        base = self.etats[acquittee % HISTORIQUE] if acquittee >= 0 else ZERO
+        sortie = bytearray(struct.pack(FORMAT_PAQUET, PAQUET, acquittee, premiere, self.lot))
+        for frame in range(premiere, self.frame + 1):
+            valeurs = self.etats[frame % HISTORIQUE]
+            coder_delta(sortie, base, valeurs)
+            base = valeurs
+        return bytes(sortie)
+
+    def diffuser(self) -> None:
+        if not self.spectateurs or self.transport is None:
+            return
+        maintenant = time.monotonic()
+        paquets = {}
+        envoyer = self.transport.sendto
+        for adresse, (acquittee, contact) in list(self.spectateurs.items()):
+            if maintenant - contact > EXPIRATION:
+                del self.spectateurs[adresse]
+                continue
+            paquet = paquets.get(acquittee)
+            if paquet is None:
+                paquet = paquets[acquittee] = self.paquet(acquittee)
+            envoyer(paquet, adresse)
+            self.octets += len(paquet)
+            self.paquets += 1
+        self.references_distinctes += len(paquets)
+        self.diffusions += 1
+
+
+class Spectateur(asyncio.DatagramProtocol):
+    """
+    Client: décode les paquets, garde les états récents pour les deltas
+    suivants et acquitte la dernière frame décodée. Les frames décodées
+    s'accumulent dans `frames` (liste de (frame, valeurs)) pour l'affichage.
+    """
+
+    def __init__(self, decoder: bool = True):
+        self.decoder = decoder
+        self.etats = {}
+        self.derniere = -1
+        self.frames = []
+        self.transport = None
+        self.recus = 0
+        self.octets = 0
+        self.inutilisables = 0
+        self.relance = None
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+        self.relancer()
+
+    def connection_lost(self, exc) -> None:
+        if self.relance is not None:
+            self.relance.cancel()
+
+    def relancer(self) -> None:
+        """Se déclare, puis recommence tant qu'aucun paquet n'est arrivé (serveur pas encore prêt, perte)."""
+        self.relance = None
+        if self.recus or self.transport.is_closing():
+            return
+        self.acquitter()
+        self.relance = asyncio.get_running_loop().call_later(RELANCE, self.relancer)
+
+    def acquitter(self) -> None:
+        self.transport.sendto(struct.pack(FORMAT_ACQUITTEMENT, self.derniere))
+
+    def datagram_received(self, donnees: bytes, adresse) -> None:
+        if len(donnees) < TAILLE_ENTETE or donnees[0] != PAQUET:
+            return  # datagramme tronqué ou étranger
+        self.recus += 1
+        self.octets += len(donnees)
+        _, reference, premiere, nombre = struct.unpack_from(FORMAT_PAQUET, donnees)
+        if premiere + nombre - 1 <= self.derniere:
+            return  # paquet en retard, déjà dépassé
+        if not self.decoder:
+            # Client de charge "muet": acquitte sans décoder (voir --temoins)
+            self.derniere = premiere + nombre - 1
+            self.acquitter()
+            return
+        base = self.etats.get(reference) if reference >= 0 else ZERO
+        if base is None:
+            self.inutilisables += 1
+            return
+        position = TAILLE_ENTETE
+        decodees = []
+        try:
+            for frame in range(premiere, premiere + nombre):
+                base, position = decoder_delta(donnees, position, base)
+                decodees.append((frame, base))
+        except IndexError:
+            self.inutilisables += 1
+            return  # paquet tronqué
+        for frame, valeurs in decodees:
+            self.etats[frame] = valeurs
+        self.frames += decodees
+        self.derniere = premiere + nombre - 1
+        for ancienne in [f for f in self.etats if f <= self.derniere - HISTORIQUE]:
+            del self.etats[ancienne]
+        self.acquitter()
+
+
+def verifier_codec(frames: int = 3000, graine: int = 0) -> None:
+    """Code un vrai match avec des références prises au hasard et vérifie le décodage."""
+    match = Match(mode_ordinateur=True, niveau_ia="pro", niveau_ia_g="amateur", graine=graine)
+    alea = Alea(graine)
+    historique = [ZERO]
+    for _ in range(frames):
+        match.tick()
+        historique.append(quantifier(match))
+        base = alea.choice(historique[-HISTORIQUE:])
+        sortie = bytearray()
+        coder_delta(sortie, base, historique[-1])
+        decode, fin = decoder_delta(bytes(sortie), 0, base)
+        assert decode == historique[-1] and fin == len(sortie), (base, historique[-1], decode)
+
+
+async def servir(port: int, duree: float | None, lot: int, hote: str = "0.0.0.0", attendus: int = 0) -> Diffuseur:
+    """
+    Diffuse à 60 Hz un match IA contre IA (rejoué dès qu'il est terminé).
+    Avec `attendus`, `duree` ne court qu'une fois autant de spectateurs suivis
+    (au plus ATTENTE_CHARGE s d'attente); `diffuseur.complet` note alors le
+    tick, l'instant et les compteurs d'envoi de ce moment (None: jamais atteint).
+    """
+    boucle = asyncio.get_running_loop()
+    transport, diffuseur = await boucle.create_datagram_endpoint(lambda: Diffuseur(lot), local_addr=(hote, port))
+    match = Match(mode_ordinateur=True, niveau_ia="pro", niveau_ia_g="amateur")
+    durees_cpu = []
+    debut = prochaine = time.perf_counter()
+    complet = None if attendus else (0, debut, 0, 0)
+    while True:
+        maintenant = time.perf_counter()
+        if complet is None:
+            if len(diffuseur.spectateurs) >= attendus:
+                complet = (len(durees_cpu), maintenant, diffuseur.octets, diffuseur.paquets)
+            elif maintenant - debut > ATTENTE_CHARGE:
+                break
+        elif duree is not None and maintenant - complet[1] >= duree:
+            break
+        cpu = time.thread_time()
+        match.tick()
+        if match.termine:
+            match.reinitialiser()
+        diffuseur.publier(quantifier(match))
+        durees_cpu.append(time.thread_time() - cpu)
+        prochaine += 1 / FPS
+        await asyncio.sleep(max(0.0, prochaine - time.perf_counter()))
+    transport.close()
+    diffuseur.durees_cpu = durees_cpu
+    diffuseur.complet = complet
+    diffuseur.fin = time.perf_counter()
+    return diffuseur
+
+
+def spectateurs_de_charge(tache: tuple) -> dict:
+    """Processus de charge: `nombre` spectateurs UDP, dont une partie décode réellement."""
+    adresse, nombre, duree, temoins = tache
+
+    async def executer():
+        boucle = asyncio.get_running_loop()
+        clients = []
+        for i in range(nombre):
+            _, client = await boucle.create_datagram_endpoint(
+                lambda i=i: Spectateur(decoder=i % temoins == 0), remote_addr=adresse
+            )
+            clients.append(client)
+        # Jusqu'à l'arrêt de la diffusion (plus rien de reçu pendant une seconde) ou au plus `duree`
+        limite = time.monotonic() + duree
+        recus = 0
+        while time.monotonic() < limite:
+            await asyncio.sleep(1.0)
+            total = sum(c.recus for c in clients)
+            if total and total == recus:
+                break
+            recus = total
+        for client in clients:
+            client.transport.close()
+        decodeurs = [c for c in clients if c.decoder]
+        return {
+            "recus": sum(c.recus for c in clients),
+            "octets": sum(c.octets for c in clients),
+            "inutilisables": sum(c.inutilisables for c in clients),
+            "frames_decodees": sum(len(c.frames) for c in decodeurs),
+            "decodeurs": len(decodeurs),
+        }
+
+    return asyncio.run(executer())
+
+
+def essai_charge(spectateurs: int, duree: float, processus: int, lot: int, temoins: int, port: int) -> int:
+    """Renvoie 1 si le serveur n'a jamais suivi les `spectateurs` demandés (mesures alors sans objet)."""
+    verifier_codec()
+    taches = []
+    reste = spectateurs
+    for i in range(processus):
+        nombre = reste // (processus - i)
+        reste -= nombre
+        taches.append((("127.0.0.1", port), nombre, ATTENTE_CHARGE + duree + 2.0, temoins))
+    with Pool(processus) as pool:
+        resultats = pool.map_async(spectateurs_de_charge, taches)
+        diffuseur = asyncio.run(servir(port, duree, lot, hote="127.0.0.1", attendus=spectateurs))
+        resultats = resultats.get()
+
+    nombre = len(diffuseur.spectateurs)
+    if diffuseur.complet is None:
+        print(
+            f"ÉCHEC: {nombre} spectateurs suivis par le serveur sur {spectateurs} après {ATTENTE_CHARGE:.0f} s,"
+            " aucune mesure"
+        )
+        return 1
+    # Mesures à partir du moment où tous les spectateurs sont suivis (connexions exclues)
+    tick, debut, octets, paquets = diffuseur.complet
+    cpu = sorted(diffuseur.durees_cpu[tick:])
+    duree_mesure = diffuseur.fin - debut
+    octets = diffuseur.octets - octets
+    paquets = diffuseur.paquets - paquets
+    recus = sum(r["recus"] for r in resultats)
+    frames_decodees = sum(r["frames_decodees"] for r in resultats)
+    decodeurs = sum(r["decodeurs"] for r in resultats)
+    print(f"{nombre} spectateurs suivis par le serveur, lots de {lot} frames, {duree_mesure:.1f} s de mesure")
+    print(
+        f"CPU serveur par tick (simulation + diffusion): moyenne {sum(cpu) / len(cpu) * 1000:.3f} ms,"
+        f" p99 {cpu[int(0.99 * len(cpu))] * 1000:.3f} ms (budget {1000 / FPS:.1f} ms)"
+    )
+    print(
+        f"Débit par spectateur: {octets / max(nombre, 1) / duree_mesure:.0f} o/s,"
+        f" {paquets / max(nombre, 1) / duree_mesure:.1f} paquets/s"
+        f" ({octets / max(paquets, 1):.1f} o/paquet)"
+    )
+    print(
+        f"Codages par diffusion: {diffuseur.references_distinctes / max(diffuseur.diffusions, 1):.2f}"
+        f" (au lieu de {nombre})"
+    )
+    print(
+        f"Reçus par les spectateurs: {recus} paquets sur {diffuseur.paquets} envoyés;"
+        f" {decodeurs} témoins ont décodé {frames_decodees} frames"
+        f" ({sum(r['inutilisables'] for r in resultats)} paquets sans référence)"
+    )
+    return 0
+
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(description="Diffusion d'un match aux spectateurs")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+    serveur = commandes.add_parser("serveur", help="Diffuser un match IA contre IA")
+    serveur.add_argument("--port", type=int, default=7200)
+    serveur.add_argument("--lot", type=int, default=LOT_DEFAUT, help="Frames par paquet")
+    charge = commandes.add_parser("charge", help="Mesurer le serveur face à de nombreux spectateurs locaux")
+    charge.add_argument("--spectateurs", type=int, default=1000)
+    charge.add_argument("--duree", type=float, default=10.0)
+    charge.add_argument("--processus", type=int, default=max(1, min(8, os.cpu_count() or 1)))
+    charge.add_argument("--lot", type=int, default=LOT_DEFAUT)
+    charge.add_argument("--temoins", type=int, default=10, help="Un spectateur sur N décode réellement")
+    charge.add_argument("--port", type=int, default=7200)
+    args = parser.parse_args(arguments)
+
+    if args.commande == "serveur":
+        asyncio.run(servir(args.port, None, args.lot))
+    else:
+        return essai_charge(args.spectateurs, args.duree, args.processus, args.lot, args.temoins, args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
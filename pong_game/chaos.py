@@ -0,0 +1,309 @@
+"""
+Mode chaos: des dizaines à des centaines de balles en jeu en même temps.
+
+Chaque balle rebondit sur les murs, les raquettes et les autres balles. La
+phase large passe par une grille uniforme (hachage spatial) sur le terrain:
+seules les balles qui partagent une cellule sont testées entre elles, et
+seules celles proches d'une raquette passent par `collision_raquette`
+(phase fine). Sans grille, le test de toutes les paires est en O(n²).
+
+    python -m pong_game.chaos --balles 10 50 100 200 400
+"""
+
+import argparse
+import math
+import struct
+import sys
+import time
+
+from .config import LARGEUR_ECRAN, HAUTEUR_ECRAN, BAL_V_INIT
+from .simulation import Match, Evenement, DEPLACEMENT_MAX_SOUS_PAS, POINT, VICTOIRE
+
+# Collision entre deux balles (joue le son de rebond côté front-end)
+CHOC = "choc"
+
+# Côté d'une cellule de la grille: deux tailles de balle
+CELLULE = 16
+# Vitesse horizontale minimale après un choc entre balles, pour que le jeu avance
+VX_MIN = BAL_V_INIT * 0.5
+FPS = 60
+
+
+class GrilleSpatiale:
+    """
+    Hachage spatial uniforme: chaque balle est rangée dans toutes les
+    cellules que couvre sa boîte. La grille est vidée et remplie à chaque
+    pas; deux balles ne peuvent se toucher que si elles partagent une cellule.
+    """
+
+    def __init__(self, largeur: int = LARGEUR_ECRAN, hauteur: int = HAUTEUR_ECRAN, cellule: int = CELLULE):
+        self.cellule = cellule
+        self.colonnes = math.ceil(largeur / cellule)
+        self.lignes = math.ceil(hauteur / cellule)
+        # Indice de cellule -> indices des balles qui la couvrent
+        self.cases = {}
+
+    def plage(self, x1: float, y1: float, x2: float, y2: float) -> tuple:
+        """Cellules couvertes par une boîte, bornées au terrain."""
+        c = self.cellule
+        cx1 = min(max(int(x1 // c), 0), self.colonnes - 1)
+        cx2 = min(max(int(x2 // c), 0), self.colonnes - 1)
+        cy1 = min(max(int(y1 // c), 0), self.lignes - 1)
+        cy2 = min(max(int(y2 // c), 0), self.lignes - 1)
+        return cx1, cy1, cx2, cy2
+
+    def remplir(self, balles: list) -> None:
+        self.cases.clear()
+        cases = self.cases
+        colonnes = self.colonnes
+        for indice, balle in enumerate(balles):
+            cx1, cy1, cx2, cy2 = self.plage(balle.x, balle.y, balle.x + balle.t, balle.y + balle.t)
+            for cy in range(cy1, cy2 + 1):
+                for cx in range(cx1, cx2 + 1):
+                    cle = cy * colonnes + cx
+                    case = cases.get(cle)
+                    if case is None:
+                        cases[cle] = [indice]
+                    else:
+                        case.append(indice)
+
+    def paires(self) -> set:
+        """Paires (i, j), i < j, de balles partageant au moins une cellule."""
+        paires = set()
+        for case in self.cases.values():
+            if len(case) > 1:
+                for a in range(len(case) - 1):
+                    i = case[a]
+                    for j in case[a + 1 :]:
+                        paires.add((i, j) if i < j else (j, i))
+        return paires
+
+    def requete(self, x1: float, y1: float, x2: float, y2: float) -> set:
+        """Indices des balles rangées dans les cellules d'une boîte."""
+        cx1, cy1, cx2, cy2 = self.plage(x1, y1, x2, y2)
+        trouvees = set()
+        for cy in range(cy1, cy2 + 1):
+            base = cy * self.colonnes
+            for cx in range(cx1, cx2 + 1):
+                case = self.cases.get(base + cx)
+                if case:
+                    trouvees.update(case)
+        return trouvees
+
+
+def choc_balles(a, b) -> bool:
+    """Choc élastique entre deux balles de même masse (disques de diamètre `t`)."""
+    dx = b.x - a.x
+    dy = b.y - a.y
+    distance2 = dx * dx + dy * dy
+    t = a.t
+    if distance2 >= t * t:
+        return False
+    if distance2 == 0:
+        dx, distance = 1.0, 1.0
+    else:
+        distance = math.sqrt(distance2)
+    nx, ny = dx / distance, dy / distance
+
+    # Séparation: chaque balle recule de la moitié du recouvrement
+    recouvrement = (t - distance) / 2
+    a.x -= nx * recouvrement
+    a.y -= ny * recouvrement
+    b.x += nx * recouvrement
+    b.y += ny * recouvrement
+
+    vitesse_normale = (b.vx - a.vx) * nx + (b.vy - a.vy) * ny
+    if vitesse_normale >= 0:
+        return False  # déjà en train de s'écarter
+    # Masses égales: échange des composantes normales
+    a.vx += vitesse_normale * nx
+    a.vy += vitesse_normale * ny
+    b.vx -= vitesse_normale * nx
+    b.vy -= vitesse_normale * ny
+    for balle in (a, b):
+        if abs(balle.vx) < VX_MIN:
+            balle.vx = VX_MIN if balle.vx >= 0 else -VX_MIN
+        vitesse = math.hypot(balle.vx, balle.vy)
+        if vitesse > balle.vitesse_max:
+            balle.vx *= balle.vitesse_max / vitesse
+            balle.vy *= balle.vitesse_max / vitesse
+        balle.trajectoire += 1
+    return True
+
+
+class MatchChaos(Match):
+    """
+    Un `Match` avec `nombre_balles` balles. `balle` reste la première, les
+    autres suivent dans `balles`; chaque IA suit la balle qui l'atteindra en
+    premier. `grille=False` teste toutes les paires (comparaison).
+    """
+
+    def __init__(self, nombre_balles: int = 50, grille: bool = True, score_max: int = 99, **options):
+        self.nombre_balles = nombre_balles
+        self.grille = GrilleSpatiale() if grille else None
+        self.balles = []
+        # Paires de balles testées au dernier pas (mesure de la phase large)
+        self.paires_testees = 0
+        super().__init__(score_max=score_max, **options)
+        # Un bloc "balle" par balle dans l'instantané
+        self.STRUCT_INSTANTANE = struct.Struct(
+            self.FORMAT_ENTETE + self.FORMAT_BALLE * nombre_balles + self.FORMAT_RAQUETTE * 2
+        )
+        self.TAILLE_INSTANTANE = self.STRUCT_INSTANTANE.size
+
+    def creer_entites(self):
+        super().creer_entites()
+        self.balles = [self.balle]
+        for _ in range(1, self.nombre_balles):
+            balle = self.classe_balle(rng=self.rng_balle, vitesse_max=self.vitesse_max_balle)
+            self.disperser(balle)
+            self.balles.append(balle)
+
+    def disperser(self, balle) -> None:
+        """Remise en jeu au centre, à une hauteur aléatoire (les balles ne s'empilent pas)."""
+        balle.y = balle.rng.uniform(0, HAUTEUR_ECRAN - balle.t)
+        balle.x_precedent, balle.y_precedent = balle.x, balle.y
+
+    def cible(self, raq):
+        """Balle qui atteindra la raquette en premier (la plus proche s'il n'y en a pas)."""
+        a_droite = raq.x > LARGEUR_ECRAN / 2
+        meilleure, delai_min = None, math.inf
+        for balle in self.balles:
+            vx = balle.vx if a_droite else -balle.vx
+            if vx > 0:
+                delai = abs(raq.x - balle.x) / vx
+                if delai < delai_min:
+                    meilleure, delai_min = balle, delai
+        return meilleure or min(self.balles, key=lambda balle: abs(raq.x - balle.x))
+
+    def tick(self, entree_g: int = 0, entree_d: int = 0, dt: float = 1.0) -> list:
+        evenements = []
+        # Une raquette humaine n'a pas besoin de cible (recherche en O(n))
+        self.raq_g.maj(entree_g, self.cible(self.raq_g) if self.niveau_ia_g is not None else None, dt)
+        self.raq_d.maj(entree_d, self.cible(self.raq_d) if self.mode_ordinateur else None, dt)
+
+        vx_max = max(abs(balle.vx) for balle in self.balles)
+        sous_pas = max(1, math.ceil(vx_max * dt / DEPLACEMENT_MAX_SOUS_PAS))
+        for _ in range(sous_pas):
+            self.pas(evenements, dt / sous_pas)
+
+        self.frame += 1
+        return evenements
+
+    def pas(self, evenements: list, dt: float) -> None:
+        balles = self.balles
+        for balle in balles:
+            balle.maj(evenements, dt)
+
+        if self.grille is not None:
+            self.grille.remplir(balles)
+            paires = self.grille.paires()
+        else:
+            n = len(balles)
+            paires = [(i, j) for i in range(n - 1) for j in range(i + 1, n)]
+        self.paires_testees = len(paires)
+        for i, j in paires:
+            if choc_balles(balles[i], balles[j]):
+                evenements.append(Evenement(CHOC))
+
+        # Raquettes: balles proches seulement (marge = course d'un pas, pour le test balayé)
+        for raq in (self.raq_g, self.raq_d):
+            if self.grille is not None:
+                marge = self.vitesse_max_balle * dt
+                candidates = sorted(
+                    self.grille.requete(raq.x - marge, raq.y, raq.x + raq.w + marge, raq.y + raq.h)
+                )
+            else:
+                candidates = range(len(balles))
+            for indice in candidates:
+                balles[indice].collision_raquette(raq, evenements)
+
+        for balle in balles:
+            self.marquer_balle(balle, evenements)
+
+    def marquer_balle(self, balle, evenements: list) -> None:
+        if balle.x + balle.t < 0:
+            cote = "droite"
+        elif balle.x > LARGEUR_ECRAN:
+            cote = "gauche"
+        else:
+            return
+        deja_termine = self.termine
+        if cote == "droite":
+            self.score_d += 1
+        else:
+            self.score_g += 1
+        evenements.append(Evenement(POINT, cote))
+        balle.reset(direction_aleatoire=True)
+        self.disperser(balle)
+        if self.termine and not deja_termine:
+            evenements.append(Evenement(VICTOIRE, cote))
+
+    def capturer(self) -> tuple:
+        etat = (self.frame, self.score_g, self.score_d)
+        for balle in self.balles:
+            etat += balle.capturer()
+        return etat + self.raq_g.capturer() + self.raq_d.capturer()
+
+    def restaurer(self, valeurs) -> None:
+        self.frame, self.score_g, self.score_d = valeurs[:3]
+        position = 3
+        for balle in self.balles:
+            balle.restaurer(valeurs[position : position + 9])
+            position += 9
+        self.raq_g.restaurer(valeurs[position : position + 12])
+        self.raq_d.restaurer(valeurs[position + 12 : position + 24])
+
+    def reinitialiser(self) -> None:
+        super().reinitialiser()
+        for balle in self.balles[1:]:
+            balle.reset(direction_aleatoire=True)
+            self.disperser(balle)
+
+
+def mesurer(nombre_balles: int, frames: int, grille: bool = True, graine: int = 1) -> dict:
+    """Durées de tick (IA contre IA) après une seconde d'échauffement."""
+    match = MatchChaos(
+        nombre_balles, grille=grille, mode_ordinateur=True, niveau_ia="pro", niveau_ia_g="pro", graine=graine
+    )
+    for _ in range(FPS):
+        match.tick()
+    durees = []
+    paires = 0
+    for _ in range(frames):
+        debut = time.perf_counter()
+        match.tick()
+        durees.append(time.perf_counter() - debut)
+        paires += match.paires_testees
+    durees.sort()
+    moyenne = sum(durees) / frames
+    return {
+        "moyenne_ms": moyenne * 1000,
+        "p99_ms": durees[int(0.99 * frames)] * 1000,
+        "fps": 1 / moyenne,
+        "paires": paires / frames,
+    }
+
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(description="Coût d'une frame du mode chaos selon le nombre de balles")
+    parser.add_argument("--balles", type=int, nargs="+", default=[10, 50, 100, 200, 400])
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--force-brute", action="store_true", help="Comparer avec le test de toutes les paires")
+    args = parser.parse_args(arguments)
+
+    print("Simulation seule (sans dessin), IA contre IA. fps = frames simulables par seconde.")
+    entete = f"{'balles':>7}{'moyenne':>11}{'p99':>11}{'fps':>9}{'paires/pas':>12}"
+    print(entete + ("  force brute" if args.force_brute else ""))
+    for nombre in args.balles:
+        r = mesurer(nombre, args.frames)
+        ligne = f"{nombre:>7}{r['moyenne_ms']:>9.2f}ms{r['p99_ms']:>9.2f}ms{r['fps']:>9.0f}{r['paires']:>12.1f}"
+        if args.force_brute:
+            brute = mesurer(nombre, max(args.frames // 10, 10), grille=False)
+            ligne += f"  {brute['moyenne_ms']:.2f} ms, {brute['fps']:.0f} fps, {brute['paires']:.0f} paires"
+        print(ligne, flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,8 @@
-import pyxel
-
 # =========================
 # Constantes de configuration
 # =========================
+import os
+
 LARGEUR_ECRAN = 480
 HAUTEUR_ECRAN = 360
 COULEUR_FOND = 0
@@ -19,16 +19,32 @@ BAL_V_INIT = 3.2
 # Scores
 SCORE_MAX = 9
 
-# Touches (AZERTY)
-TOUCHES = {
-    "gauche_haut": pyxel.KEY_Z,
-    "gauche_bas": pyxel.KEY_S,
-    "droite_haut": pyxel.KEY_O,
-    "droite_bas": pyxel.KEY_L,
-    "reset": pyxel.KEY_R,
-    "pause": pyxel.KEY_P,
-    "quitter": pyxel.KEY_Q,
-    "entree": pyxel.KEY_RETURN,
-    "haut": pyxel.KEY_UP,
-    "bas": pyxel.KEY_DOWN,
+# Fichiers recalculables (sons compilés, calibrage des IA...)
+DOSSIER_CACHE = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "pong_game")
+
+# Touches (AZERTY): noms des constantes pyxel, résolus au premier accès à
+# TOUCHES pour que la configuration s'importe sans charger pyxel
+NOMS_TOUCHES = {
+    "gauche_haut": "KEY_Z",
+    "gauche_bas": "KEY_S",
+    "droite_haut": "KEY_O",
+    "droite_bas": "KEY_L",
+    "reset": "KEY_R",
+    "pause": "KEY_P",
+    "quitter": "KEY_Q",
+    "entree": "KEY_RETURN",
+    "haut": "KEY_UP",
+    "bas": "KEY_DOWN",
+    "profil": "KEY_F1",
+    "export_profil": "KEY_F2",
 }
+
+
+def __getattr__(nom: str):
+    if nom == "TOUCHES":
+        import pyxel
+
+        global TOUCHES
+        TOUCHES = {action: getattr(pyxel, cle) for action, cle in NOMS_TOUCHES.items()}
+        return TOUCHES
+    raise AttributeError(f"module {__name__!r} has no attribute {nom!r}")
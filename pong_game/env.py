@@ -0,0 +1,184 @@
+"""
+Environnement d'apprentissage par renforcement, vectorisé, à la manière de Gym.
+
+`EnvironnementLot` joue N matchs à la fois sur `MoteurLot` (batch.py), sans
+pyxel: l'agent tient la raquette gauche, contre une IA `SmartComputer` d'un
+niveau donné ou contre un second agent (raquette droite).
+
+    env = EnvironnementLot(4096, adversaire="pro")
+    observations, infos = env.reset(graines=range(4096))
+    observations, recompenses, termines, tronques, infos = env.step(actions)
+
+Les actions sont les entrées du jeu: -1 monter, 0 rester, +1 descendre
+(des valeurs intermédiaires donnent un déplacement partiel). La récompense
+vaut +1 quand l'agent marque, -1 quand il encaisse. Une voie terminée
+(match gagné ou `frames_max` atteint) est remise à zéro dans le même appel:
+l'observation renvoyée est alors la première de l'épisode suivant, et le
+score final est dans `infos`. Les tableaux renvoyés sont préalloués et
+réécrits à chaque appel: les copier pour les conserver.
+
+    python -m pong_game.env --voies 4096 --adversaire pro
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from .batch import MoteurLot
+from .config import LARGEUR_ECRAN, HAUTEUR_ECRAN, BAL_V_INIT, SCORE_MAX
+
+# Colonnes d'une observation, vues du côté de l'agent (le côté droit est
+# mis en miroir: chaque agent se voit à gauche, balle arrivant par vx < 0)
+CHAMPS_OBSERVATION = ("balle_x", "balle_y", "balle_vx", "balle_vy", "effet_y", "raquette_y", "adversaire_y")
+NB_OBSERVATIONS = len(CHAMPS_OBSERVATION)
+# Normalisation des vitesses (vitesse maximale de la balle)
+ECHELLE_VITESSE = BAL_V_INIT * 2.5
+
+
+class EnvironnementLot:
+    """
+    `adversaire`: niveau de l'IA droite ("debutant", "amateur", "pro"), ou
+    None pour deux agents: les actions ont alors la forme (n, 2) et les
+    observations et récompenses une dimension de plus (agent gauche, droit).
+    """
+
+    def __init__(
+        self,
+        n: int,
+        adversaire: str | None = "amateur",
+        parametres_adversaire: dict | None = None,
+        score_max: int = SCORE_MAX,
+        frames_max: int | None = None,
+        dtype=np.float32,
+    ):
+        self.n = n
+        self.adversaire = adversaire
+        self.parametres_adversaire = parametres_adversaire
+        self.score_max = score_max
+        self.frames_max = frames_max
+        self.agents = 1 if adversaire is not None else 2
+        forme = (n,) if self.agents == 1 else (n, 2)
+        self.observations = np.zeros(forme + (NB_OBSERVATIONS,), dtype=dtype)
+        self.recompenses = np.zeros(forme, dtype=dtype)
+        self.termines = np.zeros(n, dtype=bool)
+        self.tronques = np.zeros(n, dtype=bool)
+        self.frames_episode = np.zeros(n, dtype=np.int64)
+        self.lot = None
+        self.reset()
+
+    def reset(self, graines=None) -> tuple:
+        """Nouveaux épisodes sur toutes les voies (graines aléatoires par défaut)."""
+        if graines is not None:
+            graines = np.fromiter((int(g) for g in graines), dtype=np.uint64, count=self.n)
+        self.lot = MoteurLot(
+            self.n,
+            mode_ordinateur=self.adversaire is not None,
+            niveau_ia=self.adversaire or "amateur",
+            score_max=self.score_max,
+            graines=graines,
+            parametres_ia=self.parametres_adversaire,
+        )
+        self.frames_episode[:] = 0
+        self.observer()
+        return self.observations, {}
+
+    def step(self, actions) -> tuple:
+        lot = self.lot
+        actions = np.clip(actions, -1, 1)
+        if self.agents == 1:
+            points = lot.etape(actions, None)
+            np.copyto(self.recompenses, points, casting="unsafe")
+        else:
+            points = lot.etape(actions[:, 0], actions[:, 1])
+            np.copyto(self.recompenses[:, 0], points, casting="unsafe")
+            np.negative(self.recompenses[:, 0], out=self.recompenses[:, 1])
+
+        self.frames_episode += 1
+        np.copyto(self.termines, lot.termine)
+        if self.frames_max is not None:
+            np.greater_equal(self.frames_episode, self.frames_max, out=self.tronques)
+            self.tronques &= ~self.termines
+        finis = self.termines | self.tronques
+
+        infos = {}
+        if finis.any():
+            voies = np.flatnonzero(finis)
+            infos = {
+                "voies": voies,
+                "score_g": lot.score_g[voies].copy(),
+                "score_d": lot.score_d[voies].copy(),
+                "frames": self.frames_episode[voies].copy(),
+            }
+            lot.reinitialiser(finis)
+            self.frames_episode[finis] = 0
+        self.observer()
+        return self.observations, self.recompenses, self.termines, self.tronques, infos
+
+    def observer(self) -> None:
+        if self.agents == 1:
+            self.remplir(self.observations, self.lot.g, self.lot.d, miroir=False)
+        else:
+            self.remplir(self.observations[:, 0], self.lot.g, self.lot.d, miroir=False)
+            self.remplir(self.observations[:, 1], self.lot.d, self.lot.g, miroir=True)
+
+    def remplir(self, obs: np.ndarray, propre, adverse, miroir: bool) -> None:
+        lot = self.lot
+        if miroir:
+            np.subtract(LARGEUR_ECRAN - lot.t, lot.x, out=obs[:, 0], casting="unsafe")
+            obs[:, 0] /= LARGEUR_ECRAN
+            np.multiply(lot.vx, -1 / ECHELLE_VITESSE, out=obs[:, 2], casting="unsafe")
+        else:
+            np.multiply(lot.x, 1 / LARGEUR_ECRAN, out=obs[:, 0], casting="unsafe")
+            np.multiply(lot.vx, 1 / ECHELLE_VITESSE, out=obs[:, 2], casting="unsafe")
+        np.multiply(lot.y, 1 / HAUTEUR_ECRAN, out=obs[:, 1], casting="unsafe")
+        np.multiply(lot.vy, 1 / ECHELLE_VITESSE, out=obs[:, 3], casting="unsafe")
+        np.multiply(lot.effet_y, 1 / ECHELLE_VITESSE, out=obs[:, 4], casting="unsafe")
+        # Centre des raquettes
+        np.multiply(propre.y + propre.h / 2, 1 / HAUTEUR_ECRAN, out=obs[:, 5], casting="unsafe")
+        np.multiply(adverse.y + adverse.h / 2, 1 / HAUTEUR_ECRAN, out=obs[:, 6], casting="unsafe")
+
+
+def politique_suiveuse(observations: np.ndarray) -> np.ndarray:
+    """Référence simple: la raquette suit la hauteur de la balle."""
+    ecart = observations[..., 1] - observations[..., 5]
+    return np.sign(ecart) * (np.abs(ecart) > 0.02)
+
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(description="Débit de l'environnement d'apprentissage vectorisé")
+    parser.add_argument("--voies", type=int, default=4096)
+    parser.add_argument("--pas", type=int, default=600)
+    parser.add_argument("--adversaire", default="pro", help="debutant, amateur, pro ou aucun (deux agents)")
+    parser.add_argument("--graine", type=int, default=0)
+    args = parser.parse_args(arguments)
+
+    adversaire = None if args.adversaire == "aucun" else args.adversaire
+    alea = np.random.default_rng(args.graine)
+    forme = (args.voies,) if adversaire else (args.voies, 2)
+    for nom, politique in (
+        ("aléatoire", lambda obs: alea.integers(-1, 2, size=forme)),
+        ("suiveuse", politique_suiveuse),
+    ):
+        env = EnvironnementLot(args.voies, adversaire=adversaire)
+        observations, _ = env.reset(graines=range(args.graine, args.graine + args.voies))
+        gagnes = perdus = episodes = 0
+        debut = time.perf_counter()
+        for _ in range(args.pas):
+            observations, recompenses, termines, tronques, infos = env.step(politique(observations))
+            gain = recompenses if adversaire else recompenses[:, 0]
+            gagnes += int((gain > 0).sum())
+            perdus += int((gain < 0).sum())
+            episodes += len(infos.get("voies", ()))
+        duree = time.perf_counter() - debut
+        pas = args.voies * args.pas
+        print(
+            f"{nom:<10} {pas / duree / 1e6:6.2f} M pas/s ({pas / duree * 60 / 1e6:.0f} M/min, politique comprise),"
+            f" points marqués {gagnes}, encaissés {perdus}, épisodes terminés {episodes}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+"""
+États de l'écran de jeu (`JeuPong.etat`), sans dépendance à pyxel pour que
+les modules headless (diffusion aux spectateurs...) puissent les utiliser.
+"""
+
+from enum import Enum
+
+
+class Etat(Enum):
+    MENU = "menu"
+    DIFFICULTE = "difficulte"
+    # Musique de transition avant la partie, l'écran d'origine reste affiché
+    FONDU = "fondu"
+    JEU = "jeu"
+    VICTOIRE = "victoire"
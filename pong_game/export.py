@@ -0,0 +1,377 @@
+"""
+Export d'un replay en GIF animé ou en vidéo, sans fenêtre et plus vite que
+le temps réel.
+
+Le replay est rejoué et redessiné hors écran par le code d'affichage du jeu
+(`dessiner_replay`, donc `dessiner_jeu` et `Balle.dessiner`), avec le pilote
+SDL "offscreen". Chaque processus du pool prend une plage d'images: il saute
+au début de sa plage (`Lecteur.aller_a`, en temps constant), puis encode ses
+images une à une dans un fichier de segment. Les segments sont recollés dans
+l'ordre à la fin; aucune étape ne garde le match entier en mémoire.
+
+- GIF: encodeur intégré. Chaque image ne contient que le rectangle qui a
+  changé depuis la précédente, les pixels inchangés étant transparents, et
+  les images identiques allongent simplement la durée de la précédente.
+- Autres extensions (.mp4, .webm...): images RGB brutes envoyées à ffmpeg,
+  un ffmpeg par segment, puis concaténation sans réencodage.
+
+    python -m pong_game.export partie.pongrep partie.gif --debut 60 --fin 90
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from .config import LARGEUR_ECRAN, HAUTEUR_ECRAN
+from .replay import Lecteur
+
+FPS = 60
+# Index de palette réservé à la transparence (la palette de pyxel en a 16)
+TRANSPARENT = 16
+# Palette GIF de 32 entrées: 16 couleurs de pyxel, la transparence, du vide
+TAILLE_PALETTE = 32
+TAILLE_CODE_MIN = 5
+BOUCLE_INFINIE = b"\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00"
+FIN_GIF = b"\x3b"
+# Segments par processus, pour équilibrer la charge entre les plages
+SEGMENTS_PAR_PROCESSUS = 4
+
+
+def lzw(pixels: bytes, taille_min: int = TAILLE_CODE_MIN) -> bytes:
+    """
+    Compression LZW au format GIF (codes de largeur variable, poids faible
+    d'abord). Les longues plages d'un même index (surtout la transparence)
+    avancent d'une entrée de dictionnaire à la fois au lieu d'un pixel: la
+    sortie est identique à celle de l'algorithme pixel par pixel.
+    """
+    effacement = 1 << taille_min
+    fin = effacement + 1
+    largeur = taille_min + 1
+    suivant = fin + 1
+    # Entrées du dictionnaire indexées par (code préfixe << 8) | pixel
+    table = {}
+    # Codes des plages connues: plages[p][k] = code de k + 1 fois le pixel p
+    plages = [[p] for p in range(256)]
+    sortie = bytearray()
+    tampon = effacement
+    bits = largeur
+
+    # Fin de la plage d'index identiques qui contient chaque position
+    valeurs = np.frombuffer(pixels, dtype=np.uint8)
+    bornes = np.append(np.flatnonzero(valeurs[1:] != valeurs[:-1]) + 1, len(pixels))
+    fins = np.repeat(bornes, np.diff(bornes, prepend=0)).tolist()
+
+    n = len(pixels)
+    i = 0
+    while True:
+        # Début d'une nouvelle chaîne au pixel i
+        pixel = pixels[i]
+        plage = plages[pixel]
+        longueur = fins[i] - i
+        while longueur > len(plage):
+            # La plage dépasse la plus longue connue: on l'émet et on l'allonge d'un pixel
+            code = plage[-1]
+            i += len(plage)
+            longueur -= len(plage)
+            tampon |= code << bits
+            bits += largeur
+            while bits >= 8:
+                sortie.append(tampon & 0xFF)
+                tampon >>= 8
+                bits -= 8
+            if suivant < 4096:
+                table[(code << 8) | pixel] = suivant
+                plage.append(suivant)
+                if suivant == 1 << largeur and largeur < 12:
+                    largeur += 1
+                suivant += 1
+            else:
+                tampon |= effacement << bits
+                bits += largeur
+                table.clear()
+                plages = [[p] for p in range(256)]
+                plage = plages[pixel]
+                largeur = taille_min + 1
+                suivant = fin + 1
+        code = plage[longueur - 1]
+        i += longueur
+
+        # Suite de la chaîne pixel par pixel
+        while i < n:
+            pixel = pixels[i]
+            existant = table.get((code << 8) | pixel)
+            if existant is None:
+                break
+            code = existant
+            i += 1
+
+        tampon |= code << bits
+        bits += largeur
+        while bits >= 8:
+            sortie.append(tampon & 0xFF)
+            tampon >>= 8
+            bits -= 8
+        if i == n:
+            break
+        if suivant < 4096:
+            table[(code << 8) | pixel] = suivant
+            if code == plages[pixel][-1]:
+                plages[pixel].append(suivant)
+            if suivant == 1 << largeur and largeur < 12:
+                largeur += 1
+            suivant += 1
+        else:
+            # Dictionnaire plein: on repart de zéro
+            tampon |= effacement << bits
+            bits += largeur
+            table.clear()
+            plages = [[p] for p in range(256)]
+            largeur = taille_min + 1
+            suivant = fin + 1
+
+    tampon |= fin << bits
+    bits += largeur
+    while bits > 0:
+        sortie.append(tampon & 0xFF)
+        tampon >>= 8
+        bits -= 8
+    return bytes(sortie)
+
+
+def sous_blocs(donnees: bytes) -> bytes:
+    """Découpe en sous-blocs GIF (un octet de longueur, au plus 255 octets), puis bloc vide."""
+    morceaux = [donnees[i : i + 255] for i in range(0, len(donnees), 255)]
+    return b"".join(bytes((len(m),)) + m for m in morceaux) + b"\0"
+
+
+def entete_gif(couleurs: list[int]) -> bytes:
+    palette = bytearray()
+    for couleur in couleurs[:TRANSPARENT]:
+        palette += couleur.to_bytes(3, "big")
+    palette += bytes(3 * (TAILLE_PALETTE - TRANSPARENT))
+    # Palette globale de 2^(4 + 1) entrées, 8 bits par composante
+    descripteur = struct.pack("<HHBBB", LARGEUR_ECRAN, HAUTEUR_ECRAN, 0xF4, 0, 0)
+    return b"GIF89a" + descripteur + bytes(palette) + BOUCLE_INFINIE
+
+
+def image_gif(pixels: np.ndarray, x: int, y: int, delai: int, transparence: bool) -> bytes:
+    """Bloc d'une image: extension de contrôle (délai en 1/100 s), descripteur, données LZW."""
+    # Méthode de disposition 1: l'image reste affichée sous la suivante
+    controle = struct.pack("<BHBB", (1 << 2) | transparence, delai, TRANSPARENT, 0)
+    hauteur, largeur = pixels.shape
+    return (
+        b"\x21\xf9\x04"
+        + controle
+        + b"\x2c"
+        + struct.pack("<HHHHB", x, y, largeur, hauteur, 0)
+        + bytes((TAILLE_CODE_MIN,))
+        + sous_blocs(lzw(pixels.tobytes()))
+    )
+
+
+def delai(image: int, pas: int) -> int:
+    """Durée de l'image `image` en 1/100 s, arrondie sans dérive sur la durée totale."""
+    return round((image + 1) * pas * 100 / FPS) - round(image * pas * 100 / FPS)
+
+
+class SegmentGif:
+    def __init__(self, chemin: str, pas: int):
+        self.fichier = open(chemin, "wb")
+        self.pas = pas
+        self.precedente = None
+        # Dernière image encodée, écrite seulement quand sa durée est connue
+        self.en_attente = None
+
+    def ajouter(self, pixels: np.ndarray, image: int) -> None:
+        if self.precedente is None:
+            self.en_attente = [pixels.copy(), 0, 0, delai(image, self.pas), False]
+            self.precedente = pixels.copy()
+            return
+        change = pixels != self.precedente
+        lignes = np.flatnonzero(change.any(axis=1))
+        if not lignes.size:
+            self.en_attente[3] += delai(image, self.pas)
+            return
+        colonnes = np.flatnonzero(change.any(axis=0))
+        y0, y1, x0, x1 = lignes[0], lignes[-1] + 1, colonnes[0], colonnes[-1] + 1
+        rectangle = np.where(change[y0:y1, x0:x1], pixels[y0:y1, x0:x1], TRANSPARENT).astype(np.uint8)
+        self.vider()
+        self.en_attente = [rectangle, int(x0), int(y0), delai(image, self.pas), True]
+        np.copyto(self.precedente, pixels)
+
+    def vider(self) -> None:
+        if self.en_attente is not None:
+            self.fichier.write(image_gif(*self.en_attente))
+            self.en_attente = None
+
+    def fermer(self) -> None:
+        self.vider()
+        self.fichier.close()
+
+
+class SegmentVideo:
+    def __init__(self, chemin: str, pas: int):
+        # Index de couleur -> RGB, appliqué à l'image entière d'un coup
+        self.rgb = np.array([[c >> 16, (c >> 8) & 0xFF, c & 0xFF] for c in couleurs_pyxel()], dtype=np.uint8)
+        entree = ["-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{LARGEUR_ECRAN}x{HAUTEUR_ECRAN}"]
+        self.ffmpeg = subprocess.Popen(
+            ["ffmpeg", "-loglevel", "error", "-y", *entree, "-framerate", str(FPS / pas), "-i", "-"]
+            + ["-pix_fmt", "yuv420p", chemin],
+            stdin=subprocess.PIPE,
+        )
+
+    def ajouter(self, pixels: np.ndarray, image: int) -> None:
+        self.ffmpeg.stdin.write(self.rgb[pixels].tobytes())
+
+    def fermer(self) -> None:
+        self.ffmpeg.stdin.close()
+        if self.ffmpeg.wait():
+            raise RuntimeError("ffmpeg a échoué")
+
+
+def couleurs_pyxel() -> list[int]:
+    import pyxel
+
+    return list(pyxel.colors)[:TRANSPARENT]
+
+
+def initialiser_rendu() -> None:
+    """Initialisation de pyxel hors écran, une fois par processus."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "offscreen")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    # Sans cela SDL intercepte SIGTERM et le pool ne peut plus arrêter ses processus
+    os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")
+    import pyxel
+
+    pyxel.init(LARGEUR_ECRAN, HAUTEUR_ECRAN)
+
+
+def rendre_segment(tache: tuple) -> tuple:
+    """Rend les images [debut, fin) du replay dans un fichier de segment; renvoie (indice, palette)."""
+    import pyxel
+
+    from .app import dessiner_replay
+    from .etats import Etat
+    from .state import JeuPong
+
+    indice, chemin_replay, chemin_segment, debut, fin, pas = tache
+    jeu = JeuPong()
+    jeu.etat = Etat.JEU
+    lecteur = Lecteur(chemin_replay, match=jeu)
+    segment = (SegmentGif if chemin_segment.endswith(".gif") else SegmentVideo)(chemin_segment, pas)
+    # Vue directe sur l'écran de pyxel (un index de couleur par pixel)
+    ecran = np.ctypeslib.as_array(pyxel.screen.data_ptr()).reshape(HAUTEUR_ECRAN, LARGEUR_ECRAN)
+
+    frame = debut * pas
+    lecteur.aller_a(frame)
+    for image in range(debut, fin):
+        while frame < image * pas:
+            lecteur.appliquer(frame)
+            frame += 1
+        dessiner_replay(jeu, frame)
+        segment.ajouter(ecran, image)
+    segment.fermer()
+    return indice, couleurs_pyxel()
+
+
+def plage_images(frames: int, pas: int, debut: int, fin: int | None) -> tuple[int, int]:
+    """Images [première, dernière) de l'extrait [debut, fin) d'un replay de `frames` frames; ValueError si vide."""
+    if pas < 1:
+        raise ValueError(f"Pas invalide: {pas} (au moins 1 frame)")
+    fin = frames if fin is None else min(fin, frames)
+    if not 0 <= debut < fin:
+        raise ValueError(f"Extrait vide: début {debut}, fin {fin} (le replay compte {frames} frames)")
+    premiere, derniere = -(-debut // pas), -(-fin // pas)
+    if premiere >= derniere:
+        raise ValueError(f"Aucune image entre les frames {debut} et {fin} avec un pas de {pas}")
+    return premiere, derniere
+
+
+def exporter(
+    chemin_replay: str,
+    sortie: str,
+    pas: int = 2,
+    debut: int = 0,
+    fin: int | None = None,
+    processus: int | None = None,
+) -> int:
+    """Exporte les frames [debut, fin) du replay, une image toutes les `pas` frames; renvoie le nombre d'images."""
+    premiere, derniere = plage_images(Lecteur(chemin_replay).frames, pas, debut, fin)
+    processus = processus or os.cpu_count()
+    segments = min(processus * SEGMENTS_PAR_PROCESSUS, derniere - premiere)
+    bornes = [premiere + (derniere - premiere) * i // segments for i in range(segments + 1)]
+    extension = os.path.splitext(sortie)[1] or ".gif"
+
+    dossier = tempfile.mkdtemp(prefix="export-", dir=os.path.dirname(os.path.abspath(sortie)))
+    try:
+        chemins = [os.path.join(dossier, f"segment-{i:04d}{extension}") for i in range(segments)]
+        taches = [(i, chemin_replay, chemins[i], bornes[i], bornes[i + 1], pas) for i in range(segments)]
+        with Pool(processus, initializer=initialiser_rendu) as pool:
+            for _, couleurs in pool.imap_unordered(rendre_segment, taches):
+                pass
+
+        if extension == ".gif":
+            with open(sortie, "wb") as fichier:
+                fichier.write(entete_gif(couleurs))
+                for chemin in chemins:
+                    with open(chemin, "rb") as morceau:
+                        shutil.copyfileobj(morceau, fichier)
+                fichier.write(FIN_GIF)
+        else:
+            liste = os.path.join(dossier, "segments.txt")
+            with open(liste, "w") as fichier:
+                fichier.writelines(f"file '{chemin}'\n" for chemin in chemins)
+            subprocess.run(
+                ["ffmpeg", "-loglevel", "error", "-y", "-f", "concat", "-safe", "0", "-i", liste, "-c", "copy", sortie],
+                check=True,
+            )
+    finally:
+        shutil.rmtree(dossier, ignore_errors=True)
+    return derniere - premiere
+
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(description="Export d'un replay en GIF ou en vidéo (ffmpeg)")
+    parser.add_argument("replay")
+    parser.add_argument("sortie", help="Fichier .gif, ou toute extension connue de ffmpeg (.mp4...)")
+    parser.add_argument("--pas", type=int, default=2, help="Une image toutes les N frames (2: 30 images/s)")
+    parser.add_argument("--debut", type=float, default=0, help="Début de l'extrait, en secondes")
+    parser.add_argument("--fin", type=float, help="Fin de l'extrait, en secondes")
+    parser.add_argument("--processus", type=int, default=os.cpu_count())
+    args = parser.parse_args(arguments)
+
+    debut_extrait = int(args.debut * FPS)
+    fin_extrait = None if args.fin is None else int(args.fin * FPS)
+    # Seule la plage demandée est une erreur d'usage; un replay illisible échoue normalement
+    frames = Lecteur(args.replay).frames
+    try:
+        plage_images(frames, args.pas, debut_extrait, fin_extrait)
+    except ValueError as erreur:
+        parser.error(str(erreur))
+
+    debut = time.perf_counter()
+    images = exporter(
+        args.replay, args.sortie, pas=args.pas, debut=debut_extrait, fin=fin_extrait, processus=args.processus
+    )
+    duree = time.perf_counter() - debut
+    # ru_maxrss est en kio sous Linux
+    memoire = max(resource.getrusage(qui).ru_maxrss for qui in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN))
+    print(
+        f"{args.sortie}: {images} images ({images * args.pas / FPS:.0f} s de jeu) en {duree:.1f} s,"
+        f" {images / duree:.0f} images/s, {os.path.getsize(args.sortie) / 1e6:.1f} Mo,"
+        f" mémoire max par processus {memoire / 1024:.0f} Mio"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+"""
+Avance rapide d'un match headless, d'événement en événement.
+
+Entre deux événements (rebond sur un mur, arrivée à portée d'une raquette,
+point), la balle vole librement: `frames_libres` calcule une borne prudente
+du nombre de frames avant le prochain événement possible, puis `voler` les
+enchaîne dans une boucle réduite, sans sous-pas, ni test de mur, de
+collision ou de point. Les frames proches d'un événement passent par le
+`tick` complet.
+
+L'état reste identique, au bit près, à celui du moteur pas à pas pour les
+mêmes entrées. n additions de vx ne donnent pas n * vx en flottants, mais
+dans une même binade elles ajoutent toutes le même multiple de l'ulp:
+`sauter` les fait d'un coup, binade par binade. Quand aucune raquette ne lit
+la balle (pas d'IA ni d'entrée), un vol coûte donc O(1) en x, et en y tant
+que l'effet est nul. Limites: l'effet amorti change l'incrément de y à
+chaque frame (boucle réduite sur y seul), et une IA lit la balle et tire au
+hasard à chaque frame. En IA contre IA, le vol reste parcouru frame par
+frame: le gain n'y vient que des tests évités, le coût reste O(frames).
+
+    python -m pong_game.fastforward --matchs 20
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+
+from .config import HAUTEUR_ECRAN
+from .simulation import Match, SmartComputer, DECROISSANCE_EFFET, DEPLACEMENT_MAX_SOUS_PAS
+
+# Marge de sécurité (pixels) sur les bornes, bien au-delà des erreurs d'arrondi
+MARGE = 1.0
+
+
+def sauter(z: float, d: float, n: int) -> tuple[float, float]:
+    """
+    `n` fois `z += d` en flottants, sans boucle par addition: renvoie z et sa
+    valeur avant la dernière addition. Dans une binade, z reste sur la grille
+    u = ulp(z) et chaque addition lui ajoute exactement d arrondi à cette
+    grille (sauf égalité à mi-chemin, refaite addition par addition): toutes
+    les additions qui restent dans la binade se font d'un coup.
+    """
+    precedent = z
+    while n:
+        # Arrondi au plus proche symétrique: on travaille sur |z|
+        signe = -1.0 if z < 0 else 1.0
+        z, d = z * signe, d * signe
+        k = 0
+        if z:
+            u = math.ulp(z)
+            q = d / u  # exact, u est une puissance de 2
+            if q - math.floor(q) != 0.5:
+                pas = round(q)
+                entier = int(z / u)
+                if pas == 0:
+                    k = n
+                elif pas > 0:
+                    k = ((1 << 53) - 1 - entier) // pas
+                elif entier >= 1 << 52:
+                    k = (entier - (1 << 52) - 1) // -pas
+                k = min(k, n)
+        if k > 0:
+            precedent = (entier + (k - 1) * pas) * u * signe
+            z = (entier + k * pas) * u
+            n -= k
+        else:
+            precedent = z * signe
+            z += d
+            n -= 1
+        z, d = z * signe, d * signe
+    return z, precedent
+
+
+class MatchEvenementiel(Match):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Frames passées par la boucle réduite (dont sautées sans boucle) et par le tick complet
+        self.frames_volees = 0
+        self.frames_sautees = 0
+        self.frames_completes = 0
+
+    def frames_libres(self) -> int:
+        """Frames à venir pendant lesquelles aucun événement n'est possible (borne prudente)."""
+        balle = self.balle
+        vx = balle.vx
+        if not vx or abs(vx) > DEPLACEMENT_MAX_SOUS_PAS:
+            return 0
+        # Balle à l'approche d'une raquette: sa boîte de perspective mesure au
+        # plus 1,4 t, centrée, donc déborde d'au plus 0,2 t de chaque côté
+        if vx > 0:
+            distance_x = self.raq_d.x - 1.2 * balle.t - MARGE - balle.x
+        else:
+            distance_x = balle.x - 0.2 * balle.t - MARGE - (self.raq_g.x + self.raq_g.w)
+        if distance_x <= 0:
+            return 0
+        libres = int(distance_x / abs(vx))
+
+        # Murs: l'effet ne fait que décroître, la balle monte ou descend d'au
+        # plus |vy| + |effet_y| par frame
+        distance_y = min(balle.y, HAUTEUR_ECRAN - balle.t - balle.y) - MARGE
+        if distance_y <= 0:
+            return 0
+        pente = abs(balle.vy) + abs(balle.effet_y)
+        if pente:
+            libres = min(libres, int(distance_y / pente))
+        return libres
+
+    def voler(self, frames: int, entrees_g=None, entrees_d=None, debut: int = 0) -> None:
+        """`frames` frames sans événement: raquettes normales, balle en vol libre."""
+        balle = self.balle
+        raq_g = self.raq_g
+        raq_d = self.raq_d
+        # Une raquette humaine sans entrée ne bouge plus après une mise à jour:
+        # la suite de la tranche se passe d'elle
+        fixe_g = not entrees_g and not isinstance(raq_g, SmartComputer)
+        fixe_d = not entrees_d and not isinstance(raq_d, SmartComputer)
+        if fixe_g and fixe_d:
+            raq_g.maj(0, balle)
+            raq_d.maj(0, balle)
+            # Personne ne lit la balle en vol: saut direct à la fin de la tranche
+            x, x_precedent = sauter(balle.x, balle.vx, frames)
+            vy, effet = balle.vy, balle.effet_y
+            if effet:
+                # L'effet amorti change l'incrément à chaque frame: pas de saut
+                y = y_precedent = balle.y
+                for _ in range(frames):
+                    y_precedent = y
+                    y += vy + effet
+                    effet *= DECROISSANCE_EFFET
+            else:
+                # Sans effet, y += vy + 0.0 ajoute exactement vy
+                y, y_precedent = sauter(balle.y, vy, frames)
+                self.frames_sautees += frames
+            balle.x, balle.y, balle.effet_y = x, y, effet
+            balle.x_precedent, balle.y_precedent = x_precedent, y_precedent
+            balle.derniere_collision += frames
+        else:
+            for k in range(debut, debut + frames):
+                raq_g.maj(entrees_g[k] if entrees_g else 0, balle)
+                raq_d.maj(entrees_d[k] if entrees_d else 0, balle)
+                # Balle.maj avec dt = 1, sans les murs
+                balle.x_precedent = balle.x
+                balle.y_precedent = balle.y
+                balle.x += balle.vx
+                balle.y += balle.vy + balle.effet_y
+                balle.effet_y *= DECROISSANCE_EFFET
+                balle.derniere_collision += 1
+        self.frame += frames
+        self.frames_volees += frames
+
+    def avancer(self, frames: int, entrees_g=None, entrees_d=None, arret_fin: bool = False) -> list:
+        """
+        Avance de `frames` frames. Les entrées sont des séquences indexées par
+        frame (None: aucune entrée). Renvoie les événements avec leur frame.
+        Avec `arret_fin`, s'arrête après le tick qui termine le match: `frame`
+        donne alors le nombre de frames réellement jouées.
+        """
+        evenements = []
+        k = 0
+        while k < frames:
+            libres = min(self.frames_libres(), frames - k)
+            if libres:
+                self.voler(libres, entrees_g, entrees_d, k)
+                k += libres
+                continue
+            frame = self.frame
+            for evenement in self.tick(entrees_g[k] if entrees_g else 0, entrees_d[k] if entrees_d else 0):
+                evenements.append((frame, evenement))
+            self.frames_completes += 1
+            k += 1
+            # Seul un tick complet peut marquer un point
+            if arret_fin and self.termine:
+                break
+        return evenements
+
+    def jouer(self, frames_max: int) -> list:
+        """Joue jusqu'à la fin du match (IA contre IA) ou `frames_max` frames."""
+        if self.termine or self.frame >= frames_max:
+            return []
+        return self.avancer(frames_max - self.frame, arret_fin=True)
+
+
+def verifier(matchs: int, frames: int, graine: int = 0) -> int:
+    """Compare l'avance rapide au moteur pas à pas, par tranches de longueur aléatoire; renvoie les écarts."""
+    alea = random.Random(graine)
+    ecarts = 0
+    for numero in range(matchs):
+        config = dict(mode_ordinateur=True, niveau_ia="pro", niveau_ia_g="amateur", graine=graine + numero)
+        if numero % 3:
+            # Joueur gauche scripté: entrées au hasard, changées toutes les quelques frames
+            config["niveau_ia_g"] = None
+        if numero % 3 == 2:
+            # Sans IA ni entrée: les raquettes restent immobiles
+            config["mode_ordinateur"] = False
+        reference = Match(**config)
+        rapide = MatchEvenementiel(**config)
+        entrees = [alea.choice((-1, 0, 1)) for _ in range(frames // 8 + 1) for _ in range(8)]
+        position = 0
+        while position < frames:
+            tranche = min(alea.randint(1, 400), frames - position)
+            entrees_g = None if numero % 3 != 1 else entrees[position : position + tranche]
+            attendus = []
+            for k in range(tranche):
+                frame = reference.frame
+                attendus += [(frame, e) for e in reference.tick(entrees_g[k] if entrees_g else 0)]
+            obtenus = rapide.avancer(tranche, entrees_g)
+            position += tranche
+            if reference.capturer() != rapide.capturer() or attendus != obtenus:
+                print(f"match {numero}: divergence avant la frame {position}")
+                ecarts += 1
+                break
+
+        # Match joué jusqu'au bout: la fin doit tomber sur la même frame
+        config = dict(mode_ordinateur=True, niveau_ia="pro", niveau_ia_g="amateur", graine=graine + numero, score_max=3)
+        reference = Match(**config)
+        rapide = MatchEvenementiel(**config)
+        attendus = []
+        while not reference.termine and reference.frame < frames:
+            frame = reference.frame
+            attendus += [(frame, e) for e in reference.tick()]
+        obtenus = rapide.jouer(frames)
+        if reference.capturer() != rapide.capturer() or attendus != obtenus:
+            print(f"match {numero} joué jusqu'au bout: fin à la frame {rapide.frame} au lieu de {reference.frame}")
+            ecarts += 1
+    return ecarts
+
+
+def mesurer(matchs: int, frames: int, niveau_ia_g: str | None, mode_ordinateur: bool = True) -> tuple:
+    """Frames par seconde, pas à pas puis en avance rapide, et parts des frames volées et sautées."""
+    debits = []
+    volees = sautees = 0
+    for classe in (Match, MatchEvenementiel):
+        total = 0
+        debut = time.perf_counter()
+        for numero in range(matchs):
+            match = classe(mode_ordinateur=mode_ordinateur, niveau_ia="pro", niveau_ia_g=niveau_ia_g, graine=numero)
+            if classe is Match:
+                for _ in range(frames):
+                    match.tick()
+            else:
+                match.avancer(frames)
+                volees += match.frames_volees
+                sautees += match.frames_sautees
+            total += frames
+        debits.append(total / (time.perf_counter() - debut))
+    return debits[0], debits[1], volees / (matchs * frames), sautees / (matchs * frames)
+
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(description="Avance rapide événementielle: vérification et débit")
+    parser.add_argument("--matchs", type=int, default=20)
+    parser.add_argument("--frames", type=int, default=60 * 60 * 2, help="Frames par match")
+    parser.add_argument("--graine", type=int, default=0)
+    args = parser.parse_args(arguments)
+
+    ecarts = verifier(args.matchs, args.frames, args.graine)
+    print(f"Vérification: {args.matchs} matchs de {args.frames} frames, {ecarts} divergence(s)")
+    cas = (("IA contre IA", "amateur", True), ("IA contre raquette immobile", None, True), ("sans IA", None, False))
+    for nom, niveau_ia_g, mode_ordinateur in cas:
+        pas_a_pas, rapide, volees, sautees = mesurer(args.matchs, args.frames, niveau_ia_g, mode_ordinateur)
+        print(
+            f"{nom:<28} pas à pas {pas_a_pas / 1000:6.0f} k frames/s, avance rapide {rapide / 1000:6.0f} k frames/s"
+            f" (x{rapide / pas_a_pas:.2f}, {volees:.0%} des frames en vol libre, {sautees:.0%} sautées)"
+        )
+    return 1 if ecarts else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,416 @@
+"""
+Physique en virgule fixe: même match, calculé en entiers.
+
+Le moteur normal calcule en flottants (normalisation par racine carrée,
+accélération `* 1.08`, amortissement 0.98...), et les puissances non
+entières dépendent de la bibliothèque mathématique de la machine. Ici, toutes les grandeurs
+physiques de la balle et des raquettes sont des entiers en 1/65536 de pixel
+(Q16.16), calculés par additions, multiplications et décalages entiers, avec
+une racine carrée entière (`math.isqrt`). Deux machines qui jouent les mêmes
+entrées obtiennent donc le même état, bit à bit.
+
+Les attributs restent en pixels, stockés comme des flottants multiples
+exacts de 1/65536: l'IA, le rendu et la table d'impacts les lisent sans
+changement. Les décisions des IA restent en flottants, sur des opérations
+de base IEEE 754 (correctement arrondies partout) et une prédiction
+d'impact entière; la position qui en résulte est ramenée sur la grille.
+
+Les instantanés de `MatchFixe` stockent ces grandeurs en int32 au lieu de
+doubles. Vérification des traces de référence et coût:
+
+    python -m pong_game.fixedpoint
+"""
+
+import argparse
+import hashlib
+import math
+import struct
+import sys
+import time
+
+from .config import LARGEUR_ECRAN, HAUTEUR_ECRAN, VITESSE_RAQ
+from .simulation import (
+    Balle,
+    Raquette,
+    SmartComputer,
+    Match,
+    Evenement,
+    FRAPPE,
+    REBOND,
+    DECROISSANCE_EFFET,
+    DEPLACEMENT_MAX_SOUS_PAS,
+)
+
+PRECISION = 16
+UN = 1 << PRECISION
+DEMI = UN >> 1
+
+
+def fixe(valeur: float) -> int:
+    """Pixels -> entier Q16.16 (exact: multiplier par 2^16 ne perd rien)."""
+    return round(valeur * UN)
+
+
+def flottant(valeur: int) -> float:
+    """Entier Q16.16 -> pixels, exact tant que |valeur| < 2^53."""
+    return valeur / UN
+
+
+def mul(a: int, b: int) -> int:
+    return (a * b + DEMI) >> PRECISION
+
+
+def div(a: int, b: int) -> int:
+    return (a << PRECISION) // b
+
+
+def norme(x: int, y: int) -> int:
+    """Norme du vecteur (x, y): les deux échelles se compensent sous la racine."""
+    return math.isqrt(x * x + y * y)
+
+
+def normaliser(x: int, y: int, norme_max: int) -> tuple[int, int]:
+    """Ramène (x, y) à la norme `norme_max` s'il la dépasse."""
+    n = norme(x, y)
+    if n <= norme_max:
+        return x, y
+    ratio = div(norme_max, n)
+    return mul(x, ratio), mul(y, ratio)
+
+
+def puissance(base: int, exposant: int) -> int:
+    """base^exposant (exposant entier positif), par carrés successifs."""
+    resultat = UN
+    while exposant:
+        if exposant & 1:
+            resultat = mul(resultat, base)
+        base = mul(base, base)
+        exposant >>= 1
+    return resultat
+
+
+# Constantes de la physique, sur la grille
+DECROISSANCE = fixe(DECROISSANCE_EFFET)
+HAUTEUR = HAUTEUR_ECRAN << PRECISION
+CENTRE = (LARGEUR_ECRAN << PRECISION) // 2
+VITESSE_RAQUETTE = fixe(VITESSE_RAQ)
+K_0_05, K_0_1, K_0_3, K_0_4, K_0_6, K_0_7, K_0_8 = map(fixe, (0.05, 0.1, 0.3, 0.4, 0.6, 0.7, 0.8))
+K_0_95, K_1_08, K_1_2, K_1_4, K_1_5, K_5_5 = map(fixe, (0.95, 1.08, 1.2, 1.4, 1.5, 5.5))
+
+
+def predire_y_fixe(balle, x_plan: float) -> float:
+    """`predire_y` en entiers: nombre de frames arrondi à l'entier inférieur, puissance par carrés."""
+    vx = fixe(balle.vx)
+    n = max(div(fixe(x_plan) - fixe(balle.x), vx), 0) >> PRECISION if vx else 0
+    effet = fixe(balle.effet_y)
+    serie = div(mul(effet, UN - puissance(DECROISSANCE, n)), UN - DECROISSANCE)
+    y = fixe(balle.y) + n * fixe(balle.vy) + serie
+    course = HAUTEUR - (balle.t << PRECISION)
+    y %= 2 * course
+    return flottant(y if y <= course else 2 * course - y)
+
+
+class BalleFixe(Balle):
+    __slots__ = ()
+
+    def reset(self, direction_aleatoire: bool = False) -> None:
+        super().reset(direction_aleatoire)
+        self.vx = flottant(fixe(self.vx))
+        self.vy = flottant(fixe(self.vy))
+
+    def maj(self, evenements: list | None = None, dt: float = 1.0) -> None:
+        x, y = fixe(self.x), fixe(self.y)
+        effet = fixe(self.effet_y)
+        self.x_precedent, self.y_precedent = self.x, self.y
+        x += fixe(self.vx)
+        y += fixe(self.vy) + effet
+        effet = mul(effet, DECROISSANCE)
+        self.derniere_collision += 1
+
+        bas = HAUTEUR - (self.t << PRECISION)
+        if y <= 0 or y >= bas:
+            y = 0 if y <= 0 else bas
+            self.vy = -self.vy
+            effet = -mul(effet, DEMI)
+            self.trajectoire += 1
+            if evenements is not None:
+                evenements.append(Evenement(REBOND))
+        self.x, self.y, self.effet_y = flottant(x), flottant(y), flottant(effet)
+
+    def collision_raquette(self, raq: Raquette, evenements: list | None = None) -> bool:
+        # Même géométrie et mêmes coefficients que Balle.collision_raquette
+        t = self.t << PRECISION
+        x, y, vx, vy = fixe(self.x), fixe(self.y), fixe(self.vx), fixe(self.vy)
+        distance_relative = div(abs(x + t // 2 - CENTRE), CENTRE)
+        taille_min = mul(t, K_0_6)
+        taille_max = mul(t, K_1_4)
+        taille = taille_max - mul(distance_relative, taille_max - taille_min)
+
+        offset = (t - taille) // 2
+        bx1, by1 = x + offset, y + offset
+        bx2, by2 = bx1 + taille, by1 + taille
+        hauteur_raq = fixe(raq.h)
+        rx1, ry1 = fixe(raq.x), fixe(raq.y)
+        rx2, ry2 = rx1 + fixe(raq.w), ry1 + hauteur_raq
+
+        inter = not (bx2 < rx1 or bx1 > rx2 or by2 < ry1 or by1 > ry2)
+
+        a_gauche = rx1 < CENTRE
+        if (vx >= 0) if a_gauche else (vx <= 0):
+            return inter
+
+        if not inter:
+            x_precedent, y_precedent = fixe(self.x_precedent), fixe(self.y_precedent)
+            if a_gauche:
+                avant = x_precedent + offset - rx2
+                apres = bx1 - rx2
+            else:
+                avant = rx1 - (x_precedent + offset + taille)
+                apres = rx1 - bx2
+            if not avant >= 0 > apres:
+                return False
+            y_impact = y_precedent + mul(y - y_precedent, div(avant, avant - apres))
+            by1 = y_impact + offset
+            if by1 + taille < ry1 or by1 > ry2:
+                return False
+            y = y_impact
+            inter = True
+
+        impact_relatif = div(by1 + taille // 2 - ry1, hauteur_raq)
+        impact_relatif = max(K_0_05, min(K_0_95, impact_relatif))
+
+        x = rx2 - offset if vx < 0 else rx1 - taille - offset
+
+        angle_incidence = abs(div(vy, vx)) if vx else 0
+        vitesse_incidence = norme(vx, vy)
+
+        if impact_relatif < DEMI:
+            direction_base = -1
+            zone_factor = (DEMI - impact_relatif) * 2
+        else:
+            direction_base = 1
+            zone_factor = (impact_relatif - DEMI) * 2
+
+        distance_centre = abs(impact_relatif - DEMI) * 2
+        intensite_angle = mul(distance_centre, K_1_5)
+        influence_incidence = min(mul(angle_incidence, K_0_4), K_0_6)
+
+        vitesse_max = fixe(self.vitesse_max)
+        nouvelle_vitesse_h = min(mul(abs(vx), K_1_08), vitesse_max)
+        vx = -nouvelle_vitesse_h if vx > 0 else nouvelle_vitesse_h
+        vy = direction_base * intensite_angle * 3 + mul(vy, influence_incidence)
+
+        if isinstance(raq, SmartComputer):
+            variance = flottant(mul(UN - fixe(raq.precision), K_1_5))
+        else:
+            variance = flottant(K_0_3)
+        vy += fixe(self.rng.uniform(-variance, variance))
+
+        effet = mul(mul(mul(impact_relatif - DEMI, K_1_2), vitesse_incidence), K_0_1)
+        if distance_centre > K_0_3:
+            effet += direction_base * mul(zone_factor, K_0_8)
+
+        mouvement_raquette = fixe(raq.vitesse_mouvement)
+        if abs(mouvement_raquette) > K_0_1:
+            if mouvement_raquette > 0:
+                if vy > 0:
+                    effet += mouvement_raquette * 2
+                    vy += mul(mouvement_raquette, DEMI)
+                else:
+                    effet += mul(mouvement_raquette, K_1_5)
+                    vy -= mul(mouvement_raquette, K_0_3)
+            else:
+                if vy < 0:
+                    effet += mouvement_raquette * 2
+                    vy -= mul(mouvement_raquette, DEMI)
+                else:
+                    effet += mul(mouvement_raquette, K_1_5)
+                    vy += mul(mouvement_raquette, K_0_3)
+
+            if abs(mouvement_raquette) > K_1_5:
+                effet = mul(effet, K_1_5 if mouvement_raquette * vy > 0 else K_0_7)
+
+        vy = max(-K_5_5, min(K_5_5, vy))
+        vx, vy = normaliser(vx, vy, vitesse_max)
+
+        vitesse_totale_finale = norme(vx, vy)
+        if evenements is not None:
+            if abs(mouvement_raquette) > K_1_5:
+                nature = "spin" if mouvement_raquette * vy > 0 else "slice"
+            elif abs(effet) > UN:
+                nature = "effet"
+            else:
+                nature = "normal"
+            cote = "gauche" if a_gauche else "droite"
+            rapide = vitesse_totale_finale > mul(vitesse_max, K_0_8)
+            evenements.append(Evenement(FRAPPE, cote, nature, rapide))
+
+        self.x, self.y = flottant(x), flottant(y)
+        self.vx, self.vy, self.effet_y = flottant(vx), flottant(vy), flottant(effet)
+        self.impact_force = flottant(min(div(vitesse_totale_finale, vitesse_max), UN))
+        self.derniere_collision = 0
+        self.trajectoire += 1
+
+        return inter
+
+
+def deplacer_raquette(raq: Raquette, y_precedente: int, y: int) -> None:
+    """Écrit la nouvelle position (bornée aux murs) et la vitesse, calculée avant bornage comme Raquette.maj."""
+    raq.vitesse_mouvement = flottant(y - y_precedente)
+    hauteur = fixe(raq.h)
+    if y < 0:
+        y = 0
+    if y + hauteur > HAUTEUR:
+        y = HAUTEUR - hauteur
+    raq.y = flottant(y)
+
+
+class RaquetteFixe(Raquette):
+    __slots__ = ()
+
+    def maj(self, entree: int = 0, balle=None, dt: float = 1.0) -> None:
+        self.y_precedente = self.y
+        y = fixe(self.y)
+        deplacer_raquette(self, y, y + entree * VITESSE_RAQUETTE)
+
+
+class SmartComputerFixe(SmartComputer):
+    __slots__ = ()
+
+    def predire(self, balle, x_plan: float) -> float:
+        return predire_y_fixe(balle, x_plan)
+
+    def maj(self, entree: int = 0, balle=None, dt: float = 1.0) -> None:
+        y_precedente = fixe(self.y)
+        super().maj(entree, balle, dt)
+        if self.y_precedente == self.y:
+            # Temps de réaction: la raquette n'a pas bougé
+            return
+        # Décision en flottants, position ramenée sur la grille
+        deplacer_raquette(self, y_precedente, fixe(self.y))
+
+
+class MatchFixe(Match):
+    """
+    Match en virgule fixe. Pas de frame entier uniquement: pas de sous-pas
+    ni de `dt` fractionnaire, dont l'amortissement demanderait une
+    puissance non entière.
+    """
+
+    # Comme Match.FORMAT_INSTANTANE, les grandeurs physiques en int32
+    FORMAT_BALLE = "5iiiQi"
+    FORMAT_RAQUETTE = "3i2d?d2iQid"
+    FORMAT_INSTANTANE = Match.FORMAT_ENTETE + FORMAT_BALLE + FORMAT_RAQUETTE * 2
+    STRUCT_INSTANTANE = struct.Struct(FORMAT_INSTANTANE)
+    TAILLE_INSTANTANE = STRUCT_INSTANTANE.size
+    # Indices, dans capturer(), des champs en virgule fixe
+    CHAMPS_FIXES = (3, 4, 5, 6, 7, 9, 12, 13, 14, 24, 25, 26)
+
+    classe_raquette = RaquetteFixe
+    classe_ordinateur = SmartComputerFixe
+    classe_balle = BalleFixe
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.vitesse_max_balle > DEPLACEMENT_MAX_SOUS_PAS:
+            raise ValueError("Virgule fixe: la balle ne doit pas dépasser un sous-pas par frame")
+
+    def creer_entites(self):
+        super().creer_entites()
+        for raq in (self.raq_g, self.raq_d):
+            raq.y = raq.y_precedente = flottant(fixe(raq.y))
+
+    def tick(self, entree_g: int = 0, entree_d: int = 0, dt: float = 1.0) -> list:
+        if dt != 1.0:
+            raise ValueError("Virgule fixe: pas de frame entier uniquement")
+        return super().tick(entree_g, entree_d)
+
+    def nouvelle_mise_en_jeu(self, a_droite: bool) -> None:
+        super().nouvelle_mise_en_jeu(a_droite)
+        self.balle.vx = flottant(fixe(self.balle.vx))
+
+    def capturer(self) -> tuple:
+        valeurs = list(super().capturer())
+        for indice in self.CHAMPS_FIXES:
+            valeurs[indice] = fixe(valeurs[indice])
+        return tuple(valeurs)
+
+    def restaurer(self, valeurs) -> None:
+        valeurs = list(valeurs)
+        for indice in self.CHAMPS_FIXES:
+            valeurs[indice] = flottant(valeurs[indice])
+        super().restaurer(valeurs)
+
+
+# Empreintes des traces de référence (IA pro contre IA amateur, FRAMES_TRACE frames)
+FRAMES_TRACE = 20_000
+TRACES_REFERENCE = {
+    1: "120f356b57b7d0f00eba0bcabe62613f",
+    2: "904fa06b327a139d88b84a31e16eab6f",
+    3: "a071ce328ef7c1223a2c716807a1d4d3",
+    4: "840b7b3e57ab4164a5585cae025a1093",
+}
+
+
+def empreinte_trace(graine: int, frames: int = FRAMES_TRACE) -> str:
+    """Empreinte des instantanés de toutes les frames d'un match en virgule fixe."""
+    match = MatchFixe(mode_ordinateur=True, niveau_ia="pro", niveau_ia_g="amateur", graine=graine)
+    empreinte = hashlib.blake2b(digest_size=16)
+    tampon = bytearray(match.TAILLE_INSTANTANE)
+    for _ in range(frames):
+        match.tick()
+        match.ecrire_instantane(tampon)
+        empreinte.update(tampon)
+    return empreinte.hexdigest()
+
+
+def verifier_reprise(graine: int, frames: int = FRAMES_TRACE) -> bool:
+    """Un match restauré depuis un instantané en cours de route retrouve la même trace."""
+    reference = MatchFixe(mode_ordinateur=True, niveau_ia="pro", niveau_ia_g="amateur", graine=graine)
+    for _ in range(frames // 2):
+        reference.tick()
+    reprise = MatchFixe(mode_ordinateur=True, niveau_ia="pro", niveau_ia_g="amateur", graine=graine + 1)
+    reprise.charger_instantane(reference.instantane())
+    for _ in range(frames - frames // 2):
+        reference.tick()
+        reprise.tick()
+    return reference.instantane() == reprise.instantane()
+
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(description="Virgule fixe: traces de référence et coût")
+    parser.add_argument("--graines", type=int, nargs="*", default=sorted(TRACES_REFERENCE))
+    parser.add_argument("--frames", type=int, default=FRAMES_TRACE)
+    args = parser.parse_args(arguments)
+
+    echecs = 0
+    for graine in args.graines:
+        empreinte = empreinte_trace(graine, args.frames)
+        attendue = TRACES_REFERENCE.get(graine) if args.frames == FRAMES_TRACE else None
+        if attendue is None:
+            verdict = "pas de référence"
+        elif empreinte == attendue:
+            verdict = "identique"
+        else:
+            verdict = f"DIFFÉRENTE (attendue {attendue})"
+            echecs += 1
+        reprise = verifier_reprise(graine, args.frames)
+        echecs += not reprise
+        print(f"graine {graine}: {empreinte} {verdict}, reprise d'instantané {'ok' if reprise else 'DIVERGE'}")
+
+    debits = []
+    for classe in (Match, MatchFixe):
+        match = classe(mode_ordinateur=True, niveau_ia="pro", niveau_ia_g="amateur", graine=0)
+        debut = time.perf_counter()
+        for _ in range(args.frames):
+            match.tick()
+        debits.append(args.frames / (time.perf_counter() - debut))
+    print(
+        f"flottants {debits[0] / 1000:.0f} k frames/s, virgule fixe {debits[1] / 1000:.0f} k frames/s;"
+        f" instantané {Match.TAILLE_INSTANTANE} -> {MatchFixe.TAILLE_INSTANTANE} octets"
+    )
+    return 1 if echecs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,421 @@
+"""
+Traces de référence: garde-fou des moteurs optimisés.
+
+`enregistrer` joue des scénarios fixes (configuration, graine, entrées
+scriptées dérivées de la graine) avec le moteur de référence et écrit, pour
+chacun, l'empreinte de l'état à chaque frame et un instantané complet toutes
+les `intervalle` frames. `verifier` rejoue les mêmes scénarios avec un autre
+moteur et compare les empreintes frame par frame: au premier écart, l'état
+de référence de cette frame est reconstruit depuis l'instantané précédent et
+affiché champ par champ à côté de celui du moteur testé.
+
+Le moteur vectorisé (`lot`) n'est garanti qu'à `batch.TOLERANCE` près: après
+une empreinte différente, ses voies sont comparées en tolérance à une
+référence rejouée en parallèle.
+
+Les scénarios sont répartis sur un pool de processus:
+
+    python -m pong_game.golden enregistrer --graines 1000
+    python -m pong_game.golden verifier --moteur lot
+    python -m pong_game.golden verifier --moteur evenementiel
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+from multiprocessing import Pool
+
+from .config import DOSSIER_CACHE
+from .fastforward import MatchEvenementiel
+from .fixedpoint import MatchFixe
+from .rng import Alea, deriver
+from .simulation import Match
+
+DOSSIER_DEFAUT = os.path.join(DOSSIER_CACHE, "traces")
+# Score jamais atteint: les scénarios durent toujours `frames` frames
+SCORE_INFINI = 10 ** 9
+
+# Configurations de match des scénarios, et côtés joués par un script
+CONFIGURATIONS = {
+    "ia-pro-amateur": (dict(mode_ordinateur=True, niveau_ia="pro", niveau_ia_g="amateur"), ""),
+    "ia-debutant-pro": (dict(mode_ordinateur=True, niveau_ia="debutant", niveau_ia_g="pro"), ""),
+    "script-amateur": (dict(mode_ordinateur=True, niveau_ia="amateur", niveau_ia_g=None), "g"),
+    "humains": (dict(mode_ordinateur=False, niveau_ia="amateur", niveau_ia_g=None), "gd"),
+}
+# Sous-flux des entrées scriptées (après ceux de la balle et des IA)
+FLUX_SCRIPT = 3
+
+# Moteurs de référence: leurs instantanés permettent de reconstruire n'importe quelle frame
+REFERENCES = {"match": Match, "fixe": MatchFixe}
+
+# État comparé entre moteurs: scores, balle, positions des raquettes
+CHAMPS = (
+    "score_g",
+    "score_d",
+    "x",
+    "y",
+    "vx",
+    "vy",
+    "effet_y",
+    "raq_g.y",
+    "raq_d.y",
+    "trajectoire",
+    "derniere_collision",
+)
+STRUCT_ETAT = struct.Struct("<2q7d2q")
+TAILLE_EMPREINTE = 8
+
+ENTETE = struct.Struct("<4sHII")
+MAGIC = b"PGTR"
+VERSION = 1
+
+
+def entrees_scriptees(graine: int, cote: str, frames: int) -> list:
+    """Joueur scripté: une direction (-1, 0, +1) tenue de 1 à 30 frames, puis une autre."""
+    alea = Alea(deriver(graine, FLUX_SCRIPT, "gd".index(cote)))
+    entrees = []
+    while len(entrees) < frames:
+        entrees += [int(alea.random() * 3) - 1] * (1 + int(alea.random() * 30))
+    return entrees[:frames]
+
+
+class Scenario:
+    def __init__(self, configuration: str, graine: int, frames: int, table_ia: str | None = None):
+        self.configuration = configuration
+        self.graine = graine
+        self.frames = frames
+        # IA sur table précalculée (lookup.py) des deux côtés
+        self.table_ia = table_ia
+        self.config, scripts = CONFIGURATIONS[configuration]
+        self.entrees_g = entrees_scriptees(graine, "g", frames) if "g" in scripts else None
+        self.entrees_d = entrees_scriptees(graine, "d", frames) if "d" in scripts else None
+
+    @property
+    def nom(self) -> str:
+        return f"{self.configuration}-{self.graine}"
+
+    def creer(self, classe=Match):
+        return classe(**self.config, score_max=SCORE_INFINI, graine=self.graine, table_ia=self.table_ia)
+
+    def entrees(self, frame: int) -> tuple[int, int]:
+        return (
+            self.entrees_g[frame] if self.entrees_g else 0,
+            self.entrees_d[frame] if self.entrees_d else 0,
+        )
+
+
+def etat_match(match) -> tuple:
+    balle = match.balle
+    return (
+        match.score_g,
+        match.score_d,
+        balle.x,
+        balle.y,
+        balle.vx,
+        balle.vy,
+        balle.effet_y,
+        match.raq_g.y,
+        match.raq_d.y,
+        balle.trajectoire,
+        balle.derniere_collision,
+    )
+
+
+def empreinte(etat: tuple) -> bytes:
+    # + 0.0: -0.0 et 0.0 ont la même empreinte
+    return hashlib.blake2b(
+        STRUCT_ETAT.pack(etat[0], etat[1], *[v + 0.0 for v in etat[2:9]], etat[9], etat[10]),
+        digest_size=TAILLE_EMPREINTE,
+    ).digest()
+
+
+class Trace:
+    """Empreintes de chaque frame et instantanés du moteur de référence pour un scénario."""
+
+    def __init__(self, empreintes: bytes, instantanes: list, intervalle: int):
+        self.empreintes = empreintes
+        self.instantanes = instantanes
+        self.intervalle = intervalle
+
+    @property
+    def frames(self) -> int:
+        return len(self.empreintes) // TAILLE_EMPREINTE
+
+    def empreinte(self, frame: int) -> bytes:
+        """Empreinte de l'état après `frame` + 1 ticks."""
+        return self.empreintes[frame * TAILLE_EMPREINTE : (frame + 1) * TAILLE_EMPREINTE]
+
+    def ecrire(self, chemin: str) -> None:
+        temporaire = chemin + ".tmp"
+        with open(temporaire, "wb") as fichier:
+            fichier.write(ENTETE.pack(MAGIC, VERSION, self.frames, self.intervalle))
+            fichier.write(self.empreintes)
+            fichier.writelines(self.instantanes)
+        os.replace(temporaire, chemin)
+
+    @classmethod
+    def lire(cls, chemin: str, taille_instantane: int) -> "Trace":
+        with open(chemin, "rb") as fichier:
+            donnees = fichier.read()
+        magic, version, frames, intervalle = ENTETE.unpack_from(donnees)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{chemin}: trace de format inconnu")
+        debut = ENTETE.size + frames * TAILLE_EMPREINTE
+        instantanes = [
+            donnees[position : position + taille_instantane]
+            for position in range(debut, len(donnees), taille_instantane)
+        ]
+        return cls(donnees[ENTETE.size : debut], instantanes, intervalle)
+
+    def reference(self, scenario: Scenario, classe, frame: int):
+        """Match de référence dans l'état d'après `frame` + 1 ticks, rejoué depuis l'instantané précédent."""
+        ticks = frame + 1
+        match = scenario.creer(classe)
+        match.charger_instantane(self.instantanes[ticks // self.intervalle])
+        for k in range(ticks // self.intervalle * self.intervalle, ticks):
+            match.tick(*scenario.entrees(k))
+        return match
+
+
+def chemin_trace(dossier: str, scenario: Scenario) -> str:
+    return os.path.join(dossier, scenario.nom + ".trace")
+
+
+def enregistrer_scenario(tache) -> str:
+    dossier, configuration, graine, frames, intervalle, nom_reference, table_ia = tache
+    scenario = Scenario(configuration, graine, frames, table_ia)
+    match = scenario.creer(REFERENCES[nom_reference])
+    empreintes = bytearray()
+    instantanes = [match.instantane()]
+    for k in range(frames):
+        match.tick(*scenario.entrees(k))
+        empreintes += empreinte(etat_match(match))
+        if (k + 1) % intervalle == 0:
+            instantanes.append(match.instantane())
+    Trace(bytes(empreintes), instantanes, intervalle).ecrire(chemin_trace(dossier, scenario))
+    return scenario.nom
+
+
+# Moteurs testés: chacun joue une liste de scénarios de même configuration et
+# produit, frame après frame, la liste de leurs états (disposition de CHAMPS).
+
+
+def jouer_scalaire(classe):
+    def jouer(scenarios: list):
+        matchs = [scenario.creer(classe) for scenario in scenarios]
+        for k in range(scenarios[0].frames):
+            for scenario, match in zip(scenarios, matchs):
+                match.tick(*scenario.entrees(k))
+            yield [etat_match(match) for match in matchs]
+
+    return jouer
+
+
+def jouer_evenementiel(scenarios: list):
+    matchs = [scenario.creer(MatchEvenementiel) for scenario in scenarios]
+    for k in range(scenarios[0].frames):
+        for scenario, match in zip(scenarios, matchs):
+            entree_g, entree_d = scenario.entrees(k)
+            # Une frame à la fois (pour comparer chaque frame), par la voie rapide dès que possible
+            match.avancer(1, [entree_g] if scenario.entrees_g else None, [entree_d] if scenario.entrees_d else None)
+        yield [etat_match(match) for match in matchs]
+
+
+def jouer_lot(scenarios: list):
+    from .batch import MoteurLot
+
+    import numpy as np
+
+    if scenarios[0].table_ia:
+        raise ValueError("Le moteur par lots n'a pas d'IA sur table")
+    config = scenarios[0].config
+    lot = MoteurLot(
+        len(scenarios),
+        config["mode_ordinateur"],
+        config["niveau_ia"],
+        config["niveau_ia_g"],
+        score_max=SCORE_INFINI,
+        graines=[scenario.graine for scenario in scenarios],
+    )
+    g = np.array([s.entrees_g for s in scenarios]) if scenarios[0].entrees_g else None
+    d = np.array([s.entrees_d for s in scenarios]) if scenarios[0].entrees_d else None
+    for k in range(scenarios[0].frames):
+        lot.etape(None if g is None else g[:, k], None if d is None else d[:, k])
+        colonnes = (
+            lot.score_g,
+            lot.score_d,
+            lot.x,
+            lot.y,
+            lot.vx,
+            lot.vy,
+            lot.effet_y,
+            lot.g.y,
+            lot.d.y,
+            lot.trajectoire,
+            lot.derniere_collision,
+        )
+        yield [
+            (int(sg), int(sd), float(x), float(y), float(vx), float(vy), float(e), float(yg), float(yd), int(t), int(c))
+            for sg, sd, x, y, vx, vy, e, yg, yd, t, c in zip(*colonnes)
+        ]
+
+
+def tolerance_lot() -> float:
+    from .batch import TOLERANCE
+
+    return TOLERANCE
+
+
+# Nom -> (fonction de jeu, tolérance ou fonction qui la donne)
+MOTEURS = {
+    "match": (jouer_scalaire(Match), 0.0),
+    "evenementiel": (jouer_evenementiel, 0.0),
+    "fixe": (jouer_scalaire(MatchFixe), 0.0),
+    "lot": (jouer_lot, tolerance_lot),
+}
+
+
+def difference(reference: tuple, obtenu: tuple) -> str:
+    lignes = []
+    for champ, attendu, valeur in zip(CHAMPS, reference, obtenu):
+        marque = "  " if attendu == valeur else "!="
+        lignes.append(f"  {marque} {champ:<20} {attendu!r:>24} {valeur!r:>24}")
+    return "\n".join(lignes)
+
+
+def ecart(reference: tuple, obtenu: tuple) -> float:
+    if reference[:2] != obtenu[:2] or reference[9:] != obtenu[9:]:
+        return float("inf")
+    return max(abs(a - b) for a, b in zip(reference[2:9], obtenu[2:9]))
+
+
+def verifier_groupe(tache) -> list:
+    """Vérifie des scénarios de même configuration; renvoie (nom, frame divergente ou None, différence)."""
+    dossier, configuration, graines, frames, nom_reference, table_ia, nom_moteur = tache
+    classe = REFERENCES[nom_reference]
+    jouer, tolerance = MOTEURS[nom_moteur]
+    tolerance = tolerance() if callable(tolerance) else tolerance
+    scenarios = [Scenario(configuration, graine, frames, table_ia) for graine in graines]
+    traces = [Trace.lire(chemin_trace(dossier, s), classe.TAILLE_INSTANTANE) for s in scenarios]
+
+    resultats = {s.nom: None for s in scenarios}
+    # Références rejouées en parallèle des voies passées en comparaison tolérante
+    rejouees = {}
+    for k, etats in enumerate(jouer(scenarios)):
+        for i, (scenario, trace, etat) in enumerate(zip(scenarios, traces, etats)):
+            if resultats[scenario.nom] is not None:
+                continue
+            if i in rejouees:
+                reference = rejouees[i]
+                reference.tick(*scenario.entrees(k))
+            elif empreinte(etat) == trace.empreinte(k):
+                continue
+            else:
+                reference = trace.reference(scenario, classe, k)
+            etat_reference = etat_match(reference)
+            if ecart(etat_reference, etat) <= tolerance:
+                rejouees[i] = reference
+                continue
+            resultats[scenario.nom] = (k, difference(etat_reference, etat))
+        if all(resultat is not None for resultat in resultats.values()):
+            # Toutes les voies ont divergé: inutile de continuer
+            break
+    return [(nom, *(resultat or (None, ""))) for nom, resultat in resultats.items()]
+
+
+def lire_manifeste(dossier: str) -> dict:
+    with open(os.path.join(dossier, "manifeste.json")) as fichier:
+        return json.load(fichier)
+
+
+def groupes(manifeste: dict, taille: int) -> list:
+    """Scénarios du manifeste par paquets de même configuration (une tâche du pool chacun)."""
+    taches = []
+    for configuration in manifeste["configurations"]:
+        graines = manifeste["graines"]
+        for debut in range(0, len(graines), taille):
+            taches.append((configuration, graines[debut : debut + taille]))
+    return taches
+
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(description="Traces de référence des moteurs de simulation")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+    enregistrement = commandes.add_parser("enregistrer", help="Enregistrer les traces du moteur de référence")
+    enregistrement.add_argument("--graines", type=int, default=256, help="Graines par configuration")
+    enregistrement.add_argument("--premiere-graine", type=int, default=1)
+    enregistrement.add_argument("--frames", type=int, default=60 * 60, help="Frames par scénario")
+    enregistrement.add_argument("--intervalle", type=int, default=600, help="Frames entre deux instantanés")
+    enregistrement.add_argument("--reference", choices=sorted(REFERENCES), default="match")
+    enregistrement.add_argument("--table-ia", help="Table précalculée des IA (voir lookup.py)")
+    enregistrement.add_argument(
+        "--configurations", nargs="+", choices=sorted(CONFIGURATIONS), default=list(CONFIGURATIONS)
+    )
+    verification = commandes.add_parser("verifier", help="Comparer un moteur aux traces")
+    verification.add_argument("--moteur", choices=sorted(MOTEURS), default="match")
+    verification.add_argument("--groupe", type=int, default=64, help="Scénarios par tâche (voies du moteur par lots)")
+    verification.add_argument("--details", type=int, default=3, help="Divergences détaillées au plus")
+    for commande in (enregistrement, verification):
+        commande.add_argument("--dossier", default=DOSSIER_DEFAUT)
+        commande.add_argument("--processus", type=int, default=os.cpu_count())
+    args = parser.parse_args(arguments)
+
+    debut = time.perf_counter()
+    if args.commande == "enregistrer":
+        os.makedirs(args.dossier, exist_ok=True)
+        graines = list(range(args.premiere_graine, args.premiere_graine + args.graines))
+        manifeste = dict(
+            reference=args.reference,
+            frames=args.frames,
+            intervalle=args.intervalle,
+            configurations=args.configurations,
+            graines=graines,
+            table_ia=args.table_ia,
+        )
+        taches = [
+            (args.dossier, configuration, graine, args.frames, args.intervalle, args.reference, args.table_ia)
+            for configuration in args.configurations
+            for graine in graines
+        ]
+        with Pool(args.processus) as pool:
+            for _ in pool.imap_unordered(enregistrer_scenario, taches, chunksize=8):
+                pass
+        with open(os.path.join(args.dossier, "manifeste.json"), "w") as fichier:
+            json.dump(manifeste, fichier)
+        duree = time.perf_counter() - debut
+        print(
+            f"{len(taches)} traces de {args.frames} frames ({args.reference}) dans {args.dossier}"
+            f" en {duree:.1f} s ({len(taches) * args.frames / duree / 1000:.0f} k frames/s)"
+        )
+        return 0
+
+    manifeste = lire_manifeste(args.dossier)
+    reglages = (manifeste["frames"], manifeste["reference"], manifeste["table_ia"], args.moteur)
+    taches = [
+        (args.dossier, configuration, graines, *reglages) for configuration, graines in groupes(manifeste, args.groupe)
+    ]
+    divergences = []
+    total = 0
+    frames = 0
+    with Pool(args.processus) as pool:
+        for resultats in pool.imap_unordered(verifier_groupe, taches):
+            total += len(resultats)
+            frames += sum(manifeste["frames"] if frame is None else frame + 1 for _, frame, _ in resultats)
+            divergences += [resultat for resultat in resultats if resultat[1] is not None]
+    duree = time.perf_counter() - debut
+    print(
+        f"{args.moteur} contre {manifeste['reference']}: {total - len(divergences)}/{total} scénarios identiques"
+        f" en {duree:.1f} s ({frames / duree / 1000:.0f} k frames/s)"
+    )
+    for nom, frame, diff in sorted(divergences, key=lambda d: d[1])[: args.details]:
+        print(f"{nom}: première divergence à la frame {frame}")
+        print(f"     {'champ':<20} {'référence':>24} {args.moteur:>24}\n{diff}")
+    return 1 if divergences else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
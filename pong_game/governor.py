@@ -0,0 +1,108 @@
+"""
+Régulateur de qualité: retire des effets visuels quand les frames dépassent
+le budget de 60 FPS, et les rend quand la marge revient.
+
+Deux mesures sur une fenêtre glissante de frames:
+- le travail de la frame (mise à jour + dessin, sans l'attente de pyxel),
+  qui montre la marge restante;
+- l'intervalle entre deux mises à jour, qui révèle aussi ce que le travail
+  ne voit pas (présentation de l'image, autres processus).
+
+Les effets tombent un palier à la fois dès que la charge dépasse le seuil
+haut, et ne reviennent qu'après un délai passé sous le seuil bas. Un retour
+suivi d'une rechute rapide double ce délai (pas de clignotement entre deux
+paliers). La simulation n'est jamais sautée: le dernier palier ne dessine
+plus qu'une frame sur deux.
+"""
+
+import time
+from array import array
+
+from .profiler import centile
+
+# Paliers, du plus complet au plus économe
+COMPLET, SANS_TRAINEE, SIMPLIFIE, UNE_SUR_DEUX = range(4)
+NIVEAUX_QUALITE = ("complet", "sans trainee", "simplifie", "1 image sur 2")
+
+BUDGET_NS = 1_000_000_000 // 60
+# Fenêtre d'observation et période de décision, en frames
+FENETRE = 30
+# Charge (fraction du budget) au-delà de laquelle on retire un palier...
+SEUIL_HAUT = 0.85
+# ... et en deçà de laquelle on peut en rendre un
+SEUIL_BAS = 0.5
+# Intervalle entre mises à jour compté comme une frame manquée
+INTERVALLE_RETARD_NS = BUDGET_NS * 5 // 4
+# Proportion de frames manquées qui déclenche un palier
+RETARDS_MAX = 0.1
+# Temps passé sous le seuil bas avant de rendre un palier (doublé après une rechute)
+DELAI_REMONTEE = 180
+DELAI_REMONTEE_MAX = 60 * 30
+
+
+class Gouverneur:
+    def __init__(self, niveau: int = COMPLET, automatique: bool = True):
+        self.niveau = niveau
+        self.automatique = automatique
+        self.travail = array("q", bytes(8 * FENETRE))
+        self.intervalles = array("q", bytes(8 * FENETRE))
+        self.frames = 0
+        self.debut = 0
+        self.precedent = 0
+        self.dessinee = True
+        # Frames depuis le dernier changement de palier, délai de remontée courant
+        self.depuis_changement = 0
+        self.delai_remontee = DELAI_REMONTEE
+        self.dernier_sens = 0
+
+    def debut_frame(self) -> None:
+        maintenant = time.perf_counter_ns()
+        if self.precedent:
+            self.intervalles[self.frames % FENETRE] = maintenant - self.precedent
+        self.precedent = self.debut = maintenant
+        self.dessinee = self.niveau < UNE_SUR_DEUX or self.frames % 2 == 0
+
+    def fin_frame(self) -> int | None:
+        """À appeler après le dessin (ou à sa place); renvoie le nouveau palier s'il change."""
+        self.travail[self.frames % FENETRE] = time.perf_counter_ns() - self.debut
+        self.frames += 1
+        self.depuis_changement += 1
+        if not self.automatique or self.frames % FENETRE:
+            return None
+        return self.decider()
+
+    def charge(self) -> float:
+        """Travail d'une frame dessinée (90e centile), en fraction du budget."""
+        travail = sorted(self.travail)
+        if self.niveau >= UNE_SUR_DEUX:
+            # Une frame sur deux n'est pas dessinée: seules les plus lourdes comptent
+            travail = travail[FENETRE // 2 :]
+        return centile(travail, 0.9) / BUDGET_NS
+
+    def decider(self) -> int | None:
+        charge = self.charge()
+        retards = sum(intervalle > INTERVALLE_RETARD_NS for intervalle in self.intervalles) / FENETRE
+        if (charge > SEUIL_HAUT or retards > RETARDS_MAX) and self.niveau < UNE_SUR_DEUX:
+            if self.dernier_sens < 0 and self.depuis_changement <= self.delai_remontee:
+                # Rechute juste après une remontée: on attendra plus longtemps la prochaine fois
+                self.delai_remontee = min(2 * self.delai_remontee, DELAI_REMONTEE_MAX)
+            return self.changer(self.niveau + 1)
+        if self.dernier_sens < 0 and self.depuis_changement > 2 * self.delai_remontee:
+            # La dernière remontée a tenu: le délai revient à sa valeur de départ
+            self.delai_remontee = DELAI_REMONTEE
+        if charge < SEUIL_BAS and not retards and self.niveau > COMPLET:
+            if self.depuis_changement >= self.delai_remontee:
+                return self.changer(self.niveau - 1)
+        return None
+
+    def changer(self, niveau: int) -> int:
+        self.dernier_sens = 1 if niveau > self.niveau else -1
+        self.niveau = niveau
+        self.depuis_changement = 0
+        # La fenêtre mesurait l'ancien palier
+        self.travail[:] = array("q", bytes(8 * FENETRE))
+        self.intervalles[:] = array("q", bytes(8 * FENETRE))
+        return niveau
+
+    def texte(self) -> str:
+        return f"qualite: {NIVEAUX_QUALITE[self.niveau]}{'' if self.automatique else ' (fixe)'}"
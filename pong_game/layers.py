@@ -0,0 +1,58 @@
+"""
+Calques statiques pré-rendus.
+
+Un calque dessine une seule fois son contenu (textes, ligne médiane...) dans une
+`pyxel.Image`, puis l'affiche à chaque frame par un unique `pyxel.blt`. Le rendu
+n'est refait que lorsque la clé passée à `dessiner` change (score, mode,
+sélection du menu...): les pixels qui ne bougent pas ne coûtent plus d'appels
+de dessin.
+"""
+
+from typing import Any, Callable
+
+import pyxel
+
+from .config import COULEUR_FOND
+
+# Clé initiale, différente de toute clé fournie: force le premier rendu
+_JAMAIS_RENDU = object()
+
+
+class Calque:
+    """
+    Zone `largeur` x `hauteur` affichée en (x, y). `rendu(image, cle)` y dessine
+    le contenu avec les méthodes de `pyxel.Image` (coordonnées locales).
+    Un calque transparent laisse voir ce qui est dessous là où il n'a rien
+    dessiné (couleur `COULEUR_FOND`); un calque opaque remplace aussi le `cls`.
+    """
+
+    def __init__(
+        self,
+        x: int,
+        y: int,
+        largeur: int,
+        hauteur: int,
+        rendu: Callable[[Any, Any], None],
+        opaque: bool = False,
+    ):
+        self.x = x
+        self.y = y
+        self.largeur = largeur
+        self.hauteur = hauteur
+        self.rendu = rendu
+        self.transparence = None if opaque else COULEUR_FOND
+        # L'image n'est créée qu'au premier affichage, une fois pyxel initialisé
+        self.image = None
+        self.cle = _JAMAIS_RENDU
+
+    def invalider(self) -> None:
+        self.cle = _JAMAIS_RENDU
+
+    def dessiner(self, cle: Any = None) -> None:
+        if cle != self.cle or self.image is None:
+            if self.image is None:
+                self.image = pyxel.Image(self.largeur, self.hauteur)
+            self.image.cls(COULEUR_FOND)
+            self.rendu(self.image, cle)
+            self.cle = cle
+        pyxel.blt(self.x, self.y, self.image, 0, 0, self.largeur, self.hauteur, self.transparence)
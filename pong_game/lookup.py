@@ -0,0 +1,303 @@
+"""
+Politique d'IA précalculée: table de la hauteur d'impact de la balle.
+
+Pour une grille d'états de balle (x, y, vx, vy, effet_y), la table donne
+l'ordonnée à laquelle la balle atteindra le plan de la raquette droite,
+obtenue en simulant exactement la physique de `Balle.maj` (rebonds et
+changement d'effet compris, contrairement à `predire_y`). La raquette gauche
+lit la même table en miroir. Pendant la partie, une `SmartComputer` munie
+d'une table (`Match(table_ia=...)`) remplace `calculer_position_optimale` et
+son bruit aléatoire par une lecture indexée: coût constant par frame, erreur
+connue (voir `verifier`).
+
+La hauteur est stockée "dépliée" (sans repli sur les murs), ce qui la rend
+lisse d'une case à l'autre: l'interpolation reste juste de part et d'autre
+d'un rebond. Le repli est fait à la lecture.
+
+Le fichier (en-tête puis int16 en 1/8 de pixel) est projeté en mémoire avec
+`mmap`: rien n'est lu avant la première consultation, seules les pages
+touchées sont chargées, et plusieurs processus de jeu partagent les mêmes
+pages du cache système. La construction, elle, demande NumPy et se fait hors
+ligne, une tranche d'abscisses par processus:
+
+    python -m pong_game.lookup construire table-ia.ptab
+    python -m pong_game.lookup verifier table-ia.ptab
+"""
+
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+
+from .config import LARGEUR_ECRAN, HAUTEUR_ECRAN, RAQ_L, BAL_TAILLE, BAL_V_INIT
+
+MAGIQUE = b"PTIA"
+VERSION = 1
+AXES = ("x", "y", "vx", "vy", "effet_y")
+# Axes de la grille: (nombre de points, minimum, maximum), pour une balle
+# allant vers la raquette droite (vx > 0)
+GRILLE_DEFAUT = (
+    (24, 0.0, LARGEUR_ECRAN - 18 - RAQ_L - BAL_TAILLE),
+    (23, 0.0, HAUTEUR_ECRAN - BAL_TAILLE),
+    (15, 1.0, BAL_V_INIT * 2.5),
+    (33, -BAL_V_INIT * 2.5, BAL_V_INIT * 2.5),
+    (13, -3.0, 3.0),
+)
+STRUCT_ENTETE = struct.Struct("<4sHH" + "Hdd" * len(AXES))
+TAILLE_ENTETE = 128
+# Hauteurs stockées en 1/8 de pixel
+ECHELLE = 8
+# Abscisse (bord gauche de la balle) où elle touche la raquette droite
+X_PLAN = LARGEUR_ECRAN - 18 - RAQ_L - BAL_TAILLE
+COURSE = HAUTEUR_ECRAN - BAL_TAILLE
+
+
+def replier(y: float) -> float:
+    """Ramène une hauteur dépliée entre les murs (comme `predire_y`)."""
+    y %= 2 * COURSE
+    return y if y <= COURSE else 2 * COURSE - y
+
+
+class TableIA:
+    """Table projetée en mémoire, ouverte à la première consultation."""
+
+    def __init__(self, chemin: str, interpolation: bool = True):
+        self.chemin = chemin
+        self.interpolation = interpolation
+        self.valeurs = None
+
+    def ouvrir(self) -> None:
+        with open(self.chemin, "rb") as fichier:
+            # ACCESS_READ: projection partagée en lecture seule, pages communes aux processus
+            self.projection = mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ)
+        magique, version, nombre, *axes = STRUCT_ENTETE.unpack_from(self.projection)
+        if magique != MAGIQUE or version != VERSION or nombre != len(AXES):
+            raise ValueError(f"{self.chemin}: table d'IA invalide ou d'une autre version")
+        self.axes = [tuple(axes[i : i + 3]) for i in range(0, len(axes), 3)]
+        # Pas de la grille et foulées (en cases) de chaque axe, ordre C
+        self.pas = [(b - a) / (n - 1) for n, a, b in self.axes]
+        self.foulees = []
+        foulee = 1
+        for n, _, _ in reversed(self.axes):
+            self.foulees.insert(0, foulee)
+            foulee *= n
+        # Décalage des 2^5 coins d'une case, dans l'ordre des poids de `hauteur`
+        self.coins = [0]
+        for foulee in self.foulees:
+            self.coins = self.coins + [d + foulee for d in self.coins]
+        # Le format est petit-boutiste, comme les machines visées
+        self.valeurs = memoryview(self.projection)[TAILLE_ENTETE:].cast("h")
+
+    def fermer(self) -> None:
+        if self.valeurs is not None:
+            self.valeurs.release()
+            self.projection.close()
+            self.valeurs = None
+
+    def hauteur(self, x: float, y: float, vx: float, vy: float, effet_y: float) -> float:
+        """Hauteur dépliée (haut de la balle) au plan de la raquette droite, pour vx > 0."""
+        if self.valeurs is None:
+            self.ouvrir()
+        if not self.interpolation:
+            indice = 0
+            for valeur, (n, a, _), pas, foulee in zip((x, y, vx, vy, effet_y), self.axes, self.pas, self.foulees):
+                i = int((valeur - a) / pas + 0.5)
+                indice += foulee * (0 if i < 0 else n - 1 if i >= n else i)
+            return self.valeurs[indice] / ECHELLE
+
+        # Interpolation multilinéaire sur les 2^5 coins de la case
+        base = 0
+        poids = [1.0]
+        for valeur, (n, a, _), pas, foulee in zip((x, y, vx, vy, effet_y), self.axes, self.pas, self.foulees):
+            position = min(max((valeur - a) / pas, 0.0), n - 1.0)
+            i = min(int(position), n - 2)
+            f = position - i
+            base += foulee * i
+            poids = [p * (1 - f) for p in poids] + [p * f for p in poids]
+        valeurs = self.valeurs
+        return sum([valeurs[base + d] * p for d, p in zip(self.coins, poids)]) / ECHELLE
+
+    def cible(self, balle, a_droite: bool) -> float:
+        """Centre de la balle quand elle arrivera sur la raquette, centre du terrain si elle s'éloigne."""
+        if a_droite:
+            if balle.vx <= 0:
+                return HAUTEUR_ECRAN / 2
+            y = self.hauteur(balle.x, balle.y, balle.vx, balle.vy, balle.effet_y)
+        else:
+            if balle.vx >= 0:
+                return HAUTEUR_ECRAN / 2
+            y = self.hauteur(LARGEUR_ECRAN - balle.t - balle.x, balle.y, -balle.vx, balle.vy, balle.effet_y)
+        return replier(y) + balle.t / 2
+
+
+# Tables ouvertes, partagées par toutes les raquettes du processus
+_TABLES = {}
+
+
+def charger_table(chemin: str, interpolation: bool = True) -> TableIA:
+    cle = (os.path.abspath(chemin), interpolation)
+    if cle not in _TABLES:
+        _TABLES[cle] = TableIA(chemin, interpolation)
+    return _TABLES[cle]
+
+
+def simuler_impacts(x, y, vx, vy, effet_y):
+    """
+    Hauteurs dépliées au plan `X_PLAN` de balles (tableaux NumPy), en
+    rejouant pas à pas les opérations de `Balle.maj`. Les balles arrivées
+    sont retirées du calcul au fur et à mesure.
+    """
+    import numpy as np
+
+    from .simulation import DECROISSANCE_EFFET
+
+    x, y, vx, vy, effet_y = (np.array(v, dtype=np.float64) for v in (x, y, vx, vy, effet_y))
+    # Hauteur dépliée = signe * y + decalage (miroir à chaque rebond)
+    signe = np.ones_like(y)
+    decalage = np.zeros_like(y)
+    resultat = y.copy()
+    actives = np.flatnonzero(x < X_PLAN)
+    while actives.size:
+        ax, ay, avx, avy, aeffet = x[actives], y[actives], vx[actives], vy[actives], effet_y[actives]
+        asigne, adecalage = signe[actives], decalage[actives]
+        arrivees = np.zeros(actives.size, dtype=bool)
+        # Quelques frames de suite sur les mêmes balles avant de retirer les arrivées
+        for _ in range(16):
+            ax += avx
+            ay += avy + aeffet
+            aeffet *= DECROISSANCE_EFFET
+            haut = ay <= 0
+            bas = ~haut & (ay + BAL_TAILLE >= HAUTEUR_ECRAN)
+            murs = haut | bas
+            if murs.any():
+                ay[haut] = 0
+                ay[bas] = COURSE
+                adecalage[bas] += 2 * asigne[bas] * COURSE
+                asigne[murs] = -asigne[murs]
+                avy[murs] = -avy[murs]
+                aeffet[murs] *= -0.5
+            nouvelles = ~arrivees & (ax >= X_PLAN)
+            if nouvelles.any():
+                resultat[actives[nouvelles]] = asigne[nouvelles] * ay[nouvelles] + adecalage[nouvelles]
+                arrivees |= nouvelles
+        x[actives], y[actives], vx[actives], vy[actives], effet_y[actives] = ax, ay, avx, avy, aeffet
+        signe[actives], decalage[actives] = asigne, adecalage
+        actives = actives[~arrivees]
+    return resultat
+
+
+def construire_tranche(tache: tuple):
+    """Valeurs de la table pour une abscisse de la grille (un processus par tranche)."""
+    import numpy as np
+
+    i, grille = tache
+    x = np.linspace(*grille[0][1:], grille[0][0])[i]
+    ys, vxs, vys, effets = np.meshgrid(*(np.linspace(a, b, n) for n, a, b in grille[1:]), indexing="ij")
+    hauteurs = simuler_impacts(np.full(ys.size, x), ys.ravel(), vxs.ravel(), vys.ravel(), effets.ravel())
+    valeurs = np.clip(np.rint(hauteurs * ECHELLE), -32768, 32767).astype("<i2")
+    return i, valeurs.tobytes()
+
+
+def construire(chemin: str, grille=GRILLE_DEFAUT, processus: int | None = None) -> None:
+    # Importé ici: le jeu importe ce module (via simulation.py) sans jamais construire de table
+    from multiprocessing import Pool
+
+    entete = STRUCT_ENTETE.pack(MAGIQUE, VERSION, len(AXES), *(v for axe in grille for v in axe))
+    taille_tranche = 2
+    for n, _, _ in grille[1:]:
+        taille_tranche *= n
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "wb") as fichier, Pool(processus) as pool:
+        fichier.write(entete.ljust(TAILLE_ENTETE, b"\0"))
+        fichier.truncate(TAILLE_ENTETE + grille[0][0] * taille_tranche)
+        for i, donnees in pool.imap_unordered(construire_tranche, [(i, grille) for i in range(grille[0][0])]):
+            fichier.seek(TAILLE_ENTETE + i * taille_tranche)
+            fichier.write(donnees)
+    # Remplacement atomique: un jeu qui projette l'ancienne table n'est pas perturbé
+    os.replace(temporaire, chemin)
+
+
+def etat_aleatoire(alea: random.Random) -> tuple:
+    vitesse = BAL_V_INIT * 2.5
+    return (
+        alea.uniform(0, X_PLAN),
+        alea.uniform(0, COURSE),
+        alea.uniform(1.0, vitesse),
+        alea.uniform(-vitesse, vitesse),
+        alea.uniform(-3.0, 3.0),
+    )
+
+
+def verifier(chemin: str, echantillons: int = 20000, graine: int = 0) -> None:
+    """Erreur de la table (sans et avec interpolation) face à la simulation exacte, et coût d'une lecture."""
+    import numpy as np
+
+    from .simulation import Balle, SmartComputer
+
+    alea = random.Random(graine)
+    etats = [etat_aleatoire(alea) for _ in range(echantillons)]
+    exactes = [replier(h) for h in simuler_impacts(*np.array(etats).T)]
+
+    for interpolation in (False, True):
+        table = TableIA(chemin, interpolation)
+        debut = time.perf_counter()
+        lues = [replier(table.hauteur(*etat)) for etat in etats]
+        duree = time.perf_counter() - debut
+        erreurs = np.abs(np.array(lues) - exactes)
+        print(
+            f"{'interpolée' if interpolation else 'plus proche':<11}"
+            f" erreur moyenne {erreurs.mean():5.1f} px, médiane {np.median(erreurs):5.1f} px,"
+            f" 90e centile {np.percentile(erreurs, 90):5.1f} px; {duree / echantillons * 1e6:.2f} µs par lecture"
+        )
+        table.fermer()
+
+    # Prédiction en forme close de l'IA existante, pour comparaison
+    balle = Balle()
+    ia = SmartComputer(LARGEUR_ECRAN - 18 - RAQ_L, HAUTEUR_ECRAN / 2, "pro")
+    predites = []
+    debut = time.perf_counter()
+    for x, y, vx, vy, effet_y in etats:
+        balle.x, balle.y, balle.vx, balle.vy, balle.effet_y = x, y, vx, vy, effet_y
+        balle.trajectoire += 1
+        ia.calculer_position_optimale(balle)
+        predites.append(ia.y_impact_prevu)
+    duree = time.perf_counter() - debut
+    erreurs = np.abs(np.array(predites) - exactes)
+    print(
+        f"predire_y   erreur moyenne {erreurs.mean():5.1f} px, médiane {np.median(erreurs):5.1f} px,"
+        f" 90e centile {np.percentile(erreurs, 90):5.1f} px;"
+        f" calculer_position_optimale (pro) {duree / echantillons * 1e6:.2f} µs par appel"
+    )
+
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(description="Table précalculée pour l'IA")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+    construction = commandes.add_parser("construire", help="Calculer la table (NumPy, en parallèle)")
+    construction.add_argument("chemin")
+    construction.add_argument("--processus", type=int, default=os.cpu_count())
+    for axe, (n, _, _) in zip(AXES, GRILLE_DEFAUT):
+        construction.add_argument(f"--points-{axe.replace('_', '-')}", type=int, default=n, dest=f"points_{axe}")
+    verification = commandes.add_parser("verifier", help="Mesurer l'erreur et le coût de la table")
+    verification.add_argument("chemin")
+    verification.add_argument("--echantillons", type=int, default=20000)
+    args = parser.parse_args(arguments)
+
+    if args.commande == "construire":
+        grille = tuple((getattr(args, f"points_{axe}"), a, b) for axe, (_, a, b) in zip(AXES, GRILLE_DEFAUT))
+        debut = time.perf_counter()
+        construire(args.chemin, grille, args.processus)
+        print(
+            f"{args.chemin}: {os.path.getsize(args.chemin) / 1e6:.1f} Mo"
+            f" en {time.perf_counter() - debut:.1f} s ({args.processus} processus)"
+        )
+    else:
+        verifier(args.chemin, args.echantillons)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,412 @@
+"""
+Jeu en ligne à deux joueurs par rollback, sur UDP (asyncio).
+
+Chaque pair simule le match complet. L'entrée du joueur distant est prédite
+(sa dernière entrée connue); quand la vraie entrée arrive et diffère, la
+session restaure l'instantané de cette frame (`Match.capturer`/`restaurer`) et
+re-simule jusqu'à la frame courante. Chaque paquet répète toutes les entrées
+locales que le pair n'a pas encore acquittées: une perte est réparée par le
+paquet suivant, sans retransmission.
+
+Le pair "gauche" héberge: il envoie l'instantané initial du match (graine
+comprise) dans un paquet BONJOUR, le pair "droite" le charge avant de jouer.
+`LiaisonSimulee` ajoute latence, gigue et pertes aux envois pour essayer en
+local:
+
+    python -m pong_game.netplay --latence 60 --gigue 10 --perte 0.05
+"""
+
+import argparse
+import asyncio
+import gc
+import struct
+import sys
+import time
+import tracemalloc
+
+from .rng import Alea, deriver
+from .simulation import Match
+
+# Frames d'avance maximale sur la dernière entrée distante confirmée (~250 ms)
+FENETRE_MAX = 15
+# Les tampons circulaires doivent couvrir la fenêtre et les entrées non acquittées
+ANNEAU = 64
+# Entrées locales au plus par paquet
+ENTREES_PAR_PAQUET = 32
+# Le pair en avance d'au moins 2 frames sur l'autre en saute une, au plus toutes les N frames
+ECART_CESSION = 2
+INTERVALLE_CESSION = 10
+
+BONJOUR = 1
+ENTREES = 2
+FORMAT_ENTREES = "<BiiBb"  # type, acquittement, première frame, nombre, avance de l'émetteur
+TAILLE_ENTETE = struct.calcsize(FORMAT_ENTREES)
+FPS = 60
+
+
+class SessionRollback:
+    """
+    Avance un `Match` frame par frame avec l'entrée locale et l'entrée
+    distante confirmée ou prédite, et corrige les prédictions ratées.
+    """
+
+    def __init__(self, match: Match, cote_local: str, fenetre: int = FENETRE_MAX, delai: int = 0):
+        # L'anneau garde les entrées locales en avance de `delai` et les frames rejouables de la fenêtre
+        assert 0 <= delai and delai + fenetre < ANNEAU, (delai, fenetre, ANNEAU)
+        self.match = match
+        self.local_gauche = cote_local == "gauche"
+        self.fenetre = fenetre
+        # Retard volontaire de l'entrée locale, en frames: moins de rollbacks, plus de latence ressentie
+        self.delai = delai
+        self.frame = 0
+        self.entrees_locales = [0] * ANNEAU
+        self.derniere_locale = delai - 1
+        self.entrees_distantes = [0] * ANNEAU
+        self.derniere_distante = -1
+        # Entrée distante utilisée pour chaque frame simulée sur prédiction
+        self.predites = [0] * ANNEAU
+        # Anneau d'instantanés: un seul tampon d'enregistrements de taille fixe
+        self.instantanes = bytearray(ANNEAU * match.TAILLE_INSTANTANE)
+        self.rollback_depuis = None
+        # Avance du pair sur nos entrées (frame - dernière entrée reçue), telle qu'il l'a annoncée
+        self.avance_distante = 0
+        self.derniere_cession = 0
+        # Dernière de nos frames que le pair a reçue (acquittement)
+        self.acquittee = -1
+        self.rollbacks = 0
+        self.frames_resimulees = 0
+        self.profondeur_max = 0
+        self.attentes = 0
+        self.cessions = 0
+
+    def avance(self) -> int:
+        return self.frame - self.derniere_distante
+
+    def en_attente(self) -> bool:
+        """Trop d'avance sur le pair: il faut attendre ses entrées avant d'avancer."""
+        return self.avance() > self.fenetre
+
+    def doit_ceder(self) -> bool:
+        """
+        Équilibre les horloges: la latence est la même dans les deux sens, donc
+        à horloges égales les deux pairs annoncent la même avance. Celui qui est
+        nettement devant saute une frame, sinon l'autre ferait tous les rollbacks.
+        """
+        if self.frame - self.derniere_cession < INTERVALLE_CESSION:
+            return False
+        return self.avance() - self.avance_distante >= ECART_CESSION
+
+    def avancer(self, entree_locale: int) -> list | None:
+        """Joue une frame; renvoie ses événements, ou None si la session attend le pair."""
+        if self.en_attente():
+            self.attentes += 1
+            return None
+        if self.doit_ceder():
+            self.derniere_cession = self.frame
+            self.cessions += 1
+            return None
+        self.corriger()
+        self.derniere_locale = self.frame + self.delai
+        self.entrees_locales[self.derniere_locale % ANNEAU] = entree_locale
+        evenements = self.simuler(self.frame)
+        self.frame += 1
+        return evenements
+
+    def simuler(self, frame: int) -> list:
+        self.match.ecrire_instantane(self.instantanes, frame % ANNEAU * self.match.TAILLE_INSTANTANE)
+        locale = self.entrees_locales[frame % ANNEAU]
+        if frame <= self.derniere_distante:
+            distante = self.entrees_distantes[frame % ANNEAU]
+        else:
+            distante = self.entrees_distantes[self.derniere_distante % ANNEAU] if self.derniere_distante >= 0 else 0
+            self.predites[frame % ANNEAU] = distante
+        if self.local_gauche:
+            return self.match.tick(locale, distante)
+        return self.match.tick(distante, locale)
+
+    def corriger(self) -> None:
+        """Re-simule depuis la première frame mal prédite (événements ignorés)."""
+        depuis = self.rollback_depuis
+        if depuis is None:
+            return
+        self.rollback_depuis = None
+        self.match.lire_instantane(self.instantanes, depuis % ANNEAU * self.match.TAILLE_INSTANTANE)
+        for frame in range(depuis, self.frame):
+            self.simuler(frame)
+        profondeur = self.frame - depuis
+        self.rollbacks += 1
+        self.frames_resimulees += profondeur
+        self.profondeur_max = max(self.profondeur_max, profondeur)
+
+    def recevoir(self, acquittement: int, premiere: int, entrees: bytes, avance: int = 0) -> None:
+        self.acquittee = max(self.acquittee, acquittement)
+        self.avance_distante = avance
+        # Les entrées doivent prolonger la suite confirmée: un trou attend le paquet suivant
+        if premiere > self.derniere_distante + 1:
+            return
+        for frame in range(max(premiere, self.derniere_distante + 1), premiere + len(entrees)):
+            entree = entrees[frame - premiere] - 1
+            self.entrees_distantes[frame % ANNEAU] = entree
+            if frame < self.frame and self.predites[frame % ANNEAU] != entree:
+                if self.rollback_depuis is None or frame < self.rollback_depuis:
+                    self.rollback_depuis = frame
+            self.derniere_distante = frame
+
+    def paquet(self) -> bytes:
+        """Entrées locales non acquittées (au plus ENTREES_PAR_PAQUET) et notre acquittement."""
+        premiere = max(self.acquittee + 1, 0)
+        derniere = min(self.derniere_locale, premiere + ENTREES_PAR_PAQUET - 1)
+        entrees = bytes(self.entrees_locales[f % ANNEAU] + 1 for f in range(premiere, derniere + 1))
+        avance = max(-128, min(127, self.avance()))
+        return struct.pack(FORMAT_ENTREES, ENTREES, self.derniere_distante, premiere, len(entrees), avance) + entrees
+
+
+class LiaisonSimulee:
+    """Enveloppe un transport UDP: latence (aller simple), gigue et pertes à l'envoi."""
+
+    def __init__(
+        self, transport, boucle, latence: float = 0.0, gigue: float = 0.0, perte: float = 0.0, graine: int = 0
+    ):
+        self.transport = transport
+        self.boucle = boucle
+        self.latence = latence
+        self.gigue = gigue
+        self.perte = perte
+        self.rng = Alea(graine)
+        self.envoyes = 0
+        self.perdus = 0
+        self.octets = 0
+
+    def sendto(self, donnees: bytes, adresse) -> None:
+        self.envoyes += 1
+        self.octets += len(donnees)
+        if self.rng.random() < self.perte:
+            self.perdus += 1
+            return
+        delai = self.latence + self.rng.uniform(-self.gigue, self.gigue)
+        if delai <= 0:
+            self.livrer(donnees, adresse)
+        else:
+            self.boucle.call_later(delai, self.livrer, donnees, adresse)
+
+    def livrer(self, donnees: bytes, adresse) -> None:
+        # Des paquets "en vol" peuvent arriver après la fermeture du transport
+        if not self.transport.is_closing():
+            self.transport.sendto(donnees, adresse)
+
+
+class Pair(asyncio.DatagramProtocol):
+    """
+    Extrémité UDP d'une partie. Le pair gauche envoie BONJOUR (instantané
+    initial) jusqu'à recevoir des entrées; le pair droit attend ce paquet.
+    """
+
+    def __init__(self, match: Match, cote: str, adresse_distante, latence=0.0, gigue=0.0, perte=0.0, delai=0):
+        self.match = match
+        self.cote = cote
+        self.adresse_distante = adresse_distante
+        self.reglages_liaison = (latence, gigue, perte)
+        self.session = SessionRollback(match, cote, delai=delai)
+        self.connecte = False
+        self.liaison = None
+
+    def connection_made(self, transport) -> None:
+        latence, gigue, perte = self.reglages_liaison
+        self.liaison = LiaisonSimulee(
+            transport, asyncio.get_running_loop(), latence, gigue, perte, graine=1 if self.cote == "gauche" else 2
+        )
+
+    def datagram_received(self, donnees: bytes, adresse) -> None:
+        if not donnees:
+            return
+        if donnees[0] == BONJOUR:
+            if self.cote == "droite" and not self.connecte:
+                self.match.charger_instantane(donnees[1:])
+                self.connecte = True
+        elif donnees[0] == ENTREES and len(donnees) >= TAILLE_ENTETE:
+            _, acquittement, premiere, nombre, avance = struct.unpack_from(FORMAT_ENTREES, donnees)
+            self.connecte = True
+            self.session.recevoir(acquittement, premiere, donnees[TAILLE_ENTETE : TAILLE_ENTETE + nombre], avance)
+
+    def envoyer(self) -> None:
+        """À appeler une fois par frame, même quand la session attend."""
+        if self.cote == "gauche" and self.session.derniere_distante < 0:
+            self.liaison.sendto(bytes((BONJOUR,)) + self.match.instantane(), self.adresse_distante)
+        if self.connecte:
+            self.liaison.sendto(self.session.paquet(), self.adresse_distante)
+
+
+async def ouvrir_pair(match: Match, cote: str, adresse_locale, adresse_distante, **reglages) -> Pair:
+    boucle = asyncio.get_running_loop()
+    _, pair = await boucle.create_datagram_endpoint(
+        lambda: Pair(match, cote, adresse_distante, **reglages), local_addr=adresse_locale
+    )
+    return pair
+
+
+def lire_adresse(texte: str, hote_defaut: str = "127.0.0.1") -> tuple[str, int]:
+    """`hote:port`, `:port` ou `port`."""
+    hote, _, port = texte.rpartition(":")
+    return hote or hote_defaut, int(port)
+
+
+def lire_delai(texte: str) -> int:
+    """Retard de l'entrée locale, borné par la taille de l'anneau (type argparse)."""
+    delai = int(texte)
+    maximum = ANNEAU - FENETRE_MAX - 1
+    if not 0 <= delai <= maximum:
+        raise argparse.ArgumentTypeError(f"retard hors bornes: {delai} (de 0 à {maximum} frames)")
+    return delai
+
+
+def mesurer_couts(iterations: int = 20_000) -> dict:
+    """Coût d'un instantané, d'une restauration et d'un tick, et allocations par tick."""
+    match = Match(mode_ordinateur=False, graine=1)
+    alea = Alea(2)
+    entrees = [(int(alea.random() * 3) - 1, int(alea.random() * 3) - 1) for _ in range(1024)]
+    # Comme dans SessionRollback: un enregistrement de taille fixe dans un tampon préalloué
+    tampon = bytearray(match.TAILLE_INSTANTANE)
+    resultats = {}
+
+    debut = time.perf_counter()
+    for _ in range(iterations):
+        match.ecrire_instantane(tampon)
+    resultats["instantane_us"] = (time.perf_counter() - debut) / iterations * 1e6
+    debut = time.perf_counter()
+    for _ in range(iterations):
+        match.lire_instantane(tampon)
+    resultats["restauration_us"] = (time.perf_counter() - debut) / iterations * 1e6
+    debut = time.perf_counter()
+    for i in range(iterations):
+        match.tick(*entrees[i & 1023])
+    resultats["tick_us"] = (time.perf_counter() - debut) / iterations * 1e6
+
+    # Blocs conservés (fuite) et pic de mémoire transitoire par tick
+    gc.collect()
+    blocs = sys.getallocatedblocks()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    pic = 0
+    for i in range(1000):
+        tracemalloc.reset_peak()
+        match.tick(*entrees[i & 1023])
+        pic = max(pic, tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    gc.collect()
+    resultats["blocs_conserves_par_tick"] = (sys.getallocatedblocks() - blocs) / 1000
+    resultats["pic_transitoire_octets"] = pic
+    budget = (resultats["restauration_us"] + resultats["tick_us"] + resultats["instantane_us"]) / 1e6
+    resultats["frames_resimulables_en_16ms"] = int(1 / FPS / budget)
+    return resultats
+
+
+class JoueurScripte:
+    """Entrées pseudo-aléatoires qui changent souvent, pour provoquer des prédictions ratées."""
+
+    def __init__(self, graine: int, changement: float = 0.1):
+        self.rng = Alea(graine)
+        self.changement = changement
+        self.entree = 0
+
+    def entree_suivante(self) -> int:
+        if self.rng.random() < self.changement:
+            self.entree = self.rng.choice((-1, 0, 1))
+        return self.entree
+
+
+async def essai_local(frames: int, latence: float, gigue: float, perte: float, delai: int, graine: int) -> dict:
+    """Deux pairs sur 127.0.0.1 à 60 Hz; vérifie qu'ils finissent dans le même état que la référence."""
+    gauche = Match(mode_ordinateur=False, graine=graine)
+    droite = Match(mode_ordinateur=False, graine=graine + 1)  # remplacé par l'instantané de BONJOUR
+    reglages = {"latence": latence, "gigue": gigue, "perte": perte, "delai": delai}
+    pair_g = await ouvrir_pair(gauche, "gauche", ("127.0.0.1", 0), None, **reglages)
+    pair_d = await ouvrir_pair(droite, "droite", ("127.0.0.1", 0), None, **reglages)
+    pair_g.adresse_distante = pair_d.liaison.transport.get_extra_info("sockname")
+    pair_d.adresse_distante = pair_g.liaison.transport.get_extra_info("sockname")
+    reference = Match(mode_ordinateur=False, graine=graine)
+
+    joueurs = {pair_g: JoueurScripte(deriver(graine, 1)), pair_d: JoueurScripte(deriver(graine, 2))}
+    historique = {pair_g: [], pair_d: []}
+    duree_frames = []
+    prochaine = time.perf_counter()
+    # Jusqu'à ce que chaque pair ait joué `frames` frames et reçu toutes les entrées de l'autre
+    while any(p.session.frame < frames or p.session.derniere_distante < frames - 1 for p in joueurs):
+        debut = time.perf_counter()
+        for pair, joueur in joueurs.items():
+            session = pair.session
+            if pair.connecte and session.frame < frames:
+                entree = joueur.entree_suivante()
+                # Entrée appliquée à la frame frame + delai (les premières valent 0), sauf attente
+                if session.avancer(entree) is not None:
+                    historique[pair].append(entree)
+            pair.envoyer()
+        duree_frames.append(time.perf_counter() - debut)
+        prochaine += 1 / FPS
+        await asyncio.sleep(max(0.0, prochaine - time.perf_counter()))
+
+    for pair in joueurs:
+        pair.session.corriger()
+    # La référence rejoue sans réseau les entrées réellement appliquées
+    entrees_g = [0] * delai + historique[pair_g]
+    entrees_d = [0] * delai + historique[pair_d]
+    for frame in range(frames):
+        reference.tick(entrees_g[frame], entrees_d[frame])
+
+    resultat = {
+        "identiques": gauche.instantane() == droite.instantane() == reference.instantane(),
+        "frames": frames,
+        "duree_frame_p99_ms": sorted(duree_frames)[int(0.99 * len(duree_frames))] * 1000,
+    }
+    for pair in joueurs:
+        session, liaison = pair.session, pair.liaison
+        resultat[pair.cote] = {
+            "rollbacks": session.rollbacks,
+            "frames_resimulees": session.frames_resimulees,
+            "profondeur_max": session.profondeur_max,
+            "attentes": session.attentes,
+            "cessions": session.cessions,
+            "paquets": liaison.envoyes,
+            "perdus": liaison.perdus,
+            "octets_par_seconde": liaison.octets / (len(duree_frames) / FPS),
+        }
+    for pair in joueurs:
+        pair.liaison.transport.close()
+    return resultat
+
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(description="Essai du jeu en ligne par rollback entre deux pairs locaux")
+    parser.add_argument("--frames", type=int, default=FPS * 20)
+    parser.add_argument("--latence", type=float, default=60, help="Latence aller simple, en ms (RTT = 2x)")
+    parser.add_argument("--gigue", type=float, default=10, help="Gigue, en ms")
+    parser.add_argument("--perte", type=float, default=0.05, help="Proportion de paquets perdus")
+    parser.add_argument("--delai", type=lire_delai, default=0, help="Retard de l'entrée locale, en frames")
+    parser.add_argument("--graine", type=int, default=0)
+    args = parser.parse_args(arguments)
+
+    couts = mesurer_couts()
+    print("Coûts (moteur scalaire):")
+    for cle, valeur in couts.items():
+        print(f"  {cle:<28}{valeur:>10.2f}")
+
+    resultat = asyncio.run(
+        essai_local(args.frames, args.latence / 1000, args.gigue / 1000, args.perte, args.delai, args.graine)
+    )
+    print(
+        f"Essai: {resultat['frames']} frames, RTT {2 * args.latence:.0f} ms, pertes {args.perte:.0%}, "
+        f"p99 frame {resultat['duree_frame_p99_ms']:.2f} ms"
+    )
+    for cote in ("gauche", "droite"):
+        stats = resultat[cote]
+        print(
+            f"  {cote:<7} rollbacks {stats['rollbacks']:>5}  re-simulées {stats['frames_resimulees']:>6}"
+            f"  profondeur max {stats['profondeur_max']:>3}  attentes {stats['attentes']:>4}"
+            f"  cessions {stats['cessions']:>3}"
+            f"  paquets {stats['paquets']:>5} (perdus {stats['perdus']})  {stats['octets_par_seconde']:.0f} o/s"
+        )
+    print("États finaux identiques (pairs et référence):", "oui" if resultat["identiques"] else "NON")
+    return 0 if resultat["identiques"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Profileur de frames par phase.
+
+Chaque frame occupe une ligne d'un tampon circulaire préalloué (`array` de
+nanosecondes): `mesurer(phase)` ajoute à la phase le temps écoulé depuis la
+mesure précédente, sans allocation d'objet par frame. L'attente entre la fin
+du dessin et la frame suivante (synchronisation de pyxel) n'est pas comptée.
+"""
+
+import csv
+import time
+from array import array
+
+PHASES = (
+    "entrees",
+    "raquettes",
+    "ia",
+    "balle",
+    "collisions",
+    "audio",
+    "etat",
+    "dessin_fond",
+    "dessin_raquettes",
+    "dessin_balle",
+    "dessin_textes",
+)
+(
+    ENTREES,
+    RAQUETTES,
+    IA,
+    BALLE,
+    COLLISIONS,
+    AUDIO,
+    ETAT,
+    DESSIN_FOND,
+    DESSIN_RAQUETTES,
+    DESSIN_BALLE,
+    DESSIN_TEXTES,
+) = range(len(PHASES))
+NB_PHASES = len(PHASES)
+
+# 10 secondes à 60 FPS
+CAPACITE_DEFAUT = 600
+# Les centiles de l'affichage ne sont recalculés que toutes les N frames
+RAFRAICHISSEMENT = 30
+
+
+def centile(valeurs_triees, p: float):
+    if not valeurs_triees:
+        return 0
+    return valeurs_triees[min(len(valeurs_triees) - 1, int(p * len(valeurs_triees)))]
+
+
+class Profileur:
+    def __init__(self, capacite: int = CAPACITE_DEFAUT):
+        self.capacite = capacite
+        self.tampon = array("q", bytes(8 * capacite * NB_PHASES))
+        self.ligne_vide = array("q", bytes(8 * NB_PHASES))
+        # Nombre total de frames vues; la ligne courante est frames % capacite
+        self.frames = 0
+        self.base = 0
+        self.dernier = time.perf_counter_ns()
+        self.resume = []
+
+    def nouvelle_frame(self) -> None:
+        self.frames += 1
+        self.base = (self.frames % self.capacite) * NB_PHASES
+        self.tampon[self.base : self.base + NB_PHASES] = self.ligne_vide
+        self.dernier = time.perf_counter_ns()
+
+    def reprendre(self) -> None:
+        """Repart de maintenant sans rien compter (ex. début du dessin)."""
+        self.dernier = time.perf_counter_ns()
+
+    def mesurer(self, phase: int) -> None:
+        maintenant = time.perf_counter_ns()
+        self.tampon[self.base + phase] += maintenant - self.dernier
+        self.dernier = maintenant
+
+    def lignes(self):
+        """Lignes complètes du tampon, de la plus ancienne à la plus récente."""
+        nombre = max(0, min(self.frames - 1, self.capacite - 1))
+        for frame in range(self.frames - nombre, self.frames):
+            base = (frame % self.capacite) * NB_PHASES
+            yield frame, self.tampon[base : base + NB_PHASES]
+
+    def centiles(self) -> list[tuple[str, float, float]]:
+        """(nom, p50, p99) en millisecondes pour chaque phase puis pour la frame entière."""
+        colonnes = [[] for _ in range(NB_PHASES + 1)]
+        for _, ligne in self.lignes():
+            for phase, duree in enumerate(ligne):
+                colonnes[phase].append(duree)
+            colonnes[NB_PHASES].append(sum(ligne))
+        resultat = []
+        for nom, valeurs in zip(PHASES + ("frame",), colonnes):
+            valeurs.sort()
+            resultat.append((nom, centile(valeurs, 0.5) / 1e6, centile(valeurs, 0.99) / 1e6))
+        return resultat
+
+    def texte(self) -> list[str]:
+        if not self.resume or self.frames % RAFRAICHISSEMENT == 0:
+            self.resume = [f"{nom:<17}{p50:6.2f}{p99:7.2f}" for nom, p50, p99 in self.centiles()]
+            self.resume.insert(0, f"{'ms':<17}{'p50':>6}{'p99':>7}")
+        return self.resume
+
+    def exporter_csv(self, chemin: str) -> None:
+        with open(chemin, "w", newline="") as fichier:
+            ecrivain = csv.writer(fichier)
+            ecrivain.writerow(("frame",) + tuple(f"{nom}_us" for nom in PHASES) + ("total_us",))
+            for frame, ligne in self.lignes():
+                ecrivain.writerow([frame] + [duree / 1000 for duree in ligne] + [sum(ligne) / 1000])
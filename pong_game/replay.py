@@ -0,0 +1,170 @@
+"""
+Format binaire compact de replay, avec images clés pour l'accès direct.
+
+Un replay ne stocke que la configuration du match (dont la graine) et les
+entrées des deux raquettes, sur 4 bits par frame. Le fichier est découpé en
+blocs de taille fixe: chaque bloc commence par un instantané complet du match
+(`Match.instantane`) suivi des entrées de `intervalle` frames. Aller à la
+frame f revient à lire le bloc f // intervalle et à rejouer au plus
+`intervalle - 1` frames, quelle que soit la longueur de la partie.
+
+Disposition:
+    en-tête   MAGIE, version, intervalle, nombre de frames, taille du JSON
+    JSON      configuration du match
+    blocs     [instantané][entrées: 2 frames par octet] ...
+"""
+
+import json
+import struct
+
+from .simulation import Match
+
+MAGIE = b"PONGRPL1"
+VERSION = 3
+FORMAT_ENTETE = "<8sHIII"
+INTERVALLE_DEFAUT = 300
+
+# Quartet d'entrée: bits 0-1 = entrée gauche + 1, bits 2-3 = entrée droite + 1.
+# La valeur 3 en bits 0-1 marque une remise à zéro de la partie (touche R).
+REINITIALISATION = 0b0011
+BOURRAGE = 0b1111
+
+
+def coder_entree(entree_g: int, entree_d: int) -> int:
+    return (entree_g + 1) | ((entree_d + 1) << 2)
+
+
+def decoder_entree(quartet: int) -> tuple[int, int]:
+    return (quartet & 0b11) - 1, (quartet >> 2) - 1
+
+
+def config_match(match: Match) -> dict:
+    return {
+        "mode_ordinateur": match.mode_ordinateur,
+        "niveau_ia": match.niveau_ia,
+        "niveau_ia_g": match.niveau_ia_g,
+        "score_max": match.score_max,
+        "graine": match.graine,
+        "parametres_ia": match.parametres_ia,
+        "parametres_ia_g": match.parametres_ia_g,
+        "echelle_raquette": match.echelle_raquette,
+        "table_ia": match.table_ia,
+    }
+
+
+class Enregistreur:
+    """
+    Enregistre un match frame par frame: appeler `tick` à la place de
+    `match.tick` (ou `noter` juste avant), puis `fermer`.
+    """
+
+    def __init__(self, chemin: str, match: Match, intervalle: int = INTERVALLE_DEFAUT):
+        if intervalle % 2:
+            raise ValueError("L'intervalle entre images clés doit être pair")
+        self.match = match
+        self.intervalle = intervalle
+        self.frames = 0
+        self.quartet_en_attente = None
+        self.fichier = open(chemin, "wb")
+        config = json.dumps(config_match(match)).encode()
+        self.fichier.write(struct.pack(FORMAT_ENTETE, MAGIE, VERSION, intervalle, 0, len(config)))
+        self.fichier.write(config)
+
+    def noter(self, quartet: int) -> None:
+        if self.frames % self.intervalle == 0:
+            self.fichier.write(self.match.instantane())
+        if self.quartet_en_attente is None:
+            self.quartet_en_attente = quartet
+        else:
+            self.fichier.write(bytes((self.quartet_en_attente | (quartet << 4),)))
+            self.quartet_en_attente = None
+        self.frames += 1
+
+    def tick(self, entree_g: int = 0, entree_d: int = 0) -> list:
+        self.noter(coder_entree(entree_g, entree_d))
+        return self.match.tick(entree_g, entree_d)
+
+    def reinitialiser(self) -> None:
+        self.noter(REINITIALISATION)
+        self.match.reinitialiser()
+
+    def fermer(self) -> None:
+        if self.fichier.closed:
+            return
+        if self.quartet_en_attente is not None:
+            self.fichier.write(bytes((self.quartet_en_attente | (BOURRAGE << 4),)))
+        self.fichier.seek(struct.calcsize("<8sHI"))
+        self.fichier.write(struct.pack("<I", self.frames))
+        self.fichier.close()
+
+
+class Lecteur:
+    """Relit un replay; `aller_a(frame)` est en temps constant."""
+
+    def __init__(self, chemin: str, match: Match | None = None):
+        with open(chemin, "rb") as fichier:
+            self.donnees = fichier.read()
+        magie, version, self.intervalle, frames, taille_config = struct.unpack_from(FORMAT_ENTETE, self.donnees)
+        if magie != MAGIE or version != VERSION:
+            raise ValueError(f"{chemin}: replay invalide ou de version inconnue")
+        debut_config = struct.calcsize(FORMAT_ENTETE)
+        self.config = json.loads(self.donnees[debut_config : debut_config + taille_config])
+        self.debut_blocs = debut_config + taille_config
+        self.taille_instantane = Match.TAILLE_INSTANTANE
+        self.taille_bloc = self.taille_instantane + self.intervalle // 2
+        # Un enregistrement interrompu n'a pas d'en-tête à jour: on compte les blocs
+        self.frames = frames or self.compter_frames()
+        # Un match fourni (ex. JeuPong pour l'affichage) est reconfiguré selon le replay
+        if match is None:
+            match = Match(**self.config)
+        else:
+            for cle, valeur in self.config.items():
+                setattr(match, cle, valeur)
+            match.creer_entites()
+        self.match = match
+
+    def compter_frames(self) -> int:
+        taille = len(self.donnees) - self.debut_blocs
+        blocs_complets, reste = divmod(taille, self.taille_bloc)
+        frames = blocs_complets * self.intervalle
+        if reste > self.taille_instantane:
+            frames += 2 * (reste - self.taille_instantane)
+        # Le bourrage ne peut apparaître que dans le tout dernier octet
+        if frames and self.donnees[-1] >> 4 == BOURRAGE:
+            frames -= 1
+        return frames
+
+    def quartet(self, frame: int) -> int:
+        bloc, position = divmod(frame, self.intervalle)
+        octet = self.donnees[self.debut_blocs + bloc * self.taille_bloc + self.taille_instantane + position // 2]
+        return octet >> 4 if position % 2 else octet & 0x0F
+
+    def entrees(self, frame: int) -> tuple[int, int]:
+        return decoder_entree(self.quartet(frame))
+
+    def appliquer(self, frame: int) -> list:
+        """Rejoue la frame `frame` sur `self.match` et renvoie ses événements."""
+        quartet = self.quartet(frame)
+        if quartet == REINITIALISATION:
+            self.match.reinitialiser()
+            return []
+        return self.match.tick(*decoder_entree(quartet))
+
+    def aller_a(self, frame: int) -> Match:
+        """Positionne `self.match` juste avant la frame `frame` (0 <= frame <= frames)."""
+        if not 0 <= frame <= self.frames:
+            raise IndexError(frame)
+        if not self.frames:
+            return self.match
+        bloc = min(frame // self.intervalle, (self.frames - 1) // self.intervalle)
+        debut = self.debut_blocs + bloc * self.taille_bloc
+        self.match.lire_instantane(self.donnees, debut)
+        for f in range(bloc * self.intervalle, frame):
+            self.appliquer(f)
+        return self.match
+
+    def lire(self, depuis: int = 0):
+        """Itère sur les frames à partir de `depuis`: (frame, événements)."""
+        self.aller_a(depuis)
+        for frame in range(depuis, self.frames):
+            yield frame, self.appliquer(frame)
@@ -0,0 +1,45 @@
+"""
+Flux pseudo-aléatoire SplitMix64, en pur Python.
+
+`Alea` expose le sous-ensemble de l'API de `random` utilisé par la simulation
+(`random`, `uniform`, `choice`) avec un état réduit à un seul entier 64 bits.
+Le moteur par lots (`batch.py`) implémente le même générateur sur des tableaux
+NumPy: à graine égale, les deux moteurs tirent exactement les mêmes nombres.
+"""
+
+MASQUE_64 = (1 << 64) - 1
+INCREMENT = 0x9E3779B97F4A7C15
+MULT_1 = 0xBF58476D1CE4E5B9
+MULT_2 = 0x94D049BB133111EB
+ECHELLE_53 = 1.0 / (1 << 53)
+
+
+class Alea:
+    __slots__ = ("etat",)
+
+    def __init__(self, graine: int = 0):
+        self.etat = graine & MASQUE_64
+
+    def suivant(self) -> int:
+        self.etat = (self.etat + INCREMENT) & MASQUE_64
+        z = self.etat
+        z = ((z ^ (z >> 30)) * MULT_1) & MASQUE_64
+        z = ((z ^ (z >> 27)) * MULT_2) & MASQUE_64
+        return z ^ (z >> 31)
+
+    def random(self) -> float:
+        return (self.suivant() >> 11) * ECHELLE_53
+
+    def uniform(self, a: float, b: float) -> float:
+        return a + (b - a) * self.random()
+
+    def choice(self, sequence):
+        return sequence[int(self.random() * len(sequence))]
+
+
+def deriver(graine: int, *indices: int) -> int:
+    """Graine d'un sous-flux indépendant, dérivée de `graine` et d'indices entiers."""
+    alea = Alea(graine)
+    for indice in indices:
+        alea.etat = (alea.suivant() + indice) & MASQUE_64
+    return alea.suivant()
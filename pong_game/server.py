@@ -0,0 +1,460 @@
+"""
+Serveur multi-matchs: des centaines de parties à 60 Hz sur une seule boucle
+asyncio, sans fenêtre.
+
+Chaque partie est un `Match` headless (le coeur que `JeuPong` habille de
+pyxel). Les parties sont rangées dans `fentes` lots de tick décalés dans la
+frame: un seul réveil du minuteur avance toutes les parties de sa fente, et
+les fentes étalent la charge au lieu de tout calculer au même instant. Un
+réveil en retard rattrape les ticks dus (au plus `RATTRAPAGE_MAX`).
+
+Un joueur se connecte en TCP (demande d'accès, réponse avec son match, son
+côté et son jeton), puis échange entrées et états soit sur UDP, soit sur la
+même connexion TCP. Deux joueurs qui demandent un adversaire humain sont
+appariés (dans un même processus); sinon l'adversaire est une IA. Avec
+`--processus N`, N processus servent chacun leur boucle: le port TCP est
+partagé (SO_REUSEPORT, le noyau répartit les connexions) et chaque processus
+a son port UDP.
+
+    python -m pong_game.server serveur --port 7300 --processus 4
+    python -m pong_game.server charge --bots 400 --duree 10
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import struct
+import sys
+import time
+from array import array
+from multiprocessing import Pool
+
+from .broadcast import ECHELLE_POSITION, ECHELLE_VITESSE
+from .profiler import centile
+from .simulation import Match
+
+FPS = 60
+PERIODE = 1 / FPS
+FENTES_DEFAUT = 4
+# Ticks rattrapés au plus par réveil en retard; au-delà ils sont abandonnés
+RATTRAPAGE_MAX = 8
+NIVEAUX = ("debutant", "amateur", "pro")
+
+# Messages: type sur un octet en tête
+REJOINDRE = 1
+ACCUEIL = 2
+ENTREE = 3
+ETAT = 4
+STRUCT_REJOINDRE = struct.Struct("<BBBB")  # type, contre IA, niveau de l'IA, UDP
+STRUCT_ACCUEIL = struct.Struct("<BIIBH")  # type, match, jeton, côté (0 gauche, 1 droite), port UDP
+STRUCT_ENTREE = struct.Struct("<BIIb")  # type, match, jeton, entrée (-1, 0, +1)
+# type, match, frame, scores, balle (x, y, vx, vy), raquettes (y gauche, y droite)
+STRUCT_ETAT = struct.Struct("<BIIHH6h")
+# Écart entre deux arrivées de bots d'un même processus (secondes)
+ARRIVEE_BOTS = 0.002
+# Au-delà de ce tampon d'envoi, un client TCP trop lent saute des états
+TAMPON_TCP_MAX = 64 * 1024
+
+
+class Joueur:
+    __slots__ = ("partie", "cote", "jeton", "adresse", "flux", "entree")
+
+    def __init__(self, cote: int, jeton: int, flux=None):
+        self.partie = None
+        self.cote = cote
+        self.jeton = jeton
+        # Adresse UDP (connue au premier paquet) ou flux TCP
+        self.adresse = None
+        self.flux = flux
+        self.entree = 0
+
+
+class Partie:
+    __slots__ = ("numero", "match", "joueurs", "fente")
+
+    def __init__(self, numero: int, match: Match, fente: int):
+        self.numero = numero
+        self.match = match
+        self.joueurs = [None, None]
+        self.fente = fente
+
+    def etat(self) -> bytes:
+        match = self.match
+        balle = match.balle
+        return STRUCT_ETAT.pack(
+            ETAT,
+            self.numero,
+            match.frame,
+            match.score_g,
+            match.score_d,
+            round(balle.x * ECHELLE_POSITION),
+            round(balle.y * ECHELLE_POSITION),
+            round(balle.vx * ECHELLE_VITESSE),
+            round(balle.vy * ECHELLE_VITESSE),
+            round(match.raq_g.y * ECHELLE_POSITION),
+            round(match.raq_d.y * ECHELLE_POSITION),
+        )
+
+
+class Serveur(asyncio.DatagramProtocol):
+    def __init__(self, fentes: int = FENTES_DEFAUT, port_udp: int = 0):
+        self.fentes = [[] for _ in range(fentes)]
+        self.parties = {}
+        self.port_udp = port_udp
+        self.transport = None
+        self.en_attente = None
+        self.numero = 0
+        self.alea = random.Random()
+        # Retard de chaque réveil sur son horaire (secondes)
+        self.retards = array("d")
+        self.ticks = 0
+        self.ticks_abandonnes = 0
+        self.parties_max = 0
+        # Parties réellement hébergées: contre l'IA, entre deux joueurs appariés
+        self.parties_ia = 0
+        self.parties_appariees = 0
+        self.connexions = set()
+
+    # --- Entrée des joueurs ---
+
+    def rejoindre(self, contre_ia: bool, niveau: str, flux=None) -> Joueur:
+        if not contre_ia and self.en_attente is not None:
+            # Deuxième joueur humain: il prend la droite de la partie en attente
+            partie = self.en_attente
+            self.en_attente = None
+            joueur = Joueur(1, self.alea.getrandbits(32), flux)
+            self.ajouter(partie, joueur)
+            self.fentes[partie.fente].append(partie)
+            self.parties_appariees += 1
+            return joueur
+        match = Match(mode_ordinateur=contre_ia, niveau_ia=niveau)
+        self.numero += 1
+        # Fente la moins chargée
+        fente = min(range(len(self.fentes)), key=lambda i: len(self.fentes[i]))
+        partie = Partie(self.numero, match, fente)
+        self.parties[partie.numero] = partie
+        joueur = Joueur(0, self.alea.getrandbits(32), flux)
+        self.ajouter(partie, joueur)
+        if contre_ia:
+            self.fentes[fente].append(partie)
+            self.parties_ia += 1
+        else:
+            # La partie ne démarre qu'avec son adversaire
+            self.en_attente = partie
+        self.parties_max = max(self.parties_max, len(self.parties))
+        return joueur
+
+    @staticmethod
+    def ajouter(partie: Partie, joueur: Joueur) -> None:
+        partie.joueurs[joueur.cote] = joueur
+        joueur.partie = partie
+
+    def quitter(self, joueur: Joueur) -> None:
+        partie = joueur.partie
+        partie.joueurs[joueur.cote] = None
+        if any(partie.joueurs):
+            # L'adversaire humain restant continue seul, raquette immobile en face
+            return
+        del self.parties[partie.numero]
+        if self.en_attente is partie:
+            self.en_attente = None
+        else:
+            self.fentes[partie.fente].remove(partie)
+
+    def joueur(self, numero: int, jeton: int) -> Joueur | None:
+        partie = self.parties.get(numero)
+        if partie is None:
+            return None
+        for joueur in partie.joueurs:
+            if joueur is not None and joueur.jeton == jeton:
+                return joueur
+        return None
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, donnees: bytes, adresse) -> None:
+        if len(donnees) != STRUCT_ENTREE.size or donnees[0] != ENTREE:
+            return
+        _, numero, jeton, entree = STRUCT_ENTREE.unpack(donnees)
+        joueur = self.joueur(numero, jeton)
+        if joueur is not None:
+            joueur.adresse = adresse
+            joueur.entree = max(-1, min(1, entree))
+
+    async def accueillir(self, lecteur: asyncio.StreamReader, ecrivain: asyncio.StreamWriter) -> None:
+        """Connexion TCP d'un joueur: accès, puis entrées sur le flux s'il ne passe pas par UDP."""
+        self.connexions.add(ecrivain)
+        try:
+            _, contre_ia, niveau, udp = STRUCT_REJOINDRE.unpack(await lecteur.readexactly(STRUCT_REJOINDRE.size))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            self.connexions.discard(ecrivain)
+            ecrivain.close()
+            return
+        joueur = self.rejoindre(bool(contre_ia), NIVEAUX[min(niveau, 2)], None if udp else ecrivain)
+        ecrivain.write(STRUCT_ACCUEIL.pack(ACCUEIL, joueur.partie.numero, joueur.jeton, joueur.cote, self.port_udp))
+        try:
+            while True:
+                # En UDP, la connexion ne sert plus qu'à détecter le départ du joueur
+                donnees = await lecteur.readexactly(STRUCT_ENTREE.size)
+                if donnees[0] == ENTREE:
+                    joueur.entree = max(-1, min(1, STRUCT_ENTREE.unpack(donnees)[3]))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.quitter(joueur)
+            self.connexions.discard(ecrivain)
+            ecrivain.close()
+
+    async def fermer(self) -> None:
+        """Ferme les connexions restantes: chaque accueil se termine par une fin de flux."""
+        for ecrivain in list(self.connexions):
+            ecrivain.close()
+        while self.connexions:
+            await asyncio.sleep(0.01)
+
+    # --- Cadence ---
+
+    def avancer(self, fente: list) -> None:
+        envoyer = self.transport.sendto if self.transport else None
+        for partie in fente:
+            g, d = partie.joueurs
+            match = partie.match
+            match.tick(g.entree if g else 0, d.entree if d else 0)
+            if match.termine:
+                match.reinitialiser()
+            etat = partie.etat()
+            for joueur in partie.joueurs:
+                if joueur is None:
+                    continue
+                if joueur.flux is not None:
+                    if joueur.flux.transport.get_write_buffer_size() < TAMPON_TCP_MAX:
+                        joueur.flux.write(etat)
+                elif joueur.adresse is not None and envoyer:
+                    envoyer(etat, joueur.adresse)
+        self.ticks += len(fente)
+
+    async def cadencer(self, duree: float | None = None) -> None:
+        """Un réveil par fente, `len(fentes)` fois par frame; chaque réveil avance toutes les parties de sa fente."""
+        pas = PERIODE / len(self.fentes)
+        debut = horaire = time.perf_counter()
+        reveil = 0
+        while duree is None or horaire - debut < duree:
+            maintenant = time.perf_counter()
+            self.retards.append(maintenant - horaire)
+            dus = 0
+            while horaire <= maintenant:
+                if dus < RATTRAPAGE_MAX:
+                    self.avancer(self.fentes[reveil % len(self.fentes)])
+                else:
+                    self.ticks_abandonnes += len(self.fentes[reveil % len(self.fentes)])
+                dus += 1
+                reveil += 1
+                horaire = debut + reveil * pas
+            await asyncio.sleep(horaire - time.perf_counter())
+
+
+async def executer(port: int, fentes: int, duree: float | None, hote: str, partage: bool, port_udp: int) -> dict:
+    boucle = asyncio.get_running_loop()
+    serveur = Serveur(fentes, port_udp)
+    transport, _ = await boucle.create_datagram_endpoint(lambda: serveur, local_addr=(hote, port_udp))
+    serveur.port_udp = transport.get_extra_info("sockname")[1]
+    ecoute = await asyncio.start_server(serveur.accueillir, hote, port, reuse_port=partage)
+    cpu = time.process_time()
+    debut = time.perf_counter()
+    try:
+        await serveur.cadencer(duree)
+    finally:
+        ecoute.close()
+        await serveur.fermer()
+        transport.close()
+    duree_reelle = time.perf_counter() - debut
+    retards = sorted(serveur.retards[FPS * len(serveur.fentes) :] or serveur.retards)
+    return {
+        "pid": os.getpid(),
+        "parties_max": serveur.parties_max,
+        "parties_ia": serveur.parties_ia,
+        "parties_appariees": serveur.parties_appariees,
+        "ticks": serveur.ticks,
+        "ticks_abandonnes": serveur.ticks_abandonnes,
+        "cpu": time.process_time() - cpu,
+        "duree": duree_reelle,
+        "retards": [centile(retards, p) for p in (0.5, 0.9, 0.99, 0.999)],
+    }
+
+
+def servir_processus(tache) -> dict:
+    port, fentes, duree, hote, partage, port_udp = tache
+    return asyncio.run(executer(port, fentes, duree, hote, partage, port_udp))
+
+
+def lancer_serveurs(pool: Pool, port: int, processus: int, fentes: int, duree: float | None, hote: str):
+    """Un serveur par processus sur le même port TCP; ports UDP port+1, port+2..."""
+    taches = [(port, fentes, duree, hote, processus > 1, port + 1 + i) for i in range(processus)]
+    return pool.map_async(servir_processus, taches)
+
+
+def afficher_rapport(rapports: list) -> None:
+    for r in sorted(rapports, key=lambda r: r["pid"]):
+        p50, p90, p99, p999 = (retard * 1000 for retard in r["retards"])
+        print(
+            f"processus {r['pid']}: {r['parties_ia']} parties contre l'IA, {r['parties_appariees']} entre joueurs"
+            f" ({r['parties_max']} simultanées au plus), {r['ticks'] / r['duree']:.0f} ticks/s,"
+            f" CPU {r['cpu'] / r['duree']:.0%}, retard des réveils p50 {p50:.2f} ms p90 {p90:.2f} ms"
+            f" p99 {p99:.2f} ms p99.9 {p999:.2f} ms, {r['ticks_abandonnes']} ticks abandonnés"
+        )
+    ticks = sum(r["ticks"] for r in rapports)
+    cpu = sum(r["cpu"] for r in rapports)
+    if ticks:
+        # Parties qu'un coeur entièrement occupé tiendrait à 60 Hz, au coût mesuré par tick
+        print(
+            f"{cpu / ticks * 1e6:.1f} µs CPU par tick de partie (réseau compris):"
+            f" {ticks / cpu / FPS:.0f} parties par coeur"
+        )
+
+
+# --- Bots de charge ---
+
+
+class BotUdp(asyncio.DatagramProtocol):
+    def __init__(self, bot: "Bot"):
+        self.bot = bot
+
+    def datagram_received(self, donnees: bytes, adresse) -> None:
+        self.bot.recevoir(donnees)
+
+
+class Bot:
+    """Client de charge: suit la balle avec sa raquette et compte les états reçus et les frames manquées."""
+
+    def __init__(self):
+        self.numero = self.jeton = self.cote = 0
+        self.envoyer = None
+        self.entree = 0
+        self.derniere_frame = -1
+        self.etats = 0
+        self.manquees = 0
+
+    def recevoir(self, donnees: bytes) -> None:
+        _, numero, frame, _, _, _, y, _, _, y_g, y_d = STRUCT_ETAT.unpack(donnees)
+        self.etats += 1
+        if self.derniere_frame >= 0 and frame > self.derniere_frame + 1:
+            self.manquees += frame - self.derniere_frame - 1
+        self.derniere_frame = frame
+        # Centre de la raquette (hauteur inconnue: on vise 30 px sous son haut) contre centre de la balle
+        ecart = y + 4 * ECHELLE_POSITION - ((y_d if self.cote else y_g) + 30 * ECHELLE_POSITION)
+        entree = 0 if abs(ecart) < 4 * ECHELLE_POSITION else (1 if ecart > 0 else -1)
+        if entree != self.entree:
+            self.entree = entree
+            self.envoyer(STRUCT_ENTREE.pack(ENTREE, self.numero, self.jeton, entree))
+
+    async def jouer(self, hote: str, port: int, contre_ia: bool, udp: bool, duree: float) -> None:
+        boucle = asyncio.get_running_loop()
+        lecteur, ecrivain = await asyncio.open_connection(hote, port)
+        ecrivain.write(STRUCT_REJOINDRE.pack(REJOINDRE, contre_ia, 1, udp))
+        _, self.numero, self.jeton, self.cote, port_udp = STRUCT_ACCUEIL.unpack(
+            await lecteur.readexactly(STRUCT_ACCUEIL.size)
+        )
+        fin = boucle.time() + duree
+        if udp:
+            transport, _ = await boucle.create_datagram_endpoint(lambda: BotUdp(self), remote_addr=(hote, port_udp))
+            self.envoyer = transport.sendto
+            # Premier paquet: le serveur apprend notre adresse
+            self.envoyer(STRUCT_ENTREE.pack(ENTREE, self.numero, self.jeton, 0))
+            await asyncio.sleep(fin - boucle.time())
+            transport.close()
+        else:
+            self.envoyer = ecrivain.write
+            try:
+                while boucle.time() < fin:
+                    donnees = await asyncio.wait_for(lecteur.readexactly(STRUCT_ETAT.size), fin - boucle.time())
+                    self.recevoir(donnees)
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                pass
+        ecrivain.close()
+
+
+def bots_de_charge(tache) -> dict:
+    hote, port, nombre, duree, part_udp, part_ia, decalage = tache
+
+    async def executer_bots():
+        bots = [Bot() for _ in range(nombre)]
+        parties = []
+        for i, bot in enumerate(bots):
+            k = decalage + i
+            # Les bots contre humains viennent par deux, à la suite, pour être appariés ensemble;
+            # la paire p joue l'IA quand int(p * part_ia) change: la proportion tient à toute taille
+            paire = k // 2
+            contre_ia = int((paire + 1) * part_ia) > int(paire * part_ia)
+            udp = int((k + 1) * part_udp) > int(k * part_udp)
+            parties.append(asyncio.ensure_future(bot.jouer(hote, port, contre_ia, udp, duree)))
+            # Arrivées étalées: pas de rafale de connexions
+            await asyncio.sleep(ARRIVEE_BOTS)
+        await asyncio.gather(*parties, return_exceptions=True)
+        return {"etats": sum(b.etats for b in bots), "manquees": sum(b.manquees for b in bots), "bots": nombre}
+
+    return asyncio.run(executer_bots())
+
+
+def essai_charge(args) -> None:
+    processus_bots = max(1, args.processus_bots)
+    # Le serveur tourne jusqu'au départ du dernier bot arrivé, avec une marge
+    arrivees = args.bots / processus_bots * ARRIVEE_BOTS * 2
+    with Pool(args.processus + processus_bots) as pool:
+        duree = args.duree + arrivees + 3.0
+        serveurs = lancer_serveurs(pool, args.port, args.processus, args.fentes, duree, "127.0.0.1")
+        time.sleep(0.5)
+        taches = []
+        reste = args.bots
+        for i in range(processus_bots):
+            nombre = reste // (processus_bots - i)
+            taches.append(("127.0.0.1", args.port, nombre, args.duree, args.part_udp, args.part_ia, args.bots - reste))
+            reste -= nombre
+        bots = pool.map_async(bots_de_charge, taches).get()
+        rapports = serveurs.get()
+
+    etats = sum(b["etats"] for b in bots)
+    manquees = sum(b["manquees"] for b in bots)
+    print(
+        f"{args.bots} bots ({sum(r['parties_ia'] for r in rapports)} parties contre l'IA,"
+        f" {sum(r['parties_appariees'] for r in rapports)} entre bots appariés),"
+        f" {args.processus} processus serveur, {args.fentes} fentes:"
+        f" {etats / args.bots / args.duree:.1f} états/s reçus par bot"
+        f" ({manquees / max(etats + manquees, 1):.2%} de frames manquées)"
+    )
+    afficher_rapport(rapports)
+
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(description="Serveur multi-matchs headless")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+    serveur = commandes.add_parser("serveur", help="Héberger des parties")
+    serveur.add_argument("--hote", default="0.0.0.0")
+    serveur.add_argument("--duree", type=float, help="Arrêt et rapport après cette durée (secondes)")
+    charge = commandes.add_parser("charge", help="Mesurer le serveur face à des bots locaux")
+    charge.add_argument("--bots", type=int, default=400)
+    charge.add_argument("--duree", type=float, default=10.0)
+    charge.add_argument("--processus-bots", type=int, default=max(1, (os.cpu_count() or 1) // 2))
+    charge.add_argument("--part-udp", type=float, default=0.5, help="Part des bots en UDP (les autres en TCP)")
+    charge.add_argument("--part-ia", type=float, default=0.5, help="Part des bots qui jouent contre l'IA")
+    for commande in (serveur, charge):
+        commande.add_argument("--port", type=int, default=7300)
+        commande.add_argument("--processus", type=int, default=1, help="Processus serveur (un coeur chacun)")
+        commande.add_argument("--fentes", type=int, default=FENTES_DEFAUT, help="Lots de tick par frame")
+    args = parser.parse_args(arguments)
+
+    if args.commande == "serveur":
+        if args.processus == 1:
+            rapports = [asyncio.run(executer(args.port, args.fentes, args.duree, args.hote, False, args.port + 1))]
+        else:
+            with Pool(args.processus) as pool:
+                rapports = lancer_serveurs(pool, args.port, args.processus, args.fentes, args.duree, args.hote).get()
+        afficher_rapport(rapports)
+    else:
+        essai_charge(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,775 @@
+"""
+Coeur de simulation du Pong, indépendant de pyxel.
+
+Les entités ne lisent aucune touche et ne jouent aucun son: les entrées des
+raquettes sont passées explicitement (-1 haut, 0 immobile, +1 bas) et chaque
+tick renvoie la liste des événements produits (rebond, frappe, point...).
+Le front-end pyxel (`entities.py`, `state.py`) n'est qu'un adaptateur autour.
+"""
+
+import math
+import random
+import struct
+from typing import NamedTuple
+
+from .config import (
+    LARGEUR_ECRAN,
+    HAUTEUR_ECRAN,
+    RAQ_L,
+    RAQ_H,
+    VITESSE_RAQ,
+    BAL_TAILLE,
+    BAL_V_INIT,
+    SCORE_MAX,
+)
+from .lookup import charger_table
+from .rng import Alea, deriver
+
+# Types d'événements
+REBOND = "rebond"
+FRAPPE = "frappe"
+POINT = "point"
+VICTOIRE = "victoire"
+
+
+class Evenement(NamedTuple):
+    type: str
+    cote: str = ""
+    # Pour une frappe: "spin", "slice", "effet" ou "normal"
+    nature: str = ""
+    rapide: bool = False
+
+
+# Amortissement de l'effet de la balle à chaque frame
+DECROISSANCE_EFFET = 0.98
+
+# Déplacement horizontal maximal de la balle par sous-pas de simulation
+DEPLACEMENT_MAX_SOUS_PAS = BAL_TAILLE
+
+# Sous-flux aléatoires d'un match, dérivés de sa graine
+FLUX_BALLE = 0
+FLUX_IA_G = 1
+FLUX_IA_D = 2
+
+# Attributs de SmartComputer réglables par un jeu de paramètres personnalisé
+PARAMETRES_IA = ("vitesse_max", "precision", "temps_reaction", "anticipation", "agressivite")
+
+
+class Raquette:
+    # Attributs fixes: pas de __dict__ par instance, accès plus rapides
+    __slots__ = ("x", "y", "y_precedente", "w", "h", "vitesse_mouvement")
+
+    def __init__(self, x: float, y: float):
+        self.x = x
+        self.y = y
+        self.y_precedente = y
+        self.w = RAQ_L
+        self.h = RAQ_H
+        self.vitesse_mouvement = 0
+
+    def maj(self, entree: int = 0, balle=None, dt: float = 1.0) -> None:
+        self.y_precedente = self.y
+
+        self.y += entree * VITESSE_RAQ * dt
+        self.vitesse_mouvement = self.y - self.y_precedente
+
+        if self.y < 0:
+            self.y = 0
+        if self.y + self.h > HAUTEUR_ECRAN:
+            self.y = HAUTEUR_ECRAN - self.h
+
+    def rect(self):
+        return (self.x, self.y, self.x + self.w, self.y + self.h)
+
+    def capturer(self) -> tuple:
+        # Même disposition que SmartComputer pour un format d'instantané unique
+        return (self.y, self.y_precedente, self.vitesse_mouvement, 0.0, 0.0, False, 0.0, 0, 0, 0, -1, 0.0)
+
+    def restaurer(self, valeurs) -> None:
+        self.y, self.y_precedente, self.vitesse_mouvement = valeurs[:3]
+
+
+class SmartComputer(Raquette):
+    __slots__ = (
+        "niveau",
+        "rng",
+        "position_cible",
+        "vitesse_reaction",
+        "derniere_balle_x",
+        "anticipation_active",
+        "position_anticipee",
+        "temps_sans_action",
+        "derniere_direction_balle",
+        "trajectoire_prevue",
+        "y_impact_prevu",
+        "table",
+    ) + PARAMETRES_IA
+
+    def __init__(
+        self, x: float, y: float, niveau: str = "amateur", rng=None, parametres: dict | None = None, table=None
+    ):
+        super().__init__(x, y)
+        self.niveau = niveau
+        # Table d'impacts précalculée (lookup.TableIA): remplace la prédiction et le bruit
+        self.table = table
+        self.rng = rng or Alea(random.getrandbits(64))
+        self.position_cible = y
+        self.vitesse_reaction = 0
+        self.derniere_balle_x = 0
+        self.anticipation_active = False
+        self.position_anticipee = y
+        self.temps_sans_action = 0
+        self.derniere_direction_balle = 0
+        # Prédiction d'impact, recalculée seulement quand la trajectoire change
+        self.trajectoire_prevue = -1
+        self.y_impact_prevu = y
+
+        if niveau == "debutant":
+            self.vitesse_max = VITESSE_RAQ * 0.6
+            self.precision = 0.4
+            self.temps_reaction = 8
+            self.anticipation = 0.1
+            self.agressivite = 0.2
+        elif niveau == "amateur":
+            self.vitesse_max = VITESSE_RAQ * 0.8
+            self.precision = 0.7
+            self.temps_reaction = 4
+            self.anticipation = 0.4
+            self.agressivite = 0.5
+        else:
+            self.vitesse_max = VITESSE_RAQ * 1.0
+            self.precision = 0.9
+            self.temps_reaction = 2
+            self.anticipation = 0.8
+            self.agressivite = 0.8
+
+        for cle, valeur in (parametres or {}).items():
+            if cle not in PARAMETRES_IA:
+                raise ValueError(f"Paramètre IA inconnu: {cle}")
+            setattr(self, cle, valeur)
+
+    def capturer(self) -> tuple:
+        return (
+            self.y,
+            self.y_precedente,
+            self.vitesse_mouvement,
+            self.position_cible,
+            self.derniere_balle_x,
+            self.anticipation_active,
+            self.position_anticipee,
+            self.temps_sans_action,
+            self.derniere_direction_balle,
+            self.rng.etat,
+            self.trajectoire_prevue,
+            self.y_impact_prevu,
+        )
+
+    def restaurer(self, valeurs) -> None:
+        (
+            self.y,
+            self.y_precedente,
+            self.vitesse_mouvement,
+            self.position_cible,
+            self.derniere_balle_x,
+            self.anticipation_active,
+            self.position_anticipee,
+            self.temps_sans_action,
+            self.derniere_direction_balle,
+            self.rng.etat,
+            self.trajectoire_prevue,
+            self.y_impact_prevu,
+        ) = valeurs
+
+    def calculer_position_optimale(self, balle):
+        # Hauteur visée par le centre de la raquette (comparée à ce centre dans `maj`)
+        position_basique = balle.y + balle.t / 2
+
+        # La balle arrive vers nous: vx > 0 à droite du terrain, vx < 0 à gauche
+        a_droite = self.x > LARGEUR_ECRAN / 2
+        if (balle.vx > 0) if a_droite else (balle.vx < 0):
+            if balle.trajectoire != self.trajectoire_prevue:
+                x_plan = self.x - balle.t if a_droite else self.x + self.w
+                self.y_impact_prevu = self.predire(balle, x_plan)
+                self.trajectoire_prevue = balle.trajectoire
+            cible_impact = self.y_impact_prevu + balle.t / 2
+            self.position_anticipee = position_basique + (cible_impact - position_basique) * self.anticipation
+            self.anticipation_active = True
+        else:
+            self.anticipation_active = False
+
+        facteur_offensif = 1.0
+        if self.agressivite > 0.5 and abs(balle.vx) > 1:
+            if balle.y < HAUTEUR_ECRAN / 3:
+                facteur_offensif = 0.7
+            elif balle.y > HAUTEUR_ECRAN * 2 / 3:
+                facteur_offensif = 1.3
+
+        if self.anticipation_active:
+            position_optimale = position_basique * (1 - self.precision) + self.position_anticipee * self.precision
+        else:
+            position_optimale = position_basique
+
+        # Jeu offensif: la balle frappe la raquette à 15 % de son centre, pour l'angler
+        return position_optimale + (facteur_offensif - 1) * self.h / 2
+
+    def predire(self, balle, x_plan: float) -> float:
+        return predire_y(balle, x_plan)
+
+    def maj(self, entree: int = 0, balle=None, dt: float = 1.0) -> None:
+        if not balle:
+            super().maj(entree, dt=dt)
+            return
+
+        self.y_precedente = self.y
+        rng = self.rng
+
+        if balle.x != self.derniere_balle_x:
+            direction_actuelle = 1 if balle.vx > 0 else -1
+            if direction_actuelle != self.derniere_direction_balle:
+                self.temps_sans_action = self.temps_reaction
+            self.derniere_direction_balle = direction_actuelle
+        self.derniere_balle_x = balle.x
+
+        if self.temps_sans_action > 0:
+            self.temps_sans_action -= 1
+            return
+
+        if self.table is not None:
+            self.suivre_table(balle, dt)
+            return
+
+        self.position_cible = self.calculer_position_optimale(balle)
+
+        erreur = rng.uniform(-30, 30) * (1 - self.precision)
+        self.position_cible += erreur
+
+        difference = self.position_cible - (self.y + self.h / 2)
+
+        if abs(difference) > 5:
+            distance_balle = abs(self.x - balle.x)
+            urgence = max(0.3, 1 - (distance_balle / LARGEUR_ECRAN))
+            vitesse = self.vitesse_max * urgence * dt
+            variation = rng.uniform(0.8, 1.2)
+            vitesse *= variation
+
+            if difference > 0:
+                self.y += min(vitesse, abs(difference))
+            else:
+                self.y -= min(vitesse, abs(difference))
+
+        if self.niveau == "debutant":
+            if rng.random() < 0.05:
+                self.y += rng.uniform(-15, 15)
+        elif self.niveau == "pro":
+            if not self.anticipation_active and rng.random() < 0.1:
+                centre = HAUTEUR_ECRAN / 2 - self.h / 2
+                if abs(self.y - centre) > 30:
+                    direction = 1 if centre > self.y else -1
+                    self.y += direction * (self.vitesse_max * 0.3)
+
+        if self.y < 0:
+            self.y = 0
+        if self.y + self.h > HAUTEUR_ECRAN:
+            self.y = HAUTEUR_ECRAN - self.h
+
+        self.vitesse_mouvement = self.y - self.y_precedente
+
+    def suivre_table(self, balle, dt: float) -> None:
+        """Déplacement vers le point d'impact lu dans la table, sans tirage aléatoire."""
+        self.position_cible = self.table.cible(balle, self.x > LARGEUR_ECRAN / 2)
+        difference = self.position_cible - (self.y + self.h / 2)
+        if abs(difference) > 5:
+            urgence = max(0.3, 1 - (abs(self.x - balle.x) / LARGEUR_ECRAN))
+            pas = min(self.vitesse_max * urgence * dt, abs(difference))
+            self.y += pas if difference > 0 else -pas
+
+        if self.y < 0:
+            self.y = 0
+        if self.y + self.h > HAUTEUR_ECRAN:
+            self.y = HAUTEUR_ECRAN - self.h
+
+        self.vitesse_mouvement = self.y - self.y_precedente
+
+
+def predire_y(balle, x_plan: float) -> float:
+    """
+    Ordonnée (haut de la balle) au moment où elle atteindra l'abscisse
+    `x_plan`, en forme close: le déplacement vertical sur n frames est
+    n * vy + effet * (1 - r^n) / (1 - r) (série géométrique de l'effet
+    amorti), puis replié entre les murs haut et bas. Exact jusqu'au prochain
+    rebond; au-delà, le changement d'effet au rebond est ignoré (d'où le
+    recalcul à chaque changement de trajectoire).
+    """
+    n = max((x_plan - balle.x) / balle.vx, 0.0) if balle.vx else 0.0
+    r = DECROISSANCE_EFFET
+    y = balle.y + n * balle.vy + balle.effet_y * (1 - r ** n) / (1 - r)
+    course = HAUTEUR_ECRAN - balle.t
+    y %= 2 * course
+    return y if y <= course else 2 * course - y
+
+
+class Balle:
+    __slots__ = (
+        "t",
+        "rng",
+        "x",
+        "y",
+        "vx",
+        "vy",
+        "x_precedent",
+        "y_precedent",
+        "effet_y",
+        "vitesse_max",
+        "derniere_collision",
+        "impact_force",
+        "trajectoire",
+    )
+
+    def __init__(self, rng=None, vitesse_max: float = BAL_V_INIT * 2.5):
+        self.t = BAL_TAILLE
+        self.rng = rng or Alea(random.getrandbits(64))
+        self.effet_y = 0.0
+        self.vitesse_max = vitesse_max
+        self.derniere_collision = 0
+        self.impact_force = 0.0
+        # Incrémenté à chaque changement de trajectoire (rebond, frappe, remise en jeu)
+        self.trajectoire = 0
+        self.reset(direction_aleatoire=True)
+
+    def reset(self, direction_aleatoire: bool = False) -> None:
+        self.x = LARGEUR_ECRAN / 2 - self.t / 2
+        self.y = HAUTEUR_ECRAN / 2 - self.t / 2
+        vx = BAL_V_INIT * (1 if self.rng.random() < 0.5 else -1)
+        vy = BAL_V_INIT * self.rng.choice([-0.6, -0.4, -0.2, 0.2, 0.4, 0.6])
+        if not direction_aleatoire:
+            vx = BAL_V_INIT
+            vy = -0.4
+        self.vx, self.vy = vx, vy
+        # Position au début du dernier pas, pour le test de collision balayé
+        self.x_precedent, self.y_precedent = self.x, self.y
+        self.effet_y = 0.0
+        self.derniere_collision = 0
+        self.impact_force = 0.0
+        self.trajectoire += 1
+
+    def capturer(self) -> tuple:
+        return (
+            self.x,
+            self.y,
+            self.vx,
+            self.vy,
+            self.effet_y,
+            self.derniere_collision,
+            self.impact_force,
+            self.rng.etat,
+            self.trajectoire,
+        )
+
+    def restaurer(self, valeurs) -> None:
+        (
+            self.x,
+            self.y,
+            self.vx,
+            self.vy,
+            self.effet_y,
+            self.derniere_collision,
+            self.impact_force,
+            self.rng.etat,
+            self.trajectoire,
+        ) = valeurs
+
+    def maj(self, evenements: list | None = None, dt: float = 1.0) -> None:
+        self.x_precedent, self.y_precedent = self.x, self.y
+        self.x += self.vx * dt
+        self.y += (self.vy + self.effet_y) * dt
+        self.effet_y *= DECROISSANCE_EFFET if dt == 1.0 else DECROISSANCE_EFFET ** dt
+        self.derniere_collision += 1
+
+        if self.y <= 0:
+            self.y = 0
+            self.vy = -self.vy
+            self.effet_y *= -0.5
+            self.trajectoire += 1
+            if evenements is not None:
+                evenements.append(Evenement(REBOND))
+        elif self.y + self.t >= HAUTEUR_ECRAN:
+            self.y = HAUTEUR_ECRAN - self.t
+            self.vy = -self.vy
+            self.effet_y *= -0.5
+            self.trajectoire += 1
+            if evenements is not None:
+                evenements.append(Evenement(REBOND))
+
+    def collision_raquette(self, raq: Raquette, evenements: list | None = None) -> bool:
+        centre_terrain = LARGEUR_ECRAN / 2
+        distance_centre = abs(self.x + self.t / 2 - centre_terrain)
+        distance_relative = distance_centre / (LARGEUR_ECRAN / 2)
+        taille_min = self.t * 0.6
+        taille_max = self.t * 1.4
+        taille_actuelle = taille_max - (distance_relative * (taille_max - taille_min))
+
+        offset = (self.t - taille_actuelle) / 2
+        bx1, by1 = self.x + offset, self.y + offset
+        bx2, by2 = bx1 + taille_actuelle, by1 + taille_actuelle
+        rx1, ry1, rx2, ry2 = raq.rect()
+
+        inter = not (bx2 < rx1 or bx1 > rx2 or by2 < ry1 or by1 > ry2)
+
+        # Seule une balle qui se dirige vers la raquette peut la frapper:
+        # après un renvoi elle s'éloigne, ce qui exclut les doubles frappes.
+        a_gauche = raq.x < centre_terrain
+        if (self.vx >= 0) if a_gauche else (self.vx <= 0):
+            return inter
+
+        if not inter:
+            # Test balayé: la face avant de la balle a-t-elle franchi la face
+            # de la raquette pendant le dernier pas (balle rapide ou grand dt) ?
+            if a_gauche:
+                avant = self.x_precedent + offset - rx2
+                apres = bx1 - rx2
+            else:
+                avant = rx1 - (self.x_precedent + offset + taille_actuelle)
+                apres = rx1 - bx2
+            if not avant >= 0 > apres:
+                return False
+            t_impact = avant / (avant - apres)
+            y_impact = self.y_precedent + (self.y - self.y_precedent) * t_impact
+            by1 = y_impact + offset
+            if by1 + taille_actuelle < ry1 or by1 > ry2:
+                return False
+            self.y = y_impact
+            inter = True
+
+        centre_balle_y = by1 + taille_actuelle / 2
+        impact_relatif = (centre_balle_y - ry1) / raq.h
+        impact_relatif = max(0.05, min(0.95, impact_relatif))
+
+        if self.vx < 0:
+            self.x = rx2 - offset
+        else:
+            self.x = rx1 - taille_actuelle - offset
+
+        angle_incidence = abs(self.vy / self.vx) if self.vx != 0 else 0
+        vitesse_incidence = math.sqrt(self.vx ** 2 + self.vy ** 2)
+
+        if impact_relatif < 0.5:
+            direction_base = -1
+            zone_factor = (0.5 - impact_relatif) * 2
+        else:
+            direction_base = 1
+            zone_factor = (impact_relatif - 0.5) * 2
+
+        distance_centre = abs(impact_relatif - 0.5) * 2
+        intensite_angle = distance_centre * 1.5
+        influence_incidence = min(angle_incidence * 0.4, 0.6)
+
+        vitesse_horizontale_base = abs(self.vx)
+        nouvelle_vitesse_h = min(vitesse_horizontale_base * 1.08, self.vitesse_max)
+        self.vx = -nouvelle_vitesse_h if self.vx > 0 else nouvelle_vitesse_h
+
+        nouvel_angle_voulu = direction_base * intensite_angle * 3.0
+        influence_ancienne_direction = self.vy * influence_incidence
+        self.vy = nouvel_angle_voulu + influence_ancienne_direction
+
+        if isinstance(raq, SmartComputer):
+            variance = (1 - raq.precision) * 1.5
+        else:
+            variance = 0.3
+        facteur_aleatoire = self.rng.uniform(-variance, variance)
+        self.vy += facteur_aleatoire
+
+        self.effet_y = (impact_relatif - 0.5) * 1.2 * vitesse_incidence * 0.1
+        if distance_centre > 0.3:
+            self.effet_y += direction_base * zone_factor * 0.8
+
+        mouvement_raquette = raq.vitesse_mouvement
+        if abs(mouvement_raquette) > 0.1:
+            if mouvement_raquette > 0:
+                if self.vy > 0:
+                    effet_mouvement = mouvement_raquette * 2.0
+                    bonus_vitesse = mouvement_raquette * 0.5
+                else:
+                    effet_mouvement = mouvement_raquette * 1.5
+                    bonus_vitesse = -mouvement_raquette * 0.3
+            else:
+                if self.vy < 0:
+                    effet_mouvement = mouvement_raquette * 2.0
+                    bonus_vitesse = -mouvement_raquette * 0.5
+                else:
+                    effet_mouvement = mouvement_raquette * 1.5
+                    bonus_vitesse = mouvement_raquette * 0.3
+
+            self.effet_y += effet_mouvement
+            self.vy += bonus_vitesse
+
+            if abs(mouvement_raquette) > 1.5:
+                self.impact_force = min(self.impact_force + 0.3, 1.0)
+                if mouvement_raquette * self.vy > 0:
+                    self.effet_y *= 1.5
+                else:
+                    self.effet_y *= 0.7
+
+        vitesse_v_max = 5.5
+        self.vy = max(-vitesse_v_max, min(vitesse_v_max, self.vy))
+
+        vitesse_totale = math.sqrt(self.vx ** 2 + self.vy ** 2)
+        if vitesse_totale > self.vitesse_max:
+            ratio = self.vitesse_max / vitesse_totale
+            self.vx *= ratio
+            self.vy *= ratio
+
+        vitesse_totale_finale = math.sqrt(self.vx ** 2 + self.vy ** 2)
+        if evenements is not None:
+            if abs(mouvement_raquette) > 1.5:
+                nature = "spin" if mouvement_raquette * self.vy > 0 else "slice"
+            elif abs(self.effet_y) > 1.0:
+                nature = "effet"
+            else:
+                nature = "normal"
+            cote = "gauche" if a_gauche else "droite"
+            rapide = vitesse_totale_finale > self.vitesse_max * 0.8
+            evenements.append(Evenement(FRAPPE, cote, nature, rapide))
+
+        self.impact_force = min(vitesse_totale_finale / self.vitesse_max, 1.0)
+        self.derniere_collision = 0
+        self.trajectoire += 1
+
+        return inter
+
+
+class Match:
+    """
+    Un match complet, sans fenêtre ni son.
+
+    `tick(entree_g, entree_d)` fait avancer la partie d'une frame et renvoie
+    les événements produits; l'état courant se lit directement sur les
+    attributs (`balle`, `raq_g`, `raq_d`, `score_g`, `score_d`).
+    Les classes d'entités sont des attributs de classe pour que le front-end
+    puisse y substituer ses versions dessinables.
+
+    Tout l'aléa passe par trois flux (balle, IA gauche, IA droite) dérivés de
+    `graine`: deux matchs de même graine et mêmes entrées sont identiques.
+    """
+
+    # frame et scores, une balle, une raquette (disposition de Balle.capturer et Raquette.capturer)
+    FORMAT_ENTETE = "<IHH"
+    FORMAT_BALLE = "5didQi"
+    FORMAT_RAQUETTE = "5d?d2iQid"
+    # En-tête, balle, puis les deux raquettes
+    FORMAT_INSTANTANE = FORMAT_ENTETE + FORMAT_BALLE + FORMAT_RAQUETTE * 2
+    # Enregistrement binaire de taille fixe: une copie d'état est une copie d'octets
+    STRUCT_INSTANTANE = struct.Struct(FORMAT_INSTANTANE)
+    TAILLE_INSTANTANE = STRUCT_INSTANTANE.size
+
+    classe_raquette = Raquette
+    classe_ordinateur = SmartComputer
+    classe_balle = Balle
+
+    def __init__(
+        self,
+        mode_ordinateur: bool = True,
+        niveau_ia: str = "debutant",
+        niveau_ia_g: str | None = None,
+        score_max: int = SCORE_MAX,
+        graine: int | None = None,
+        parametres_ia: dict | None = None,
+        parametres_ia_g: dict | None = None,
+        vitesse_max_balle: float = BAL_V_INIT * 2.5,
+        echelle_raquette: float | None = None,
+        table_ia: str | None = None,
+    ):
+        self.mode_ordinateur = mode_ordinateur
+        self.niveau_ia = niveau_ia
+        # Niveau de l'IA gauche: None = joueur humain (ou script) à gauche
+        self.niveau_ia_g = niveau_ia_g
+        self.parametres_ia = parametres_ia
+        self.parametres_ia_g = parametres_ia_g
+        self.vitesse_max_balle = vitesse_max_balle
+        # Hauteur des raquettes en multiple de RAQ_H, à la place de celle du niveau
+        self.echelle_raquette = echelle_raquette
+        # Fichier de table précalculée pour les IA (voir lookup.py), ouvert à la première lecture
+        self.table_ia = table_ia
+        self.score_max = score_max
+        self.graine = random.getrandbits(64) if graine is None else graine
+        self.rng_balle = Alea(deriver(self.graine, FLUX_BALLE))
+        self.rng_g = Alea(deriver(self.graine, FLUX_IA_G))
+        self.rng_d = Alea(deriver(self.graine, FLUX_IA_D))
+        self.frame = 0
+        self.score_g = 0
+        self.score_d = 0
+
+        self.raq_g = None
+        self.raq_d = None
+        self.balle = None
+        self.creer_entites()
+
+    @staticmethod
+    def taille_raquette(niveau: str) -> int:
+        if niveau == "debutant":
+            return int(RAQ_H * 1.2)
+        elif niveau == "amateur":
+            return RAQ_H
+        return int(RAQ_H * 0.7)
+
+    def creer_entites(self):
+        if self.echelle_raquette is not None:
+            taille_raquette = int(RAQ_H * self.echelle_raquette)
+        elif self.mode_ordinateur:
+            taille_raquette = self.taille_raquette(self.niveau_ia)
+        else:
+            taille_raquette = RAQ_H
+        table = charger_table(self.table_ia) if self.table_ia else None
+
+        if self.niveau_ia_g is not None:
+            # IA contre IA: chaque raquette garde la taille de son niveau
+            taille_g = self.taille_raquette(self.niveau_ia_g)
+            self.raq_g = self.classe_ordinateur(
+                x=18,
+                y=HAUTEUR_ECRAN / 2 - taille_g / 2,
+                niveau=self.niveau_ia_g,
+                rng=self.rng_g,
+                parametres=self.parametres_ia_g,
+                table=table,
+            )
+            self.raq_g.h = taille_g
+        else:
+            self.raq_g = self.classe_raquette(x=18, y=HAUTEUR_ECRAN / 2 - taille_raquette / 2)
+            self.raq_g.h = taille_raquette
+
+        x_d = LARGEUR_ECRAN - 18 - self.raq_g.w
+        y_d = HAUTEUR_ECRAN / 2 - taille_raquette / 2
+        if self.mode_ordinateur:
+            self.raq_d = self.classe_ordinateur(
+                x=x_d,
+                y=y_d,
+                niveau=self.niveau_ia,
+                rng=self.rng_d,
+                parametres=self.parametres_ia,
+                table=table,
+            )
+        else:
+            self.raq_d = self.classe_raquette(x=x_d, y=y_d)
+        self.raq_d.h = taille_raquette
+
+        self.balle = self.classe_balle(rng=self.rng_balle, vitesse_max=self.vitesse_max_balle)
+
+    @property
+    def termine(self) -> bool:
+        return self.score_g >= self.score_max or self.score_d >= self.score_max
+
+    def tick(self, entree_g: int = 0, entree_d: int = 0, dt: float = 1.0) -> list:
+        """
+        Avance le match de `dt` frames (1 par défaut). Les raquettes bougent
+        une fois; la balle est découpée en sous-pas d'au plus
+        DEPLACEMENT_MAX_SOUS_PAS pixels horizontaux, chacun avec ses collisions.
+        """
+        evenements = []
+        balle = self.balle
+
+        self.raq_g.maj(entree_g, balle, dt)
+        self.raq_d.maj(entree_d, balle, dt)
+
+        deplacement = abs(balle.vx) * dt
+        sous_pas = 1
+        if deplacement > DEPLACEMENT_MAX_SOUS_PAS:
+            sous_pas = math.ceil(deplacement / DEPLACEMENT_MAX_SOUS_PAS)
+        dt_sous_pas = dt / sous_pas
+        for _ in range(sous_pas):
+            balle.maj(evenements, dt_sous_pas)
+            balle.collision_raquette(self.raq_g, evenements)
+            balle.collision_raquette(self.raq_d, evenements)
+            if self.marquer(evenements):
+                break
+
+        self.frame += 1
+        return evenements
+
+    def marquer(self, evenements: list) -> bool:
+        balle = self.balle
+        if balle.x + balle.t < 0:
+            cote = "droite"
+        elif balle.x > LARGEUR_ECRAN:
+            cote = "gauche"
+        else:
+            return False
+
+        deja_termine = self.termine
+        if cote == "droite":
+            self.score_d += 1
+        else:
+            self.score_g += 1
+        evenements.append(Evenement(POINT, cote))
+        self.nouvelle_mise_en_jeu(a_droite=cote == "droite")
+        if self.termine and not deja_termine:
+            evenements.append(Evenement(VICTOIRE, cote))
+        return True
+
+    def nouvelle_mise_en_jeu(self, a_droite: bool) -> None:
+        if self.balle:
+            self.balle.reset(direction_aleatoire=True)
+            self.balle.vx = BAL_V_INIT * (1 if a_droite else -1)
+
+    def capturer(self) -> tuple:
+        """État dynamique complet du match, à plat (voir FORMAT_INSTANTANE)."""
+        return (
+            (self.frame, self.score_g, self.score_d)
+            + self.balle.capturer()
+            + self.raq_g.capturer()
+            + self.raq_d.capturer()
+        )
+
+    def restaurer(self, valeurs) -> None:
+        self.frame, self.score_g, self.score_d = valeurs[:3]
+        self.balle.restaurer(valeurs[3:12])
+        self.raq_g.restaurer(valeurs[12:24])
+        self.raq_d.restaurer(valeurs[24:36])
+
+    def instantane(self) -> bytes:
+        return self.STRUCT_INSTANTANE.pack(*self.capturer())
+
+    def charger_instantane(self, donnees: bytes) -> None:
+        self.restaurer(self.STRUCT_INSTANTANE.unpack(donnees))
+
+    def ecrire_instantane(self, tampon, position: int = 0) -> None:
+        """Écrit l'instantané dans `tampon` (bytearray, mmap...) sans allocation d'octets."""
+        self.STRUCT_INSTANTANE.pack_into(tampon, position, *self.capturer())
+
+    def lire_instantane(self, tampon, position: int = 0) -> None:
+        self.restaurer(self.STRUCT_INSTANTANE.unpack_from(tampon, position))
+
+    def reinitialiser(self) -> None:
+        self.score_g = 0
+        self.score_d = 0
+        if self.raq_g and self.raq_d and self.balle:
+            self.raq_g.y = HAUTEUR_ECRAN / 2 - RAQ_H / 2
+            self.raq_d.y = HAUTEUR_ECRAN / 2 - RAQ_H / 2
+            self.balle.reset(direction_aleatoire=True)
+
+
+class PasFixe:
+    """
+    Accumulateur à pas fixe: convertit le temps réellement écoulé en un
+    nombre entier de pas de simulation de durée `pas` (en secondes).
+    Au-delà de `pas_max` pas en retard, le surplus est abandonné plutôt que
+    de faire boucler la simulation.
+    """
+
+    def __init__(self, pas: float = 1 / 60, pas_max: int = 8):
+        self.pas = pas
+        self.pas_max = pas_max
+        self.reste = 0.0
+
+    def ajouter(self, duree: float) -> int:
+        self.reste += duree
+        nombre = int(self.reste // self.pas)
+        if nombre > self.pas_max:
+            nombre = self.pas_max
+            self.reste = 0.0
+        else:
+            self.reste -= nombre * self.pas
+        return nombre
+
+    @property
+    def alpha(self) -> float:
+        """Fraction du pas suivant déjà écoulée (pour interpoler l'affichage)."""
+        return self.reste / self.pas
@@ -1,5 +1,47 @@
+import glob
+import hashlib
+import os
+
 import pyxel
 
+from .config import DOSSIER_CACHE
+
+
+# Ressource .pyxres des sons compilés (dans DOSSIER_CACHE), nommée d'après
+# l'empreinte de ce fichier: toute modification de sound.py (ou de la
+# version de pyxel) la fait reconstruire
+def empreinte_sons() -> str:
+    with open(__file__, "rb") as fichier:
+        source = fichier.read()
+    return hashlib.sha1(source + pyxel.VERSION.encode()).hexdigest()[:16]
+
+
+def charger_sons(dossier_cache: str = DOSSIER_CACHE) -> bool:
+    """
+    Charge sons et musiques depuis le cache s'il est à jour, sinon les crée
+    avec `creer_sons` et enregistre le cache. Renvoie True si le cache a servi.
+    """
+    chemin = os.path.join(dossier_cache, f"sons-{empreinte_sons()}.pyxres")
+    if os.path.exists(chemin):
+        try:
+            pyxel.load(chemin, exclude_images=True, exclude_tilemaps=True)
+            return True
+        except Exception:
+            pass
+    creer_sons()
+    try:
+        os.makedirs(dossier_cache, exist_ok=True)
+        for ancien in glob.glob(os.path.join(dossier_cache, "sons-*.pyxres")):
+            os.remove(ancien)
+        # Écriture puis renommage: un lancement interrompu ne laisse pas de cache tronqué
+        temporaire = os.path.join(dossier_cache, f"ecriture-{os.getpid()}.pyxres")
+        pyxel.save(temporaire, exclude_images=True, exclude_tilemaps=True)
+        os.replace(temporaire, chemin)
+    except OSError:
+        pass
+    return False
+
+
 def creer_sons() -> None:
     # Sons individuels
     pyxel.sounds[0].set(notes="c2", tones="p", volumes="4", effects="n", speed=15)
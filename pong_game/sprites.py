@@ -0,0 +1,124 @@
+"""
+Tables de perspective et atlas de sprites de la balle.
+
+L'effet "3D" (balle plus grosse au centre du terrain) ne dépend que de la
+colonne x: `AtlasBalle` le précalcule pour chaque pixel, puis pré-rend dans une
+seule `pyxel.Image` toutes les combinaisons (taille, couleur, marqueur d'effet,
+éclat d'impact) que `Balle.dessiner` peut produire. Dessiner la balle revient
+alors à une lecture de table et un `blt`.
+"""
+
+import pyxel
+
+from .config import LARGEUR_ECRAN, COULEUR_FOND
+
+# Côté d'une case de l'atlas: la plus grande balle (t * 1.4) plus l'éclat et l'ombre
+CELLULE = 16
+CASES_PAR_LIGNE = 64
+# Marge de la balle dans sa case (place de l'éclat d'impact, 1 pixel autour)
+MARGE = 1
+
+COULEURS_BALLE = (7, 8, 9, 10, 11, 12, 14)
+# Marqueur d'effet: (décalage vertical signé, couleur, large) ou None
+SANS_MARQUEUR = None
+
+
+def couleur_vitesse(vx: float, vy: float) -> int:
+    vitesse_totale = abs(vx) + abs(vy)
+    if vitesse_totale > 7:
+        return 8
+    if vitesse_totale > 5:
+        return 10
+    if vitesse_totale > 3:
+        return 9
+    return 7
+
+
+def marqueur_effet(effet_y: float, taille: int):
+    """Point(s) indiquant le sens et l'intensité de l'effet, quantifiés au pixel."""
+    if abs(effet_y) <= 0.3:
+        return SANS_MARQUEUR
+    direction_effet = 1 if effet_y > 0 else -1
+    intensite = min(abs(effet_y) / 3.0, 1.0)
+    offset_effet_y = direction_effet * int(taille * 0.4 * intensite)
+    couleur_effet = 13 if intensite > 0.7 else 5
+    return offset_effet_y, couleur_effet, intensite > 0.8
+
+
+class AtlasBalle:
+    def __init__(self, t: int):
+        self.t = t
+        taille_min = t * 0.6
+        taille_max = t * 1.4
+        # Tables par colonne x (balle et traînée), bornées aux bords du terrain
+        self.tailles = []
+        self.decalages = []
+        self.tailles_trail = []
+        for x in range(LARGEUR_ECRAN + 1):
+            distance_relative = abs(x + t / 2 - LARGEUR_ECRAN / 2) / (LARGEUR_ECRAN / 2)
+            taille = taille_max - (distance_relative * (taille_max - taille_min))
+            self.tailles.append(int(taille))
+            self.decalages.append((t - int(taille)) / 2)
+            self.tailles_trail.append(int(taille * 0.5))
+        self.cases = {}
+        for taille in sorted(set(self.tailles)):
+            marqueurs = [SANS_MARQUEUR]
+            for decalage in range(int(taille * 0.4) + 1):
+                for direction in ((1, -1) if decalage else (1,)):
+                    marqueurs += [(direction * decalage, 5, False), (direction * decalage, 13, False)]
+                    marqueurs.append((direction * decalage, 13, True))
+            for couleur in COULEURS_BALLE:
+                for marqueur in marqueurs:
+                    for eclat in (False, True):
+                        self.cases[taille, couleur, marqueur, eclat] = len(self.cases)
+        # Rendu différé: pyxel doit être initialisé pour créer l'image
+        self.image = None
+
+    def construire(self) -> None:
+        lignes = -(-len(self.cases) // CASES_PAR_LIGNE)
+        self.image = pyxel.Image(CASES_PAR_LIGNE * CELLULE, lignes * CELLULE)
+        self.image.cls(COULEUR_FOND)
+        for cle, indice in self.cases.items():
+            ligne, colonne = divmod(indice, CASES_PAR_LIGNE)
+            self.rendre(colonne * CELLULE + MARGE, ligne * CELLULE + MARGE, *cle)
+
+    def rendre(self, x: int, y: int, taille: int, couleur: int, marqueur, eclat: bool) -> None:
+        image = self.image
+        if taille > self.t:
+            taille_ombre = int(taille * 0.8)
+            image.rect(x + 2, y + 2, taille_ombre, taille_ombre, 1)
+        if eclat:
+            image.rect(x - 1, y - 1, taille + 2, taille + 2, 7)
+        image.rect(x, y, taille, taille, couleur)
+        # L'éclat redessinait la balle par-dessus le reflet
+        if taille > self.t * 1.1 and not eclat:
+            image.pset(x + taille // 2 - 1, y + taille // 2 - 1, 7)
+        if marqueur is not SANS_MARQUEUR:
+            offset_effet_y, couleur_effet, large = marqueur
+            centre_x = x + taille // 2
+            centre_y = y + taille // 2 + offset_effet_y
+            image.pset(centre_x, centre_y, couleur_effet)
+            if large:
+                image.pset(centre_x - 1, centre_y, couleur_effet)
+                image.pset(centre_x + 1, centre_y, couleur_effet)
+
+    def colonne(self, x: float) -> int:
+        return min(max(int(x), 0), LARGEUR_ECRAN)
+
+    def dessiner(self, x: float, y: float, couleur: int, effet_y: float, eclat: bool) -> None:
+        if self.image is None:
+            self.construire()
+        colonne = self.colonne(x)
+        taille = self.tailles[colonne]
+        decalage = self.decalages[colonne]
+        ligne, case = divmod(self.cases[taille, couleur, marqueur_effet(effet_y, taille), eclat], CASES_PAR_LIGNE)
+        pyxel.blt(
+            x + decalage - MARGE,
+            y + decalage - MARGE,
+            self.image,
+            case * CELLULE,
+            ligne * CELLULE,
+            CELLULE,
+            CELLULE,
+            COULEUR_FOND,
+        )
@@ -0,0 +1,47 @@
+"""
+Chronométrage du démarrage, du lancement du processus à la première frame.
+
+Ce module n'importe que la bibliothèque standard: le créer en tout premier
+(avant d'importer pyxel et le jeu) permet de mesurer aussi ces imports.
+"""
+
+import os
+import time
+
+
+def duree_depuis_lancement() -> float | None:
+    """Secondes écoulées depuis le lancement du processus (Linux seulement), sinon None."""
+    try:
+        with open("/proc/self/stat") as fichier:
+            # Le nom du programme (2e champ) peut contenir des espaces: on repart après ')'
+            champs = fichier.read().rpartition(")")[2].split()
+        with open("/proc/uptime") as fichier:
+            uptime = float(fichier.read().split()[0])
+        return uptime - int(champs[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class ChronoDemarrage:
+    def __init__(self):
+        self.debut = time.perf_counter()
+        # Temps passé avant la création du chrono (démarrage de l'interpréteur)
+        self.avant = duree_depuis_lancement()
+        self.etapes = []
+
+    def etape(self, nom: str) -> None:
+        self.etapes.append((nom, time.perf_counter()))
+
+    def rapport(self) -> str:
+        lignes = ["Démarrage:"]
+        total = 0.0
+        if self.avant is not None:
+            total = self.avant
+            lignes.append(f"  {'interpréteur':<24}{self.avant * 1000:8.1f} ms")
+        precedent = self.debut
+        for nom, instant in self.etapes:
+            lignes.append(f"  {nom:<24}{(instant - precedent) * 1000:8.1f} ms")
+            precedent = instant
+        total += precedent - self.debut
+        lignes.append(f"  {'total':<24}{total * 1000:8.1f} ms")
+        return "\n".join(lignes)
@@ -1,195 +1,225 @@
+import atexit
+import os
+import time
+
 import pyxel
 
 from .config import (
     LARGEUR_ECRAN,
     HAUTEUR_ECRAN,
-    COULEUR_FOND,
-    RAQ_H,
-    SCORE_MAX,
-    VITESSE_RAQ,
-    BAL_V_INIT,
     TOUCHES,
 )
 from .entities import Raquette, SmartComputer, Balle
-
-
-class JeuPong:
-    def __init__(self):
-        self.etat = "menu"
+from .layers import Calque
+from .audio import BusAudio
+from .profiler import (
+    Profileur,
+    ENTREES,
+    COLLISIONS,
+    AUDIO,
+    DESSIN_FOND,
+    DESSIN_RAQUETTES,
+    DESSIN_BALLE,
+    DESSIN_TEXTES,
+)
+from .simulation import Match, REBOND, FRAPPE, POINT
+from .replay import Enregistreur, REINITIALISATION
+from .etats import Etat
+from .governor import COMPLET, SIMPLIFIE
+
+NIVEAUX = ["debutant", "amateur", "pro"]
+# Durée de la musique de transition avant la partie, en frames (~2 s)
+DUREE_FONDU = 120
+# Frames de menu avant de passer à la musique étendue (~8 s)
+FRAMES_MENU_ETENDU = 240
+
+
+class JeuPong(Match):
+    classe_raquette = Raquette
+    classe_ordinateur = SmartComputer
+    classe_balle = Balle
+
+    def __init__(
+        self,
+        dossier_replays: str | None = None,
+        profileur: Profileur | None = None,
+        audio: BusAudio | None = None,
+        table_ia: str | None = None,
+    ):
+        # Enregistrement des parties (un fichier par partie lancée)
+        self.dossier_replays = dossier_replays
+        self.enregistreur = None
+        # Mesure du temps de chaque phase de la frame (voir profiler.py)
+        self.profileur = profileur
+        # Sons et musiques passent par le bus, vidé une fois par frame dans `maj`
+        self.audio = audio if audio is not None else BusAudio()
+        super().__init__(mode_ordinateur=True, niveau_ia="debutant", table_ia=table_ia)
+        self.etat = Etat.MENU
+        # Écran resté affiché pendant le fondu (menu ou difficulté)
+        self.ecran_fondu = Etat.MENU
         self.selection_menu = 0
         self.selection_difficulte = 0
         self.pause = False
-        self.score_g = 0
-        self.score_d = 0
-        self.mode_ordinateur = True
-        self.niveau_ia = "debutant"
+        # Palier de qualité du dessin, réglé par le gouverneur de l'application
+        self.qualite = COMPLET
         self.musique_menu_active = False
         # Gestion musique menu étendue et fade-out
         self.menu_frames = 0
         self.menu_extended = False
-        self.fade_out = False
         self.fade_out_frames = 0
-        self.demarrage_jeu_en_attente = False
-
-        self.raq_g = None
-        self.raq_d = None
-        self.balle = None
+        # Tables de dispatch de l'automate: une mise à jour et un dessin par état
+        self.mises_a_jour = {
+            Etat.MENU: self.maj_menu,
+            Etat.DIFFICULTE: self.maj_difficulte,
+            Etat.FONDU: self.maj_fondu,
+            Etat.JEU: self.maj_jeu,
+            Etat.VICTOIRE: self.maj_victoire,
+        }
+        self.dessins = {
+            Etat.MENU: self.dessiner_menu,
+            Etat.DIFFICULTE: self.dessiner_difficulte,
+            Etat.FONDU: self.dessiner_fondu,
+            Etat.JEU: self.dessiner_jeu,
+            Etat.VICTOIRE: self.dessiner_victoire,
+        }
+        # Contenu statique pré-rendu, re-dessiné seulement quand sa clé change
+        self.calque_menu = Calque(0, 0, LARGEUR_ECRAN, HAUTEUR_ECRAN, self.rendre_menu, opaque=True)
+        self.calque_difficulte = Calque(0, 0, LARGEUR_ECRAN, HAUTEUR_ECRAN, self.rendre_difficulte, opaque=True)
+        self.calque_terrain = Calque(0, 0, LARGEUR_ECRAN, HAUTEUR_ECRAN, self.rendre_terrain, opaque=True)
+        self.calque_score = Calque(LARGEUR_ECRAN // 2 - 60, 20, 120, 8, self.rendre_score)
 
     def creer_entites(self):
-        if self.mode_ordinateur:
-            if self.niveau_ia == "debutant":
-                taille_raquette = int(RAQ_H * 1.2)
-            elif self.niveau_ia == "amateur":
-                taille_raquette = RAQ_H
-            else:
-                taille_raquette = int(RAQ_H * 0.7)
-        else:
-            taille_raquette = RAQ_H
-
-        self.raq_g = Raquette(
-            x=18,
-            y=HAUTEUR_ECRAN / 2 - taille_raquette / 2,
-            touche_haut=TOUCHES["gauche_haut"],
-            touche_bas=TOUCHES["gauche_bas"],
-        )
-        self.raq_g.h = taille_raquette
-
-        if self.mode_ordinateur:
-            self.raq_d = SmartComputer(
-                x=LARGEUR_ECRAN - 18 - self.raq_g.w,
-                y=HAUTEUR_ECRAN / 2 - taille_raquette / 2,
-                niveau=self.niveau_ia,
-            )
-            self.raq_d.h = taille_raquette
-        else:
-            self.raq_d = Raquette(
-                x=LARGEUR_ECRAN - 18 - self.raq_g.w,
-                y=HAUTEUR_ECRAN / 2 - taille_raquette / 2,
-                touche_haut=TOUCHES["droite_haut"],
-                touche_bas=TOUCHES["droite_bas"],
-            )
-            self.raq_d.h = taille_raquette
-
-        self.balle = Balle()
+        super().creer_entites()
+        for entite in (self.raq_g, self.raq_d, self.balle):
+            entite.profileur = self.profileur
+        self.raq_g.touche_haut = TOUCHES["gauche_haut"]
+        self.raq_g.touche_bas = TOUCHES["gauche_bas"]
+        if not self.mode_ordinateur:
+            self.raq_d.touche_haut = TOUCHES["droite_haut"]
+            self.raq_d.touche_bas = TOUCHES["droite_bas"]
+
+    def ouvrir_replay(self) -> None:
+        self.fermer_replay()
+        if self.dossier_replays:
+            os.makedirs(self.dossier_replays, exist_ok=True)
+            nom = time.strftime("partie-%Y%m%d-%H%M%S.pongrep")
+            self.enregistreur = Enregistreur(os.path.join(self.dossier_replays, nom), self)
+            # Fermé à la sortie si la partie est encore en cours (pyxel.quit); retiré à la fermeture
+            atexit.register(self.fermer_replay)
+
+    def fermer_replay(self) -> None:
+        if self.enregistreur:
+            self.enregistreur.fermer()
+            self.enregistreur = None
+            atexit.unregister(self.fermer_replay)
+
+    def mesurer(self, phase: int) -> None:
+        if self.profileur:
+            self.profileur.mesurer(phase)
+
+    def jouer_evenements(self, evenements: list) -> None:
+        for evenement in evenements:
+            if evenement.type == REBOND:
+                self.audio.jouer("rebond")
+            elif evenement.type == FRAPPE:
+                self.audio.jouer("frappe_" + evenement.nature)
+                if evenement.rapide:
+                    self.audio.jouer("frappe_rapide")
+            elif evenement.type == POINT:
+                self.audio.jouer("point")
 
     def gerer_musique_menu(self):
-        # Ne pas gérer la musique menu si on est en phase de fade-out ou victoire
-        if self.fade_out or hasattr(self, "victoire_son_joue"):
-            return
-
-        if self.etat in ["menu", "difficulte"]:
+        # Appelée sur les écrans de menu seulement (pas pendant le fondu ni la partie)
+        if not self.musique_menu_active:
             # Choix de la piste selon extension
             piste_voulue = 3 if self.menu_extended else 0
-            if not self.musique_menu_active:
-                pyxel.playm(piste_voulue, loop=True)
-                self.musique_menu_active = True
-        else:
+            self.audio.musique(piste_voulue, boucle=True)
+            self.musique_menu_active = True
+
+    def compter_frames_menu(self):
+        # Comptage frames pour déclencher musique étendue
+        self.menu_frames += 1
+        if not self.menu_extended and self.menu_frames >= FRAMES_MENU_ETENDU:
+            self.menu_extended = True
+            # Forcer redémarrage musique sur piste étendue
             if self.musique_menu_active:
-                pyxel.stop()
+                self.audio.arreter()
                 self.musique_menu_active = False
+                self.gerer_musique_menu()
 
-    def maj_menu(self):
-        self.gerer_musique_menu()
-
-        # Comptage frames pour déclencher musique étendue (environ 8s => 240 frames)
-        if not self.fade_out:
-            self.menu_frames += 1
-            if not self.menu_extended and self.menu_frames >= 240:
-                self.menu_extended = True
-                # Forcer redémarrage musique sur piste étendue
-                if self.musique_menu_active:
-                    pyxel.stop()
-                    self.musique_menu_active = False
-                    self.gerer_musique_menu()
-
+    def naviguer(self, selection: int) -> int:
+        """Déplace une sélection de menu (3 entrées) avec haut/bas ou Z/S."""
         if pyxel.btnp(TOUCHES["haut"]) or pyxel.btnp(TOUCHES["gauche_haut"]):
-            self.selection_menu = (self.selection_menu - 1) % 3
-            pyxel.play(0, 4)
+            selection = (selection - 1) % 3
+            self.audio.jouer("navigation")
         if pyxel.btnp(TOUCHES["bas"]) or pyxel.btnp(TOUCHES["gauche_bas"]):
-            self.selection_menu = (self.selection_menu + 1) % 3
-            pyxel.play(0, 4)
-
-        if not self.fade_out:
-            if pyxel.btnp(TOUCHES["entree"]) or pyxel.btnp(pyxel.KEY_SPACE):
-                pyxel.play(0, 5)
-                if self.selection_menu == 0:
-                    self.mode_ordinateur = True
-                    self.etat = "difficulte"
-                    # Réinitialiser compteur difficulté
-                    self.menu_frames = 0
-                elif self.selection_menu == 1:
-                    # Lancement fade-out avant jeu direct
-                    self.mode_ordinateur = False
-                    self.init_fade_out()
-                elif self.selection_menu == 2:
-                    pyxel.quit()
+            selection = (selection + 1) % 3
+            self.audio.jouer("navigation")
+        return selection
+
+    def valider(self) -> bool:
+        if pyxel.btnp(TOUCHES["entree"]) or pyxel.btnp(pyxel.KEY_SPACE):
+            self.audio.jouer("validation")
+            return True
+        return False
+
+    def maj_menu(self):
+        self.gerer_musique_menu()
+        self.compter_frames_menu()
+        self.selection_menu = self.naviguer(self.selection_menu)
+
+        if self.valider():
+            if self.selection_menu == 0:
+                self.mode_ordinateur = True
+                self.etat = Etat.DIFFICULTE
+                # Réinitialiser compteur difficulté
+                self.menu_frames = 0
+            elif self.selection_menu == 1:
+                # Lancement fade-out avant jeu direct
+                self.mode_ordinateur = False
+                self.init_fade_out()
+            elif self.selection_menu == 2:
+                pyxel.quit()
 
         if pyxel.btnp(TOUCHES["quitter"]):
             pyxel.quit()
 
-        # Gestion fade-out si actif
-        if self.fade_out:
-            self.fade_out_frames += 1
-            # Après ~2s (120 frames) démarrage du jeu
-            if self.fade_out_frames >= 120:
-                self.creer_entites()
-                self.etat = "jeu"
-                self.terminer_fade_out()
-
     def maj_difficulte(self):
         self.gerer_musique_menu()
+        self.compter_frames_menu()
+        self.selection_difficulte = self.naviguer(self.selection_difficulte)
 
-        if not self.fade_out:
-            self.menu_frames += 1
-            if not self.menu_extended and self.menu_frames >= 240:
-                self.menu_extended = True
-                if self.musique_menu_active:
-                    pyxel.stop()
-                    self.musique_menu_active = False
-                    self.gerer_musique_menu()
-
-        if pyxel.btnp(TOUCHES["haut"]) or pyxel.btnp(TOUCHES["gauche_haut"]):
-            self.selection_difficulte = (self.selection_difficulte - 1) % 3
-            pyxel.play(0, 4)
-        if pyxel.btnp(TOUCHES["bas"]) or pyxel.btnp(TOUCHES["gauche_bas"]):
-            self.selection_difficulte = (self.selection_difficulte + 1) % 3
-            pyxel.play(0, 4)
-
-        if not self.fade_out:
-            if pyxel.btnp(TOUCHES["entree"]) or pyxel.btnp(pyxel.KEY_SPACE):
-                pyxel.play(0, 5)
-                niveaux = ["debutant", "amateur", "pro"]
-                self.niveau_ia = niveaux[self.selection_difficulte]
-                # Lancer fade-out avant jeu
-                self.init_fade_out()
+        if self.valider():
+            self.niveau_ia = NIVEAUX[self.selection_difficulte]
+            # Lancer fade-out avant jeu
+            self.init_fade_out()
 
         if pyxel.btnp(TOUCHES["quitter"]):
-            self.etat = "menu"
-            # Réinitialiser pour que musique menu reparte proprement
-            self.menu_frames = 0
-            self.menu_extended = False
-            if self.fade_out:
-                self.terminer_fade_out(abandon=True)
-
-        if self.fade_out:
-            self.fade_out_frames += 1
-            if self.fade_out_frames >= 120:
-                self.creer_entites()
-                self.etat = "jeu"
-                self.terminer_fade_out()
+            self.retour_menu()
+
+    def maj_fondu(self):
+        # L'écran d'origine reste navigable, mais plus rien ne se valide
+        if self.ecran_fondu is Etat.MENU:
+            self.selection_menu = self.naviguer(self.selection_menu)
+            if pyxel.btnp(TOUCHES["quitter"]):
+                pyxel.quit()
+        else:
+            self.selection_difficulte = self.naviguer(self.selection_difficulte)
+            if pyxel.btnp(TOUCHES["quitter"]):
+                self.retour_menu()
+                return
 
-    def maj_jeu(self):
-        self.gerer_musique_menu()
+        self.fade_out_frames += 1
+        if self.fade_out_frames >= DUREE_FONDU:
+            self.lancer_partie()
 
+    def maj_jeu(self):
         if pyxel.btnp(TOUCHES["pause"]):
             self.pause = not self.pause
         if pyxel.btnp(TOUCHES["reset"]):
             self.reinitialiser()
         if pyxel.btnp(TOUCHES["quitter"]):
-            self.etat = "menu"
-            # Reset pour menu
-            self.menu_frames = 0
-            self.menu_extended = False
+            self.quitter_partie()
             return
 
         if self.pause:
@@ -198,171 +228,188 @@ class JeuPong:
         if not self.raq_g or not self.raq_d or not self.balle:
             return
 
-        self.raq_g.maj()
-        if isinstance(self.raq_d, SmartComputer):
-            self.raq_d.maj(self.balle.y, self.balle)
+        entree_g, entree_d = self.raq_g.lire_entree(), self.raq_d.lire_entree()
+        self.mesurer(ENTREES)
+        if self.enregistreur:
+            evenements = self.enregistreur.tick(entree_g, entree_d)
         else:
-            self.raq_d.maj()
-
-        self.balle.maj()
-        self.balle.collision_raquette(self.raq_g)
-        self.balle.collision_raquette(self.raq_d)
-
-        if self.balle.x + self.balle.t < 0:
-            self.score_d += 1
-            pyxel.play(1, 3)
-            self.nouvelle_mise_en_jeu(a_droite=True)
-        elif self.balle.x > LARGEUR_ECRAN:
-            self.score_g += 1
-            pyxel.play(1, 3)
-            self.nouvelle_mise_en_jeu(a_droite=False)
-
-        if self.score_g >= SCORE_MAX or self.score_d >= SCORE_MAX:
-            if not hasattr(self, "victoire_son_joue"):
-                pyxel.stop()  # Arrêter sons/musiques courants
-                # Reset indicateurs audio de menu/fade-out pour éviter interférences
-                self.musique_menu_active = False
-                self.fade_out = False
-                piste = 1 if self.score_g > self.score_d else 2
-                print(f"[DEBUG] Victoire: lecture musique piste {piste} (score_g={self.score_g}, score_d={self.score_d})")
-                pyxel.playm(piste, loop=False)
-                self.victoire_son_joue = True
-                self.victoire_piste = piste
-                self.victoire_frame_start = pyxel.frame_count
-            else:
-                # Vérification simple: si quelques frames après déclenchement aucun son actif, relancer.
-                if hasattr(self, "victoire_frame_start") and pyxel.frame_count - self.victoire_frame_start > 15:
-                    # Impossible de vérifier directement playm actif sans API; on relance prudemment une seule fois.
-                    if not hasattr(self, "victoire_replay"):
-                        print("[DEBUG] Relance musique victoire/defaite (sécurité)")
-                        pyxel.playm(self.victoire_piste, loop=False)
-                        self.victoire_replay = True
+            evenements = self.tick(entree_g, entree_d)
+        # Fin du tick (points marqués) comptée avec les collisions
+        self.mesurer(COLLISIONS)
+        self.jouer_evenements(evenements)
+        self.mesurer(AUDIO)
+
+        if self.termine:
+            self.entrer_victoire()
+
+    def maj_victoire(self):
+        if pyxel.btnp(TOUCHES["reset"]):
+            self.reinitialiser()
+        if pyxel.btnp(TOUCHES["quitter"]):
+            self.quitter_partie()
 
     def init_fade_out(self):
         # Préparer fade-out et arrêter musique menu
         if self.musique_menu_active:
-            pyxel.stop()
+            self.audio.arreter()
             self.musique_menu_active = False
-        self.fade_out = True
+        self.ecran_fondu = self.etat
+        self.etat = Etat.FONDU
         self.fade_out_frames = 0
-        pyxel.playm(4, loop=False)
+        self.audio.musique(4, boucle=False)
 
     def terminer_fade_out(self, abandon: bool = False):
-        self.fade_out = False
         self.fade_out_frames = 0
         if abandon:
             # Si fade-out abandonné (retour menu) relancer musique menu propre
             self.musique_menu_active = False
             self.gerer_musique_menu()
 
+    def lancer_partie(self) -> None:
+        self.terminer_fade_out()
+        self.creer_entites()
+        # Nouvelle partie à zéro, avant l'ouverture du replay qui part de cet état
+        self.score_g = self.score_d = 0
+        self.pause = False
+        self.ouvrir_replay()
+        self.etat = Etat.JEU
+
+    def entrer_victoire(self) -> None:
+        self.audio.arreter()  # Arrêter sons/musiques courants
+        self.musique_menu_active = False
+        piste = 1 if self.score_g > self.score_d else 2
+        # Jouée une seule fois: la victoire est un état, pas un test refait à chaque frame
+        self.audio.musique(piste, boucle=False)
+        self.etat = Etat.VICTOIRE
+
+    def retour_menu(self) -> None:
+        abandon = self.etat is Etat.FONDU
+        self.etat = Etat.MENU
+        # Réinitialiser pour que musique menu reparte proprement
+        self.menu_frames = 0
+        self.menu_extended = False
+        if abandon:
+            self.terminer_fade_out(abandon=True)
+
+    def quitter_partie(self) -> None:
+        self.fermer_replay()
+        self.retour_menu()
+
     def maj(self) -> None:
-        if self.etat == "menu":
-            self.maj_menu()
-        elif self.etat == "difficulte":
-            self.maj_difficulte()
-        elif self.etat == "jeu":
-            self.maj_jeu()
+        self.mises_a_jour[self.etat]()
+        self.audio.vider()
 
     def reinitialiser(self) -> None:
-        self.score_g = 0
-        self.score_d = 0
-        if self.raq_g and self.raq_d and self.balle:
-            self.raq_g.y = HAUTEUR_ECRAN / 2 - RAQ_H / 2
-            self.raq_d.y = HAUTEUR_ECRAN / 2 - RAQ_H / 2
-            self.balle.reset(direction_aleatoire=True)
+        if self.enregistreur:
+            self.enregistreur.noter(REINITIALISATION)
+        super().reinitialiser()
         self.pause = False
-        if hasattr(self, "victoire_son_joue"):
-            delattr(self, "victoire_son_joue")
+        if self.etat is Etat.VICTOIRE:
+            self.etat = Etat.JEU
         # Reset musique menu dynamique
         self.menu_frames = 0
         self.menu_extended = False
-        if self.fade_out:
-            self.terminer_fade_out(abandon=True)
 
-    def nouvelle_mise_en_jeu(self, a_droite: bool) -> None:
-        if self.balle:
-            self.balle.reset(direction_aleatoire=True)
-            self.balle.vx = BAL_V_INIT * (1 if a_droite else -1)
+    def rendre_difficulte(self, image, selection: int) -> None:
+        image.text(160, 60, "DIFFICULTE IA", 7)
+        image.text(120, 100, "Choisissez le niveau de l'IA :", 6)
 
-    def dessiner_difficulte(self) -> None:
-        pyxel.cls(COULEUR_FOND)
-        pyxel.text(160, 60, "DIFFICULTE IA", 7)
-        pyxel.text(120, 100, "Choisissez le niveau de l'IA :", 6)
+        couleur_debutant = 8 if selection == 0 else 7
+        couleur_amateur = 8 if selection == 1 else 7
+        couleur_pro = 8 if selection == 2 else 7
 
-        couleur_debutant = 8 if self.selection_difficulte == 0 else 7
-        couleur_amateur = 8 if self.selection_difficulte == 1 else 7
-        couleur_pro = 8 if self.selection_difficulte == 2 else 7
+        image.text(120, 150, "Debutant - Raquettes larges, IA lente", couleur_debutant)
+        image.text(120, 180, "Amateur - Raquettes normales, IA equilibree", couleur_amateur)
+        image.text(120, 210, "Pro - Raquettes petites, IA experte", couleur_pro)
 
-        pyxel.text(120, 150, "Debutant - Raquettes larges, IA lente", couleur_debutant)
-        pyxel.text(120, 180, "Amateur - Raquettes normales, IA equilibree", couleur_amateur)
-        pyxel.text(120, 210, "Pro - Raquettes petites, IA experte", couleur_pro)
+        fleche_y = 150 + (selection * 30)
+        image.text(100, fleche_y, ">", 8)
 
-        fleche_y = 150 + (self.selection_difficulte * 30)
-        pyxel.text(100, fleche_y, ">", 8)
+        image.text(80, 280, "Z/S pour naviguer", 6)
+        image.text(80, 300, "Entree pour valider", 6)
+        image.text(80, 320, "Q pour retour menu principal", 6)
 
-        pyxel.text(80, 280, "Z/S pour naviguer", 6)
-        pyxel.text(80, 300, "Entree pour valider", 6)
-        pyxel.text(80, 320, "Q pour retour menu principal", 6)
+    def rendre_menu(self, image, selection: int) -> None:
+        image.text(200, 60, "P O N G", 7)
+        image.text(150, 100, "Choisissez votre mode :", 6)
 
-    def dessiner_menu(self) -> None:
-        pyxel.cls(COULEUR_FOND)
-        pyxel.text(200, 60, "P O N G", 7)
-        pyxel.text(150, 100, "Choisissez votre mode :", 6)
+        couleur_vs_ordi = 8 if selection == 0 else 7
+        couleur_vs_joueur = 8 if selection == 1 else 7
+        couleur_quitter = 8 if selection == 2 else 7
 
-        if self.musique_menu_active:
-            if pyxel.frame_count % 60 < 30:
-                pyxel.text(420, 20, "♪", 11)
+        image.text(120, 150, "Joueur vs Ordinateur", couleur_vs_ordi)
+        image.text(120, 180, "Joueur vs Joueur", couleur_vs_joueur)
+        image.text(120, 210, "Quitter", couleur_quitter)
+
+        fleche_y = 150 + (selection * 30)
+        image.text(100, fleche_y, ">", 8)
 
-        couleur_vs_ordi = 8 if self.selection_menu == 0 else 7
-        couleur_vs_joueur = 8 if self.selection_menu == 1 else 7
-        couleur_quitter = 8 if self.selection_menu == 2 else 7
+        image.text(80, 280, "Z/S pour naviguer", 6)
+        image.text(80, 300, "Entree ou Espace pour valider", 6)
+        image.text(80, 320, "Q pour quitter rapidement", 6)
 
-        pyxel.text(120, 150, "Joueur vs Ordinateur", couleur_vs_ordi)
-        pyxel.text(120, 180, "Joueur vs Joueur", couleur_vs_joueur)
-        pyxel.text(120, 210, "Quitter", couleur_quitter)
+    def regler_qualite(self, niveau: int) -> None:
+        self.qualite = niveau
+        self.classe_balle.qualite = niveau
 
-        fleche_y = 150 + (self.selection_menu * 30)
-        pyxel.text(100, fleche_y, ">", 8)
+    def rendre_terrain(self, image, mode: tuple) -> None:
+        mode_ordinateur, niveau_ia, aide = mode
+        for y in range(0, HAUTEUR_ECRAN, 18):
+            image.rect(LARGEUR_ECRAN // 2 - 2, y, 4, 9, 5)
+        if not aide:
+            return
+
+        mode_text = f"vs Ordi ({niveau_ia.title()})" if mode_ordinateur else "vs Joueur"
+        image.text(10, HAUTEUR_ECRAN - 90, f"Mode: {mode_text} - Audio 8-bits actif", 6)
+        image.text(10, HAUTEUR_ECRAN - 70, "Effet 3D: Balle grandit au centre du terrain", 5)
+        image.text(10, HAUTEUR_ECRAN - 60, "Sons: Raquette sourd, Mur sec, Sol etouffe", 5)
+        image.text(10, HAUTEUR_ECRAN - 50, "Mouvement raquette: Meme sens = SPIN, Oppose = SLICE", 5)
+        image.text(10, HAUTEUR_ECRAN - 40, "Strategie: Haut raquette = renvoi vers haut", 5)
+        image.text(10, HAUTEUR_ECRAN - 30, "          Bas raquette = renvoi vers bas", 5)
+        image.text(10, HAUTEUR_ECRAN - 20, "Z/S  O/L  (P)ause  (R)eset  (Q)menu", 6)
 
-        pyxel.text(80, 280, "Z/S pour naviguer", 6)
-        pyxel.text(80, 300, "Entree ou Espace pour valider", 6)
-        pyxel.text(80, 320, "Q pour quitter rapidement", 6)
+    def rendre_score(self, image, score: tuple) -> None:
+        image.text(0, 0, f"{score[0]}", 7)
+        image.text(110, 0, f"{score[1]}", 7)
+
+    def dessiner_difficulte(self) -> None:
+        self.calque_difficulte.dessiner(self.selection_difficulte)
+
+    def dessiner_menu(self) -> None:
+        self.calque_menu.dessiner(self.selection_menu)
+
+        if self.musique_menu_active:
+            if pyxel.frame_count % 60 < 30:
+                pyxel.text(420, 20, "♪", 11)
 
     def dessiner_jeu(self) -> None:
-        pyxel.cls(COULEUR_FOND)
-        for y in range(0, HAUTEUR_ECRAN, 18):
-            pyxel.rect(LARGEUR_ECRAN // 2 - 2, y, 4, 9, 5)
+        self.calque_terrain.dessiner((self.mode_ordinateur, self.niveau_ia, self.qualite < SIMPLIFIE))
+        self.mesurer(DESSIN_FOND)
 
         if self.raq_g and self.raq_d and self.balle:
             self.raq_g.dessiner()
             self.raq_d.dessiner()
+            self.mesurer(DESSIN_RAQUETTES)
             self.balle.dessiner()
+            self.mesurer(DESSIN_BALLE)
 
-        pyxel.text(LARGEUR_ECRAN // 2 - 60, 20, f"{self.score_g}", 7)
-        pyxel.text(LARGEUR_ECRAN // 2 + 50, 20, f"{self.score_d}", 7)
-
-        mode_text = f"vs Ordi ({self.niveau_ia.title()})" if self.mode_ordinateur else "vs Joueur"
-        pyxel.text(10, HAUTEUR_ECRAN - 90, f"Mode: {mode_text} - Audio 8-bits actif", 6)
-        pyxel.text(10, HAUTEUR_ECRAN - 70, "Effet 3D: Balle grandit au centre du terrain", 5)
-        pyxel.text(10, HAUTEUR_ECRAN - 60, "Sons: Raquette sourd, Mur sec, Sol etouffe", 5)
-        pyxel.text(10, HAUTEUR_ECRAN - 50, "Mouvement raquette: Meme sens = SPIN, Oppose = SLICE", 5)
-        pyxel.text(10, HAUTEUR_ECRAN - 40, "Strategie: Haut raquette = renvoi vers haut", 5)
-        pyxel.text(10, HAUTEUR_ECRAN - 30, "          Bas raquette = renvoi vers bas", 5)
-        pyxel.text(10, HAUTEUR_ECRAN - 20, "Z/S  O/L  (P)ause  (R)eset  (Q)menu", 6)
+        self.calque_score.dessiner((self.score_g, self.score_d))
 
         if self.pause:
             pyxel.text(200, HAUTEUR_ECRAN // 2 - 10, "PAUSE", 8)
+        self.mesurer(DESSIN_TEXTES)
 
-        if self.score_g >= SCORE_MAX or self.score_d >= SCORE_MAX:
-            gagnant = "GAUCHE" if self.score_g > self.score_d else "DROITE"
-            self.pause = True
-            pyxel.text(160, HAUTEUR_ECRAN // 2 - 10, f"VICTOIRE {gagnant} !", 8)
-            pyxel.text(140, HAUTEUR_ECRAN // 2 + 20, "Appuie sur R pour rejouer", 13)
+    def dessiner_victoire(self) -> None:
+        self.dessiner_jeu()
+        gagnant = "GAUCHE" if self.score_g > self.score_d else "DROITE"
+        pyxel.text(160, HAUTEUR_ECRAN // 2 - 10, f"VICTOIRE {gagnant} !", 8)
+        pyxel.text(140, HAUTEUR_ECRAN // 2 + 20, "Appuie sur R pour rejouer", 13)
 
-    def dessiner(self) -> None:
-        if self.etat == "menu":
+    def dessiner_fondu(self) -> None:
+        if self.ecran_fondu is Etat.MENU:
             self.dessiner_menu()
-        elif self.etat == "difficulte":
+        else:
             self.dessiner_difficulte()
-        elif self.etat == "jeu":
-            self.dessiner_jeu()
+
+    def dessiner(self) -> None:
+        self.dessins[self.etat]()
@@ -0,0 +1,191 @@
+"""
+Tournoi toutes-rondes entre configurations de `SmartComputer`, sans fenêtre.
+
+Chaque match est joué par le coeur de simulation dans un processus du pool,
+avec une graine dérivée de (graine du tournoi, paire, numéro de match): un
+même appel redonne toujours les mêmes résultats. Les processus ne renvoient
+qu'un résumé par match, replié aussitôt dans un `Agregat`.
+"""
+
+import argparse
+import itertools
+import os
+import time
+from multiprocessing import Pool
+
+from .config import SCORE_MAX
+from .rng import deriver
+from .simulation import Match, FRAPPE, POINT, PARAMETRES_IA
+
+NIVEAUX = ("debutant", "amateur", "pro")
+# Longueur d'échange (nombre de frappes) au-delà de laquelle tout tombe dans le dernier bac
+ECHANGES_MAX = 30
+FPS = 60
+
+
+def lire_config(texte: str) -> tuple[str, str, dict]:
+    """
+    Lit une configuration IA: `pro`, ou `nom=niveau:cle=valeur,cle=valeur`
+    (ex. `rapide=amateur:vitesse_max=4,temps_reaction=2`). Type argparse de `--ia`.
+    """
+    tete, _, options = texte.partition(":")
+    nom, _, niveau = tete.rpartition("=")
+    if niveau not in NIVEAUX:
+        raise argparse.ArgumentTypeError(f"niveau inconnu: {niveau} (choix: {', '.join(NIVEAUX)})")
+    parametres = {}
+    for option in filter(None, options.split(",")):
+        cle, _, valeur = option.partition("=")
+        if cle not in PARAMETRES_IA:
+            raise argparse.ArgumentTypeError(f"paramètre IA inconnu: {cle} (choix: {', '.join(PARAMETRES_IA)})")
+        try:
+            parametres[cle] = int(valeur) if cle == "temps_reaction" else float(valeur)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"valeur invalide pour {cle}: {valeur!r}") from None
+    return nom or texte, niveau, parametres
+
+
+def jouer_match(tache: tuple) -> tuple:
+    """
+    Joue un match IA contre IA jusqu'à `score_max` (ou `frames_max`).
+
+    Renvoie (paire, inversé, points gauche, points droite, frames, échanges)
+    où `échanges` liste le nombre de frappes de chaque point.
+    """
+    paire, inverse, config_g, config_d, graine, score_max, frames_max, pas = tache
+    _, niveau_g, parametres_g = config_g
+    _, niveau_d, parametres_d = config_d
+    match = Match(
+        mode_ordinateur=True,
+        niveau_ia=niveau_d,
+        niveau_ia_g=niveau_g,
+        score_max=score_max,
+        graine=graine,
+        parametres_ia=parametres_d,
+        parametres_ia_g=parametres_g,
+    )
+    echanges = []
+    frappes = 0
+    frames = 0
+    while not match.termine and frames < frames_max:
+        for evenement in match.tick(dt=pas):
+            if evenement.type == FRAPPE:
+                frappes += 1
+            elif evenement.type == POINT:
+                echanges.append(frappes)
+                frappes = 0
+        frames += pas
+    return paire, inverse, match.score_g, match.score_d, frames, echanges
+
+
+class Agregat:
+    """Statistiques cumulées du tournoi, mises à jour match par match."""
+
+    def __init__(self, noms: list[str]):
+        self.noms = noms
+        self.matchs = 0
+        self.victoires = dict.fromkeys(noms, 0)
+        self.joues = dict.fromkeys(noms, 0)
+        self.points_pour = dict.fromkeys(noms, 0)
+        self.points_contre = dict.fromkeys(noms, 0)
+        self.victoires_paire = {}
+        self.histogramme = [0] * (ECHANGES_MAX + 1)
+        self.frames = 0
+        self.points = 0
+
+    def ajouter(self, paire: tuple[int, int], inverse: bool, points_g, points_d, frames, echanges) -> None:
+        a, b = paire
+        nom_g, nom_d = (self.noms[b], self.noms[a]) if inverse else (self.noms[a], self.noms[b])
+        self.matchs += 1
+        self.frames += frames
+        self.points += points_g + points_d
+        for nom, pour, contre in ((nom_g, points_g, points_d), (nom_d, points_d, points_g)):
+            self.joues[nom] += 1
+            self.points_pour[nom] += pour
+            self.points_contre[nom] += contre
+        if points_g != points_d:
+            gagnant = nom_g if points_g > points_d else nom_d
+            self.victoires[gagnant] += 1
+            cle = (self.noms[a], self.noms[b])
+            score = self.victoires_paire.setdefault(cle, [0, 0])
+            score[0 if gagnant == cle[0] else 1] += 1
+        for frappes in echanges:
+            self.histogramme[min(frappes, ECHANGES_MAX)] += 1
+
+    def rapport(self) -> str:
+        lignes = [f"{self.matchs} matchs, {self.points} points"]
+        minutes = self.frames / FPS / 60
+        if minutes:
+            lignes.append(f"Points par minute de jeu: {self.points / minutes:.1f}")
+        lignes.append(f"{'IA':<16}{'joues':>7}{'victoires':>11}{'taux':>8}{'pour':>7}{'contre':>8}")
+        for nom in sorted(self.noms, key=lambda n: -self.victoires[n] / max(self.joues[n], 1)):
+            joues = self.joues[nom]
+            taux = self.victoires[nom] / joues if joues else 0.0
+            lignes.append(
+                f"{nom:<16}{joues:>7}{self.victoires[nom]:>11}{taux:>8.1%}"
+                f"{self.points_pour[nom]:>7}{self.points_contre[nom]:>8}"
+            )
+        for (a, b), (va, vb) in sorted(self.victoires_paire.items()):
+            lignes.append(f"  {a} - {b}: {va} - {vb}")
+        total = sum(self.histogramme)
+        if total:
+            lignes.append("Longueur des échanges (frappes par point):")
+            pic = max(self.histogramme)
+            for frappes, nombre in enumerate(self.histogramme):
+                if nombre:
+                    etiquette = f"{frappes}+" if frappes == ECHANGES_MAX else str(frappes)
+                    barre = "#" * max(1, round(40 * nombre / pic))
+                    lignes.append(f"  {etiquette:>3} {nombre:>8} {barre}")
+        return "\n".join(lignes)
+
+
+def taches(configs: list, matchs_par_paire: int, graine: int, score_max: int, frames_max: int, pas: int):
+    """Génère paresseusement les matchs, en alternant les côtés dans chaque paire."""
+    for paire in itertools.combinations(range(len(configs)), 2):
+        a, b = paire
+        for k in range(matchs_par_paire):
+            inverse = k % 2 == 1
+            config_g, config_d = (configs[b], configs[a]) if inverse else (configs[a], configs[b])
+            yield paire, inverse, config_g, config_d, deriver(graine, a, b, k), score_max, frames_max, pas
+
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(description="Tournoi toutes-rondes entre IA SmartComputer")
+    parser.add_argument(
+        "--ia",
+        action="append",
+        type=lire_config,
+        help="Configuration IA (répétable): niveau, ou nom=niveau:cle=valeur,... (défaut: les 3 niveaux)",
+    )
+    parser.add_argument("--matchs", type=int, default=100, help="Matchs par paire")
+    parser.add_argument("--graine", type=int, default=0)
+    parser.add_argument("--processus", type=int, default=os.cpu_count())
+    parser.add_argument("--score-max", type=int, default=SCORE_MAX)
+    parser.add_argument("--frames-max", type=int, default=FPS * 60 * 30, help="Durée maximale d'un match")
+    parser.add_argument(
+        "--pas", type=int, default=1, help="Frames simulées par tick (collisions balayées, sans effet tunnel)"
+    )
+    parser.add_argument("--rapport-tous", type=int, default=0, help="Rapport intermédiaire tous les N matchs")
+    args = parser.parse_args(arguments)
+
+    configs = args.ia or [lire_config(niveau) for niveau in NIVEAUX]
+    noms = [nom for nom, _, _ in configs]
+    if len(set(noms)) != len(noms):
+        parser.error("Noms de configuration en double")
+    agregat = Agregat(noms)
+
+    debut = time.perf_counter()
+    with Pool(args.processus) as pool:
+        resultats = pool.imap_unordered(
+            jouer_match,
+            taches(configs, args.matchs, args.graine, args.score_max, args.frames_max, args.pas),
+            chunksize=8,
+        )
+        for resultat in resultats:
+            agregat.ajouter(*resultat)
+            if args.rapport_tous and agregat.matchs % args.rapport_tous == 0:
+                print(agregat.rapport(), end="\n\n", flush=True)
+    duree = time.perf_counter() - debut
+
+    print(agregat.rapport())
+    print(f"Durée: {duree:.1f}s ({agregat.matchs / duree:.1f} matchs/s, {agregat.frames / duree:.0f} frames/s)")
+    return 0
@@ -0,0 +1,324 @@
+"""
+Calibrage des paramètres de `SmartComputer` (et de la hauteur des raquettes)
+sur des taux de victoire cibles face à un joueur scripté de référence.
+
+Un point de l'espace de recherche est évalué par un lot de matchs sur le
+moteur vectorisé (`MoteurLot`), toujours avec les mêmes graines pour que
+les points soient comparables entre eux. Les évaluations tournent dans un
+pool de processus et chaque résultat est ajouté aussitôt à un cache disque:
+relancer la commande reprend là où elle s'était arrêtée.
+
+Recherche: exploration quasi aléatoire de tout l'espace, puis quelques tours
+de perturbations autour des points les plus proches de chaque cible, puis
+confirmation du meilleur point avec davantage de matchs.
+
+    python -m pong_game.tuner --cibles 0.3 0.5 0.7
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from .batch import MoteurLot
+from .config import HAUTEUR_ECRAN, VITESSE_RAQ, SCORE_MAX, DOSSIER_CACHE
+from .rng import Alea, deriver
+from .simulation import SmartComputer, PARAMETRES_IA
+
+# Espace de recherche: bornes de chaque paramètre (temps_reaction est entier)
+BORNES = {
+    "vitesse_max": (VITESSE_RAQ * 0.4, VITESSE_RAQ * 1.2),
+    "precision": (0.2, 1.0),
+    "temps_reaction": (0, 12),
+    "anticipation": (0.0, 1.0),
+    "agressivite": (0.0, 1.0),
+    "echelle_raquette": (0.6, 1.3),
+}
+# Hauteur des raquettes des niveaux actuels (voir Match.taille_raquette)
+ECHELLES_NIVEAUX = {"debutant": 1.2, "amateur": 1.0, "pro": 0.7}
+CACHE_DEFAUT = os.path.join(DOSSIER_CACHE, "calibrage.jsonl")
+# À changer si l'évaluation change (joueur de référence, règles): invalide le cache
+VERSION_EVALUATION = 1
+FPS = 60
+
+
+class JoueurReference:
+    """
+    Joueur scripté, vectorisé, à gauche: vise la balle telle qu'elle était
+    `reaction` frames plus tôt quand elle arrive, revient au centre sinon,
+    et ne bouge pas dans une zone morte de quelques pixels.
+    """
+
+    def __init__(self, n: int, reaction: int = 12, zone_morte: float = 6.0):
+        self.zone_morte = zone_morte
+        self.y_vus = np.full((reaction + 1, n), HAUTEUR_ECRAN / 2)
+        self.vx_vus = np.zeros((reaction + 1, n))
+        self.indice = 0
+
+    def entrees(self, lot: MoteurLot) -> np.ndarray:
+        taille = len(self.y_vus)
+        self.y_vus[self.indice % taille] = lot.y
+        self.vx_vus[self.indice % taille] = lot.vx
+        self.indice += 1
+        # La case suivante est la plus ancienne: ce que le joueur "voit" maintenant
+        y_vu = self.y_vus[self.indice % taille]
+        vx_vu = self.vx_vus[self.indice % taille]
+        cible = np.where(vx_vu < 0, y_vu + lot.t / 2, HAUTEUR_ECRAN / 2)
+        ecart = cible - (lot.g.y + lot.g.h / 2)
+        return np.sign(ecart) * (np.abs(ecart) > self.zone_morte)
+
+
+def arrondir(point: dict) -> dict:
+    """Arrondi canonique d'un point (clé de cache stable, valeurs lisibles)."""
+    return {
+        cle: int(round(point[cle])) if cle == "temps_reaction" else round(float(point[cle]), 3)
+        for cle in BORNES
+    }
+
+
+def point_niveau(niveau: str) -> dict:
+    """Point correspondant à un niveau actuel de `SmartComputer`."""
+    modele = SmartComputer(0, 0, niveau)
+    point = {cle: getattr(modele, cle) for cle in PARAMETRES_IA}
+    point["echelle_raquette"] = ECHELLES_NIVEAUX[niveau]
+    return arrondir(point)
+
+
+def point_aleatoire(alea: Alea) -> dict:
+    return arrondir({cle: alea.uniform(a, b) for cle, (a, b) in BORNES.items()})
+
+
+def perturber(point: dict, echelle: float, alea: Alea) -> dict:
+    """Voisin de `point`: chaque paramètre bouge d'au plus `echelle` fois la largeur de sa borne."""
+    voisin = {}
+    for cle, (a, b) in BORNES.items():
+        valeur = point[cle] + alea.uniform(-echelle, echelle) * (b - a)
+        voisin[cle] = min(max(valeur, a), b)
+    return arrondir(voisin)
+
+
+def config_ia(point: dict) -> str:
+    """Configuration au format de `tournament.lire_config` (sans la hauteur de raquette)."""
+    options = ",".join(f"{cle}={point[cle]}" for cle in PARAMETRES_IA)
+    return f"amateur:{options}"
+
+
+def evaluer(tache: tuple) -> tuple:
+    """
+    Joue `matchs` matchs de l'IA `point` (à droite) contre le joueur de
+    référence. Renvoie (clé, victoires de l'IA, matchs terminés, frames simulées).
+    """
+    cle, point, matchs, graine, score_max, frames_max, reaction = tache
+    parametres = {c: point[c] for c in PARAMETRES_IA}
+    lot = MoteurLot(
+        matchs,
+        mode_ordinateur=True,
+        niveau_ia="amateur",
+        score_max=score_max,
+        graines=[deriver(graine, k) for k in range(matchs)],
+        parametres_ia=parametres,
+        echelle_raquette=point["echelle_raquette"],
+    )
+    joueur = JoueurReference(matchs, reaction)
+    termines = np.zeros(matchs, dtype=bool)
+    victoires = np.zeros(matchs, dtype=bool)
+    frames = 0
+    while frames < frames_max and not termines.all():
+        lot.etape(joueur.entrees(lot), None)
+        frames += 1
+        nouveaux = lot.termine & ~termines
+        if nouveaux.any():
+            victoires |= nouveaux & (lot.score_d > lot.score_g)
+            termines |= nouveaux
+    return cle, int(victoires.sum()), int(termines.sum()), frames * matchs
+
+
+class CacheEvaluations:
+    """Résultats déjà calculés, un objet JSON par ligne, complétés au fil de l'eau."""
+
+    def __init__(self, chemin: str):
+        self.chemin = chemin
+        self.resultats = {}
+        if os.path.exists(chemin):
+            with open(chemin) as fichier:
+                for ligne in fichier:
+                    try:
+                        entree = json.loads(ligne)
+                    except ValueError:
+                        continue  # ligne tronquée par une interruption
+                    self.resultats[entree["cle"]] = entree
+        self.fichier = None
+
+    def __contains__(self, cle: str) -> bool:
+        return cle in self.resultats
+
+    def __getitem__(self, cle: str) -> dict:
+        return self.resultats[cle]
+
+    def ajouter(self, entree: dict) -> None:
+        if self.fichier is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.chemin)), exist_ok=True)
+            self.fichier = open(self.chemin, "a")
+        self.resultats[entree["cle"]] = entree
+        self.fichier.write(json.dumps(entree) + "\n")
+        self.fichier.flush()
+
+    def fermer(self) -> None:
+        if self.fichier:
+            self.fichier.close()
+            self.fichier = None
+
+
+class Calibreur:
+    def __init__(self, pool, cache: CacheEvaluations, reglages: dict):
+        self.pool = pool
+        self.cache = cache
+        # matchs, graine, score_max, frames_max, reaction
+        self.reglages = reglages
+        self.evalues = 0
+        self.depuis_cache = 0
+        self.matchs = 0
+        self.frames = 0
+        self.duree = 0.0
+
+    def cle(self, point: dict, matchs: int, graine: int) -> str:
+        reglages = dict(self.reglages, matchs=matchs, graine=graine, version=VERSION_EVALUATION)
+        return json.dumps([point, reglages], sort_keys=True)
+
+    def evaluer(self, points: list, matchs: int | None = None, graine: int | None = None) -> list[dict]:
+        """Taux de victoire de chaque point (cache, sinon évaluation parallèle)."""
+        matchs = matchs or self.reglages["matchs"]
+        graine = self.reglages["graine"] if graine is None else graine
+        cles = [self.cle(point, matchs, graine) for point in points]
+        taches = []
+        for cle, point in zip(cles, points):
+            if cle in self.cache or any(t[0] == cle for t in taches):
+                continue
+            taches.append(
+                (
+                    cle,
+                    point,
+                    matchs,
+                    graine,
+                    self.reglages["score_max"],
+                    self.reglages["frames_max"],
+                    self.reglages["reaction"],
+                )
+            )
+        self.depuis_cache += len(points) - len(taches)
+
+        debut = time.perf_counter()
+        for cle, victoires, termines, frames in self.pool.imap_unordered(evaluer, taches):
+            point = json.loads(cle)[0]
+            taux = victoires / termines if termines else float("nan")
+            self.cache.ajouter(
+                {"cle": cle, "point": point, "victoires": victoires, "termines": termines, "matchs": matchs, "taux": taux}
+            )
+            self.evalues += 1
+            self.matchs += matchs
+            self.frames += frames
+        self.duree += time.perf_counter() - debut
+        return [self.cache[cle] for cle in cles]
+
+    def debit(self) -> str:
+        if not self.evalues:
+            return f"tout depuis le cache ({self.depuis_cache} points)"
+        return (
+            f"{self.evalues} points évalués en {self.duree:.1f} s: {self.evalues / self.duree:.2f} points/s,"
+            f" {self.matchs / self.duree:.0f} matchs/s, {self.frames / self.duree / 1e6:.2f} M frames/s"
+            f" ({self.depuis_cache} points repris du cache)"
+        )
+
+
+def ecart(resultat: dict, cible: float) -> float:
+    return abs(resultat["taux"] - cible) if not math.isnan(resultat["taux"]) else math.inf
+
+
+def calibrer(
+    calibreur: Calibreur, cibles: list[float], exploration: int, tours: int, voisins: int, confirmation: int, graine: int
+) -> dict:
+    alea = Alea(deriver(graine, 0))
+    resultats = calibreur.evaluer([point_aleatoire(alea) for _ in range(exploration)])
+
+    for tour in range(tours):
+        echelle = 0.2 * 0.6 ** tour
+        candidats = []
+        for i, cible in enumerate(cibles):
+            proches = sorted(resultats, key=lambda r: ecart(r, cible))[:voisins]
+            alea = Alea(deriver(graine, 1 + tour, i))
+            candidats += [perturber(r["point"], echelle, alea) for r in proches]
+        resultats += calibreur.evaluer(candidats)
+        print(f"Tour {tour + 1}/{tours}: {calibreur.debit()}", flush=True)
+
+    # Confirmation sur d'autres graines et davantage de matchs: écarte les points chanceux
+    choisis = {}
+    for i, cible in enumerate(cibles):
+        proches = sorted(resultats, key=lambda r: ecart(r, cible))[:3]
+        confirmes = calibreur.evaluer(
+            [r["point"] for r in proches], matchs=calibreur.reglages["matchs"] * confirmation, graine=graine + 1
+        )
+        choisis[cible] = min(confirmes, key=lambda r: ecart(r, cible))
+    return choisis
+
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(description="Calibrage des IA sur des taux de victoire cibles")
+    parser.add_argument("--cibles", type=float, nargs="+", default=[0.3, 0.5, 0.7], help="Taux de victoire de l'IA")
+    parser.add_argument("--matchs", type=int, default=128, help="Matchs par point évalué")
+    parser.add_argument("--exploration", type=int, default=48, help="Points tirés au hasard au départ")
+    parser.add_argument("--tours", type=int, default=4, help="Tours de recherche locale")
+    parser.add_argument("--voisins", type=int, default=4, help="Voisins essayés par cible et par tour")
+    parser.add_argument("--confirmation", type=int, default=4, help="Facteur de matchs pour la confirmation")
+    parser.add_argument("--reaction", type=int, default=12, help="Retard du joueur de référence, en frames")
+    parser.add_argument("--score-max", type=int, default=SCORE_MAX)
+    parser.add_argument("--frames-max", type=int, default=FPS * 60 * 10, help="Durée maximale d'un match")
+    parser.add_argument("--graine", type=int, default=0)
+    parser.add_argument("--processus", type=int, default=os.cpu_count())
+    parser.add_argument("--cache", default=CACHE_DEFAUT, help="Fichier des évaluations déjà faites")
+    parser.add_argument("--sortie", help="Écrire les jeux de paramètres retenus dans ce fichier JSON")
+    args = parser.parse_args(arguments)
+
+    reglages = {
+        "matchs": args.matchs,
+        "graine": args.graine,
+        "score_max": args.score_max,
+        "frames_max": args.frames_max,
+        "reaction": args.reaction,
+    }
+    cache = CacheEvaluations(args.cache)
+    debut = time.perf_counter()
+    with Pool(args.processus) as pool:
+        calibreur = Calibreur(pool, cache, reglages)
+        niveaux = calibreur.evaluer([point_niveau(niveau) for niveau in ECHELLES_NIVEAUX])
+        print("Niveaux actuels contre le joueur de référence:")
+        for niveau, resultat in zip(ECHELLES_NIVEAUX, niveaux):
+            print(f"  {niveau:<9} {resultat['taux']:6.1%}")
+        choisis = calibrer(
+            calibreur, args.cibles, args.exploration, args.tours, args.voisins, args.confirmation, args.graine
+        )
+    cache.fermer()
+
+    print(f"\nDurée totale {time.perf_counter() - debut:.1f} s; {calibreur.debit()}")
+    sortie = {}
+    for cible, resultat in choisis.items():
+        taux, matchs = resultat["taux"], resultat["termines"]
+        erreur = math.sqrt(taux * (1 - taux) / matchs) if matchs else float("nan")
+        point = resultat["point"]
+        print(f"\nCible {cible:.0%}: {taux:.1%} ± {erreur:.1%} sur {matchs} matchs")
+        print(f"  --ia cible{round(cible * 100)}={config_ia(point)}")
+        print(f"  echelle_raquette={point['echelle_raquette']}")
+        sortie[f"{cible:.2f}"] = {"taux": taux, "matchs": matchs, "point": point}
+    if args.sortie:
+        with open(args.sortie, "w") as fichier:
+            json.dump(sortie, fichier, indent=2)
+        print(f"\nParamètres enregistrés dans {args.sortie}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Le paquet pong_game est lu depuis la racine du dépôt, sans installation
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,27 @@
+"""Virgule fixe: traces de référence au bit près et reprise depuis un instantané."""
+
+import pytest
+
+from pong_game.fixedpoint import MatchFixe, TRACES_REFERENCE, empreinte_trace, verifier_reprise
+
+
+@pytest.mark.parametrize("graine", sorted(TRACES_REFERENCE))
+def test_trace_reference(graine):
+    assert empreinte_trace(graine) == TRACES_REFERENCE[graine]
+
+
+@pytest.mark.parametrize("graine", sorted(TRACES_REFERENCE))
+def test_reprise_instantane(graine):
+    assert verifier_reprise(graine)
+
+
+def test_instantane_aller_retour():
+    match = MatchFixe(mode_ordinateur=True, niveau_ia="pro", niveau_ia_g="amateur", graine=7)
+    for _ in range(1000):
+        match.tick()
+    donnees = match.instantane()
+    assert len(donnees) == MatchFixe.TAILLE_INSTANTANE
+    copie = MatchFixe(mode_ordinateur=True, niveau_ia="pro", niveau_ia_g="amateur", graine=8)
+    copie.charger_instantane(donnees)
+    assert copie.capturer() == match.capturer()
+    assert copie.instantane() == donnees
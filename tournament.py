@@ -0,0 +1,12 @@
+"""
+Tournoi headless entre niveaux de `SmartComputer`.
+Exemple: python tournament.py --matchs 200 --ia pro --ia amateur --ia rapide=amateur:vitesse_max=4
+"""
+
+import sys
+
+from pong_game.tournament import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())
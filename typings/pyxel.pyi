@@ -1,4 +1,4 @@
-from typing import Callable, List
+from typing import Any, Callable, List
 
 # Constantes de touches (valeurs int quelconques)
 KEY_Z: int
@@ -12,7 +12,12 @@ KEY_RETURN: int
 KEY_UP: int
 KEY_DOWN: int
 KEY_SPACE: int
+KEY_LEFT: int
+KEY_RIGHT: int
+KEY_F1: int
+KEY_F2: int
 
+VERSION: str
 frame_count: int
 
 def init(width: int, height: int, title: str = ...) -> None: ...
@@ -27,6 +32,38 @@ def text(x: int, y: int, s: str, col: int) -> None: ...
 def pset(x: int, y: int, col: int) -> None: ...
 def cls(col: int = ...) -> None: ...
 
+def load(
+    filename: str,
+    exclude_images: bool = ...,
+    exclude_tilemaps: bool = ...,
+    exclude_sounds: bool = ...,
+    exclude_musics: bool = ...,
+) -> None: ...
+def save(
+    filename: str,
+    exclude_images: bool = ...,
+    exclude_tilemaps: bool = ...,
+    exclude_sounds: bool = ...,
+    exclude_musics: bool = ...,
+) -> None: ...
+
+class Image:
+    def __init__(self, width: int, height: int) -> None: ...
+    def cls(self, col: int) -> None: ...
+    def rect(self, x: float, y: float, w: float, h: float, col: int) -> None: ...
+    def text(self, x: int, y: int, s: str, col: int) -> None: ...
+    def pset(self, x: int, y: int, col: int) -> None: ...
+    # Pointeur ctypes sur les index de couleur (un octet par pixel)
+    def data_ptr(self) -> Any: ...
+
+# Écran courant et palette (0xRRGGBB par index de couleur)
+screen: Image
+colors: List[int]
+
+def blt(
+    x: float, y: float, img: int | Image, u: float, v: float, w: float, h: float, colkey: int | None = ...
+) -> None: ...
+
 def btn(key: int) -> bool: ...
 def btnp(key: int) -> bool: ...
 